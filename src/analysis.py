@@ -0,0 +1,468 @@
+import os
+import sys
+import json
+import html
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+from pydantic import BaseModel, Field
+
+from game.gomoku import Gomoku
+from game.heuristic import Position, candidate_moves, opponent, score_cell
+from game.rules import forbidden_reason
+from game.solver import ThreatSolver
+from game.state import COLOR_CODES
+from log import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_PATH = "analysis_cache.sqlite3"
+DEFAULT_OUTPUT = "analysis_report.json"
+# 국면마다 VCF 탐색 노드 제한 (시간 제한이 아니라 노드 수라서 결과가 결정적)
+DEFAULT_MAX_NODES = 2_000
+# 4 를 막는 강제 수를 따라가는 최대 깊이
+FORCED_DEPTH = 10
+# 흑 기준 평가값이 이 이상 (이하) 이면 그쪽이 우세
+ADVANTAGE = 0.5
+# 프로세스 안 메모 dict 최대 항목 수 (넘으면 비움, SQLite 캐시는 그대로)
+MEMO_SIZE = 200_000
+# 평가 방법이 바뀌면 올려서 SQLite 캐시를 무효화
+EVAL_VERSION = 1
+
+# 국면 평가: (둘 차례 기준 값 -1 ~ 1, 이유, 추천 수)
+#   이유: "five" 바로 5목 / "four" 막을 수 없는 4 (진 국면) / "forced" 4 를 막는 강제 수
+#         "forbidden" 막을 자리가 흑 금수 / "vcf" 연속 4 필승 / "shape" 모양 점수
+Evaluation = tuple[float, str, Optional[tuple[int, int]]]
+
+
+class Annotation(BaseModel):
+    ply: int  # 1 부터
+    color: str
+    move: tuple[int, int]
+    kind: str  # "missed_win" / "missed_block" / "blunder"
+    best: Optional[tuple[int, int]] = None
+
+
+class GameReport(BaseModel):
+    id: str
+    black: Optional[str] = None
+    white: Optional[str] = None
+    winner: Optional[str] = None
+    plies: int
+    annotations: list[Annotation] = Field(default_factory=list)
+    # 우세가 넘어간 수: {"ply": 수 번호, "to": 색}
+    flips: list[dict] = Field(default_factory=list)
+    # 국면마다 흑 기준 평가값 (0 수 ~ 마지막 수 뒤)
+    values: list[float] = Field(default_factory=list)
+
+
+class PositionCache:
+    """워커 프로세스들이 함께 쓰는 국면 평가 캐시 (SQLite 파일 + 프로세스 안 메모 dict)
+
+    여러 대국에 같은 오프닝 / 같은 국면이 반복되면 다른 워커가 이미 평가한 결과를 씀.
+    새로 평가한 항목은 모아 두었다가 flush() 에서 한 트랜잭션으로 씀
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memo: dict[str, Evaluation] = {}
+        self._pending: dict[str, Evaluation] = {}
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS positions (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+                """)
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Evaluation]:
+        evaluation = self._memo.get(key)
+        if evaluation is None and self._conn is not None:
+            row = self._conn.execute(
+                "SELECT value FROM positions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, reason, best = json.loads(row[0])
+                evaluation = (value, reason, tuple(best) if best else None)
+                self._remember(key, evaluation)
+        if evaluation is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return evaluation
+
+    def put(self, key: str, evaluation: Evaluation) -> None:
+        self._remember(key, evaluation)
+        self._pending[key] = evaluation
+
+    def _remember(self, key: str, evaluation: Evaluation) -> None:
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = evaluation
+
+    def flush(self) -> None:
+        if self._conn is not None and self._pending:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO positions (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in self._pending.items()],
+            )
+            self._conn.commit()
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+
+
+class Analyser:
+    """게임 레코드를 처음부터 다시 두며 국면마다 평가하고 수마다 주석을 닮"""
+
+    def __init__(
+        self,
+        cache: Optional[PositionCache] = None,
+        max_nodes: int = DEFAULT_MAX_NODES,
+    ) -> None:
+        self.cache = cache or PositionCache(None)
+        self.max_nodes = max_nodes
+
+    def _key(
+        self, stones: dict, width, height, rule: str, color: str, depth: int
+    ) -> str:
+        # depth 가 다르면 강제 수순을 끝까지 따라가지 못한 평가일 수 있으므로 따로 저장
+        cells = ",".join(f"{x}.{y}{stones[(x, y)][0]}" for x, y in sorted(stones))
+        raw = (
+            f"{EVAL_VERSION}:{self.max_nodes}:{depth}:{rule}:{width}x{height}:"
+            f"{color}:{cells}"
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def evaluate(
+        self,
+        stones: dict[tuple[int, int], str],
+        width: Optional[int],
+        height: Optional[int],
+        rule: str,
+        color: str,
+        depth: int = FORCED_DEPTH,
+    ) -> Evaluation:
+        """color 가 둘 차례인 국면의 평가 (캐시 사용)"""
+        key = self._key(stones, width, height, rule, color, depth)
+        evaluation = self.cache.get(key)
+        if evaluation is None:
+            evaluation = self._evaluate(stones, width, height, rule, color, depth)
+            self.cache.put(key, evaluation)
+        return evaluation
+
+    def _evaluate(self, stones, width, height, rule, color, depth) -> Evaluation:
+        codes = {point: COLOR_CODES[stone] for point, stone in stones.items()}
+        solver = ThreatSolver(codes, width, height, rule)
+        enemy = opponent(color)
+
+        fives = solver.threats(COLOR_CODES[color]).fives
+        if fives:
+            return 1.0, "five", fives[0]
+        blocks = solver.threats(COLOR_CODES[enemy]).fives
+        if len(blocks) > 1:
+            return -1.0, "four", blocks[0]
+        if blocks:
+            # 상대 4: 막는 수밖에 없으므로 막은 뒤 국면의 평가를 따름
+            block = blocks[0]
+            if (
+                rule == "renju"
+                and color == "BLACK"
+                and forbidden_reason(solver.cell, *block) is not None
+            ):
+                return -1.0, "forbidden", None
+            if depth > 0:
+                value, _, _ = self.evaluate(
+                    {**stones, block: color}, width, height, rule, enemy, depth - 1
+                )
+                return -value, "forced", block
+
+        if not blocks:
+            result = solver.solve(
+                COLOR_CODES[color], "vcf", max_nodes=self.max_nodes, time_limit=None
+            )
+            if result.found:
+                return 1.0, "vcf", (result.moves[0].x, result.moves[0].y)
+
+        # 모양 점수: 내 최고 공격 자리 대 상대 최고 공격 자리 (heuristic.best_move 와 같은 가중)
+        position = Position(stones, width, height)
+        attack = threat = 0
+        best, best_score = None, -1
+        for x, y in candidate_moves(position):
+            mine, theirs = score_cell(position, x, y, color), score_cell(
+                position, x, y, enemy
+            )
+            attack, threat = max(attack, mine), max(threat, theirs)
+            if mine * 11 // 10 + theirs > best_score:
+                best, best_score = (x, y), mine * 11 // 10 + theirs
+        value = 0.9 * (attack - threat) / (attack + threat + 1)
+        return round(value, 4), "shape", best
+
+    def analyse(self, game: dict) -> GameReport:
+        """game: {"id", "record", ["black", "white", "winner"]} (load_games 형식)"""
+        final = Gomoku.from_record(game["record"]).get_state()
+        width, height, rule = final.width, final.height, final.rule
+        played = final.stones
+        over = "WIN" in final.turn
+
+        # i 번째 국면 = i 수를 둔 뒤, movers[i] 가 둘 차례
+        movers = [stone.type for stone in played]
+        movers.append(opponent(played[-1].type) if played else "BLACK")
+        stones: dict[tuple[int, int], str] = {}
+        evaluations = []
+        for i, color in enumerate(movers):
+            if i == len(played) and over:
+                # 마지막 수로 5목: 둘 차례 (진 쪽) 기준 -1
+                evaluations.append((-1.0, "five", None))
+            else:
+                evaluations.append(self.evaluate(stones, width, height, rule, color))
+            if i < len(played):
+                stones = {**stones, (played[i].x, played[i].y): played[i].type}
+        self.cache.flush()
+
+        annotations = []
+        for i, stone in enumerate(played):
+            before, _, best = evaluations[i]
+            after = -evaluations[i + 1][0]
+            kind = None
+            if before == 1.0 and after < 1.0:
+                kind = "missed_win"
+            elif before > -1.0 and after == -1.0:
+                # 상대 4 를 막아야 했는데 다른 곳에 둠 / 필승을 내줌
+                forced = evaluations[i][1] == "forced"
+                kind = "missed_block" if forced else "blunder"
+            if kind is not None:
+                annotations.append(
+                    Annotation(
+                        ply=i + 1,
+                        color=stone.type,
+                        move=(stone.x, stone.y),
+                        kind=kind,
+                        best=best,
+                    )
+                )
+
+        values = [
+            evaluation[0] if color == "BLACK" else -evaluation[0]
+            for evaluation, color in zip(evaluations, movers)
+        ]
+        flips, leader = [], None
+        for ply, value in enumerate(values):
+            side = (
+                "BLACK"
+                if value >= ADVANTAGE
+                else "WHITE" if value <= -ADVANTAGE else None
+            )
+            if side is not None and side != leader:
+                if leader is not None:
+                    flips.append({"ply": ply, "to": side})
+                leader = side
+
+        winner = final.turn.removesuffix("_WIN") if over else None
+        return GameReport(
+            id=game["id"],
+            black=game.get("black"),
+            white=game.get("white"),
+            winner=game.get("winner", winner),
+            plies=len(played),
+            annotations=annotations,
+            flips=flips,
+            values=[round(value, 2) + 0.0 for value in values],  # -0.0 없이
+        )
+
+
+# --- 입력 ---
+
+
+def load_games(paths: Iterable[str]) -> Iterator[dict]:
+    """토너먼트 결과 (.json) 나 게임 레코드 JSONL (train.py selfplay 등) 을 읽음"""
+    for path in paths:
+        name = os.path.basename(path)
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".json"):
+                for i, result in enumerate(json.load(f)["results"]):
+                    yield {
+                        "id": f"{name}:{i}",
+                        # 예전 결과 파일에는 착수 목록만 있음 (15x15)
+                        "record": result.get("record") or result["moves"],
+                        "black": result.get("black"),
+                        "white": result.get("white"),
+                        "winner": result.get("winner"),
+                    }
+                continue
+            for i, line in enumerate(line for line in f if line.strip()):
+                record = json.loads(line)
+                game = {"id": f"{name}:{i}", "record": record}
+                if "winner" in record:
+                    game["winner"] = record["winner"]
+                yield game
+
+
+# --- 병렬 분석 ---
+
+_analyser: Optional[Analyser] = None
+
+
+def _init_worker(cache_path: Optional[str], max_nodes: int) -> None:
+    global _analyser
+    _analyser = Analyser(PositionCache(cache_path), max_nodes)
+
+
+def _analyse_job(game: dict) -> GameReport:
+    return _analyser.analyse(game)
+
+
+def analyse_games(
+    games: Iterable[dict],
+    workers: int = 1,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    max_nodes: int = DEFAULT_MAX_NODES,
+) -> Iterator[GameReport]:
+    """게임들을 프로세스 풀에서 분석 (입력 순서대로 결과). 워커들은 cache_path 의 캐시를 공유"""
+    if workers <= 1:
+        analyser = Analyser(PositionCache(cache_path), max_nodes)
+        try:
+            yield from map(analyser.analyse, games)
+        finally:
+            analyser.cache.close()
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(cache_path, max_nodes),
+    ) as executor:
+        yield from executor.map(_analyse_job, games, chunksize=8)
+
+
+def summarize(reports: list[GameReport]) -> dict[str, dict[str, int]]:
+    """플레이어 (모델 id, 없으면 색) 별 주석 종류 수"""
+    summary: dict[str, dict[str, int]] = {}
+    for report in reports:
+        for annotation in report.annotations:
+            player = (
+                report.black if annotation.color == "BLACK" else report.white
+            ) or annotation.color
+            counts = summary.setdefault(
+                player, {"missed_win": 0, "missed_block": 0, "blunder": 0}
+            )
+            counts[annotation.kind] += 1
+    return summary
+
+
+# --- 출력 ---
+
+_KIND_LABELS = {"missed_win": "놓친 승리", "missed_block": "못 막음", "blunder": "패착"}
+
+
+def _sparkline(values: list[float], width: int = 240, height: int = 40) -> str:
+    """흑 기준 평가값 그래프 (위가 흑 우세)"""
+    step = width / max(len(values) - 1, 1)
+    points = " ".join(
+        f"{i * step:.1f},{(1 - value) * height / 2:.1f}"
+        for i, value in enumerate(values)
+    )
+    return (
+        f'<svg width="{width}" height="{height}">'
+        f'<line x1="0" y1="{height / 2}" x2="{width}" y2="{height / 2}" stroke="#ccc"/>'
+        f'<polyline points="{points}" fill="none" stroke="#333"/></svg>'
+    )
+
+
+def render_html(reports: list[GameReport]) -> str:
+    rows = []
+    for report in reports:
+        notes = "<br>".join(
+            f"{a.ply}. {a.color[0]} {a.move} {_KIND_LABELS[a.kind]}"
+            + (f" (→ {a.best})" if a.best else "")
+            for a in report.annotations
+        )
+        flips = ", ".join(f"{flip['ply']}→{flip['to'][0]}" for flip in report.flips)
+        cells = [
+            report.id,
+            report.black or "",
+            report.white or "",
+            report.winner or "DRAW",
+            str(report.plies),
+        ]
+        rows.append(
+            "<tr>"
+            + "".join(f"<td>{html.escape(cell)}</td>" for cell in cells)
+            + f"<td>{html.escape(notes).replace('&lt;br&gt;', '<br>')}</td>"
+            + f"<td>{html.escape(flips)}</td><td>{_sparkline(report.values)}</td></tr>"
+        )
+    header = "".join(
+        f"<th>{name}</th>"
+        for name in ("게임", "흑", "백", "승자", "수", "주석", "우세 전환", "흑 평가")
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Gomoku 분석</title>'
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ddd;padding:4px;vertical-align:top}</style></head>"
+        f"<body><table><tr>{header}</tr>{''.join(rows)}</table></body></html>"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="대국 기록 일괄 분석 (패착 / 놓친 승리 / 우세 전환)"
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help="토너먼트 결과 .json / 게임 레코드 .jsonl"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--cache", default=DEFAULT_CACHE_PATH, help="공유 국면 캐시 (SQLite)"
+    )
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--html", help="HTML 보고서 경로")
+    args = parser.parse_args(argv)
+
+    cache_path = None if args.no_cache else args.cache
+    reports = []
+    for report in analyse_games(
+        load_games(args.inputs), args.workers, cache_path, args.max_nodes
+    ):
+        reports.append(report)
+        if len(reports) % 100 == 0:
+            logger.info("🔍 %d 게임 분석", len(reports))
+
+    summary = summarize(reports)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "summary": summary,
+                "games": [
+                    report.model_dump(exclude_defaults=True) for report in reports
+                ],
+            },
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    logger.info("💾 분석 결과 저장: %s (%d 게임)", args.output, len(reports))
+    if args.html:
+        with open(args.html, "w", encoding="utf-8") as f:
+            f.write(render_html(reports))
+        logger.info("💾 HTML 보고서: %s", args.html)
+    for player, counts in summary.items():
+        print(f"{player:<40} {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
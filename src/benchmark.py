@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+from typing import Callable, Optional
+
+from fastmcp import Client
+
+from game.gomoku import Gomoku
+from game.heuristic import Position, score_cell, FIVE_SCORE
+from mcp_server.server import create_mcp_server
+from schema import WIDTH, HEIGHT
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+
+
+# --- 국면 생성 ---
+def random_game(num_stones: int, seed: int = 0) -> Gomoku:
+    """아무도 5목을 만들지 않도록 무작위로 num_stones 개를 둔 게임
+
+    돌을 많이 두면 보드가 거의 가득 찬 (수가 긴) 대국이 됨
+    """
+    rng = random.Random(seed)
+    game = Gomoku()
+    cells = [(x, y) for y in range(HEIGHT) for x in range(WIDTH)]
+    rng.shuffle(cells)
+
+    while len(game.get_state().stones) < num_stones:
+        state = game.get_state()
+        position = Position.from_state(state)
+        for i, (x, y) in enumerate(cells):
+            if score_cell(position, x, y, state.turn) < FIVE_SCORE:
+                game.set_stone(x, y)
+                cells.pop(i)
+                break
+        else:
+            break  # 더 이상 5목 없이 둘 곳이 없음
+    return game
+
+
+POSITIONS = {
+    "empty": 0,
+    "midgame": 40,
+    "long_game": 120,
+    "near_full": 200,
+}
+
+
+# --- 측정 ---
+def _summarize(samples: list[float], repeat: int, number: int) -> dict:
+    return {
+        "min_us": min(samples),
+        "median_us": statistics.median(samples),
+        "mean_us": statistics.fmean(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int, number: int) -> dict:
+    """fn 을 number 번 실행하는 것을 repeat 번 반복해서 1회당 시간(마이크로초) 통계"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+    return _summarize(samples, repeat, number)
+
+
+async def measure_async(fn, repeat: int, number: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+    return _summarize(samples, repeat, number)
+
+
+# --- 벤치마크 ---
+def bench_core(repeat: int, number: int) -> dict:
+    results = {}
+
+    # 한 판 전체를 두는 비용 (set_stone + _check_win + history 복사)
+    moves = [(s.x, s.y) for s in random_game(POSITIONS["near_full"]).get_state().stones]
+
+    def play_full_game():
+        game = Gomoku()
+        for x, y in moves:
+            game.set_stone(x, y)
+
+    results["set_stone/full_game"] = measure(
+        play_full_game, repeat, max(1, number // 100)
+    )
+
+    # LLM 턴마다 visualize 를 부르는 패턴 (착수 후 렌더링)
+    def play_and_render():
+        game = Gomoku()
+        for x, y in moves:
+            game.set_stone(x, y)
+            game.visualize_board()
+
+    results["visualize_board/per_move"] = measure(
+        play_and_render, repeat, max(1, number // 100)
+    )
+
+    for name, num_stones in POSITIONS.items():
+        game = random_game(num_stones)
+        state = game.get_state()
+        last = state.stones[-1] if state.stones else None
+
+        results[f"get_valid_moves/{name}"] = measure(
+            game.get_valid_moves, repeat, number
+        )
+        results[f"visualize_board/{name}"] = measure(
+            game.visualize_board, repeat, number
+        )
+        results[f"get_history/{name}"] = measure(
+            lambda: [s.model_dump() for s in game.get_history()],
+            repeat,
+            max(1, number // 100),
+        )
+        results[f"model_dump/{name}"] = measure(state.model_dump, repeat, number)
+        if last is not None:
+            results[f"_check_win/{name}"] = measure(
+                lambda: game._check_win(last.x, last.y), repeat, number
+            )
+
+    return results
+
+
+async def bench_mcp(repeat: int, number: int) -> dict:
+    """in-process fastmcp.Client 를 통한 도구 호출 (직렬화 포함 end-to-end)"""
+    results = {}
+    for name in ("midgame", "near_full"):
+        game = random_game(POSITIONS[name])
+        async with Client(create_mcp_server(game)) as client:
+            for tool in ("get_state", "visualize", "get_valid_moves", "get_turn"):
+                results[f"mcp.{tool}/{name}"] = await measure_async(
+                    lambda: client.call_tool(tool), repeat, number
+                )
+            results[f"mcp.get_history/{name}"] = await measure_async(
+                lambda: client.call_tool("get_history"), repeat, max(1, number // 10)
+            )
+
+    # set_stone: 매번 새 게임에서 한 수 (restart 포함)
+    game = Gomoku()
+    async with Client(create_mcp_server(game)) as client:
+
+        async def restart_and_move():
+            await client.call_tool("restart")
+            await client.call_tool("set_stone", {"x": 7, "y": 7, "turn": "BLACK"})
+
+        results["mcp.restart+set_stone/empty"] = await measure_async(
+            restart_and_move, repeat, number
+        )
+    return results
+
+
+def bench_startup(repeat: int) -> dict:
+    """새 프로세스에서 모듈 import 시간 (콜드 스타트)"""
+    results = {}
+    for module in ("gui", "manager", "mcp_server.server"):
+        results[f"startup/import_{module}"] = measure(
+            lambda: subprocess.run(
+                [sys.executable, "-c", f"import {module}"],
+                check=True,
+                env={**os.environ, "OPENROUTER_API_KEY": "benchmark"},
+            ),
+            repeat,
+            1,
+        )
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """baseline 대비 최솟값(min)이 threshold 비율 이상 느려진 항목"""
+    lines = []
+    for name, result in sorted(current.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        change = result["min_us"] / base["min_us"] - 1.0
+        marker = "🔴" if change > threshold else ("🟢" if change < -threshold else "  ")
+        lines.append(
+            f"{marker} {name:<40} {base['min_us']:>10.1f} -> "
+            f"{result['min_us']:>10.1f} us ({change:+.1%})"
+        )
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gomoku 코어 / MCP 도구 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument(
+        "--only", choices=["core", "mcp", "startup"], help="일부만 실행"
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="회귀로 볼 느려짐 비율"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.only in (None, "core"):
+        results.update(bench_core(args.repeat, args.number))
+    if args.only in (None, "mcp"):
+        results.update(asyncio.run(bench_mcp(args.repeat, args.number)))
+    if args.only in (None, "startup"):
+        results.update(bench_startup(args.repeat))
+
+    for name, result in results.items():
+        print(
+            f"{name:<40} {result['median_us']:>10.1f} us (min {result['min_us']:.1f})"
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created_at": time.time(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"💾 결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        lines = compare(results, baseline, args.threshold)
+        print("\n".join(lines))
+        if any(line.startswith("🔴") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
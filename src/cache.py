@@ -0,0 +1,155 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from pydantic import BaseModel
+
+from schema import GomokuState
+
+DEFAULT_CACHE_PATH = "move_cache.sqlite3"
+DEFAULT_TTL = 7 * 24 * 60 * 60  # 7일
+DEFAULT_MAX_ENTRIES = 10_000
+
+_CELL_CODES = {None: ".", "BLACK": "B", "WHITE": "W"}
+
+
+class CachedMove(BaseModel):
+    x: int
+    y: int
+    response: Optional[str] = None
+
+
+def prompt_version(*prompts: str) -> str:
+    """프롬프트 내용으로부터 캐시 버전 문자열 생성 (프롬프트가 바뀌면 캐시가 무효화됨)"""
+    digest = hashlib.sha256("\x00".join(prompts).encode("utf-8")).hexdigest()
+    return digest[:12]
+
+
+def canonical_position(state: GomokuState) -> str:
+    """돌을 둔 순서와 무관하게 같은 국면이면 같은 문자열을 반환
+
+    규칙 / 오프닝 / Swap2 선택 상태도 포함 (같은 돌이라도 규칙이 다르면 다른 수가 합법)
+    """
+    choices = "+".join(state.swap_choices)
+    game = f"{state.rule}:{state.opening}:{state.pending_choice}:{choices}"
+    if state.board is None:
+        # 큰 / 무한 보드: 보드 크기 + 정렬한 돌 좌표
+        stones = sorted(
+            (stone.y, stone.x, _CELL_CODES[stone.type]) for stone in state.stones
+        )
+        cells = ",".join(f"{x}.{y}{code}" for y, x, code in stones)
+        return f"{state.turn}:{state.width}x{state.height}:{cells}|{game}"
+    rows = ("".join(_CELL_CODES[cell] for cell in row) for row in state.board)
+    return f"{state.turn}:" + "/".join(rows) + f"|{game}"
+
+
+class MoveCache:
+    """(모델, 국면, 프롬프트 버전) 별 LLM 착수 결과를 저장하는 SQLite 캐시
+
+    - ttl: 저장 후 경과 시간(초)이 ttl 을 넘은 항목은 무효 (None 이면 만료 없음)
+    - max_entries: 항목 수가 이를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS moves (
+                key TEXT PRIMARY KEY,
+                x INTEGER NOT NULL,
+                y INTEGER NOT NULL,
+                response TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS moves_accessed_at ON moves (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, state: GomokuState, version: str) -> str:
+        raw = f"{model}\x00{version}\x00{canonical_position(state)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedMove]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT x, y, response, created_at FROM moves WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            x, y, response, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM moves WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE moves SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return CachedMove(x=x, y=y, response=response)
+
+    def put(self, key: str, move: CachedMove) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO moves (key, x, y, response, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, move.x, move.y, move.response, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM moves WHERE created_at < ?", (now - self.ttl,)
+            )
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM moves").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM moves WHERE key IN (
+                    SELECT key FROM moves ORDER BY accessed_at ASC, rowid ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM moves").fetchone()
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM moves")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -2,7 +2,7 @@ import os
 import sys
 import json
 import asyncio
-import requests
+import logging
 
 from openai import OpenAI
 
@@ -11,14 +11,16 @@ from mcp_server.client import get_mcp_client
 from schema import GomokuState
 from utils import *
 from prompts.system_prompt import SYSTEM_PROMPT
+from log import get_logger, setup_logging
 
 # --- 설정 ---
+logger = get_logger("cli")
 API_URL = "http://127.0.0.1:8000/api/state"
 
 # 1. OpenRouter API 키 설정
 api_key = os.environ.get("OPENROUTER_API_KEY")
 if not api_key:
-    print("❌ 오류: OPENROUTER_API_KEY 환경 변수가 설정되지 않았습니다.")
+    logger.error("❌ 오류: OPENROUTER_API_KEY 환경 변수가 설정되지 않았습니다.")
     sys.exit(1)
 
 openrouter_client = OpenAI(
@@ -33,23 +35,22 @@ async def run_gomoku_agent():
     """OpenRouter와 FastMCP를 사용하여 오목 게임을 플레이하는 에이전트"""
 
     mcp_client = get_mcp_client()
-    print(f"✅ Gomoku 서버 프로세스를 생성했습니다.")
+    logger.info("✅ Gomoku 서버 프로세스를 생성했습니다.")
 
     async with mcp_client:
 
-        print(f"✅ Gomoku 웹 서버를 생성했습니다.")
+        logger.info("✅ Gomoku 웹 서버를 생성했습니다.")
 
         # MCP 도구 목록 가져오기
-        mcp_tools_raw = await mcp_client.list_tools()
-        gomoku_tools = [to_openrouter_schema(tool) for tool in mcp_tools_raw]
-
-        print("\n" + "=" * 60)
-        print("🔧 OpenAI 형식으로 변환된 도구 목록:")
-        print("=" * 60)
-        for i, tool in enumerate(gomoku_tools, 1):
-            print(f"\n[도구 {i}]")
-            print(json.dumps(tool, indent=2, ensure_ascii=False))
-        print("=" * 60)
+        gomoku_tools = (await load_tool_schemas(mcp_client)).select()
+
+        logger.info("🔧 OpenAI 형식으로 변환된 도구 %d개", len(gomoku_tools))
+        # 도구 스키마 덤프는 DEBUG 일 때만 직렬화
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, tool in enumerate(gomoku_tools, 1):
+                logger.debug(
+                    "[도구 %d] %s", i, json.dumps(tool, indent=2, ensure_ascii=False)
+                )
 
         print("\n==============================================")
         print(f"   Gomoku AI Agent (Model: {MODEL_NAME})   ")
@@ -86,7 +87,7 @@ async def run_gomoku_agent():
                 )
 
                 if not response or not response.choices:
-                    print("❌ API 응답이 비어있습니다.")
+                    logger.error("❌ API 응답이 비어있습니다.")
                     messages.pop()
                     continue
 
@@ -100,7 +101,9 @@ async def run_gomoku_agent():
                         function_name = tool_call.function.name
                         function_args = json.loads(tool_call.function.arguments)
 
-                        print(f"⚡️ Calling function: {function_name}({function_args})")
+                        logger.info(
+                            "⚡️ Calling function: %s(%s)", function_name, function_args
+                        )
 
                         try:
                             # MCP Tool 실행
@@ -109,7 +112,7 @@ async def run_gomoku_agent():
                             )
 
                         except Exception as e:
-                            print(f"    - Function call error: {e}")
+                            logger.warning("    - Function call error: %s", e)
                             function_response = f"Error executing function: {e}"
 
                         messages.append(
@@ -128,7 +131,7 @@ async def run_gomoku_agent():
                     )
 
                     if not second_response or not second_response.choices:
-                        print("❌ 두 번째 API 응답이 비어있습니다.")
+                        logger.error("❌ 두 번째 API 응답이 비어있습니다.")
                         continue
 
                     final_response = second_response.choices[0].message.content
@@ -145,13 +148,11 @@ async def run_gomoku_agent():
                     print(f"🤖 Agent: {final_response}")
 
             except Exception as e:
-                print(f"❌ API 호출 중 오류 발생: {e}")
-                import traceback
-
-                traceback.print_exc()
+                logger.exception("❌ API 호출 중 오류 발생: %s", e)
                 if messages and messages[-1]["role"] == "user":
                     messages.pop()
 
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(run_gomoku_agent())
@@ -0,0 +1,502 @@
+import json
+import time
+import struct
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from metrics import WS_SEND_SECONDS, WS_COALESCED, WS_DISCONNECTS, WS_BROADCAST
+from log import get_logger
+
+logger = get_logger(__name__)
+
+# 연결마다 보내지 못하고 쌓아 둘 수 있는 최대 메시지 수 (넘으면 멈춘 클라이언트로 보고 끊음)
+DEFAULT_MAX_PENDING = 64
+# 메시지 하나를 보내는 데 이보다 오래 걸리면 멈춘 클라이언트로 보고 끊음 (초)
+DEFAULT_SEND_TIMEOUT = 10.0
+# 멈춘 클라이언트를 끊을 때의 close code (1013: Try Again Later)
+STALLED_CLOSE_CODE = 1013
+# 서버가 ping 을 보내는 간격, 이 시간 동안 아무것도 받지 못하면 끊음 (초)
+DEFAULT_HEARTBEAT_INTERVAL = 20.0
+DEFAULT_HEARTBEAT_TIMEOUT = 60.0
+# 연결마다 동시에 진행 중 (게임 잠금 대기 포함) 일 수 있는 작업 수
+DEFAULT_MAX_ACTIONS = 4
+# 응답 없는 클라이언트를 끊을 때의 close code (1001: Going Away)
+IDLE_CLOSE_CODE = 1001
+# 잘못된 요청 (모르는 게임 / 잘못된 인자) 을 거절할 때의 close code (1008: Policy Violation)
+REJECTED_CLOSE_CODE = 1008
+# 관전 허브가 늦게 들어온 관전자를 위해 들고 있는 최근 이벤트 수 (넘으면 전체 상태부터 보냄)
+DEFAULT_BACKLOG = 256
+
+# --- 바이너리 보드 프레임 ---
+# 헤더 (big-endian): 프레임 종류, 메시지 타입, 차례, 예약, 가로, 세로 (무한 보드면 0), 돌 수
+# 돌마다: x, y (int16, 무한 보드는 음수 좌표), 색 (1 흑 / 2 백)
+# 필드 범위를 넘는 보드 (아주 큰 보드 / 멀리 떨어진 좌표) 는 JSON 으로 보냄
+FRAME_BOARD = 1
+_HEADER = struct.Struct(">BBBBHHH")
+_STONE = struct.Struct(">hhB")
+FRAME_TYPES = ("state", "stone_placed", "ai_response", "response", "cancelled", "move")
+FRAME_TURNS = ("BLACK", "WHITE", "BLACK_WIN", "WHITE_WIN")
+_STONE_CODES = {"BLACK": 1, "WHITE": 2}
+_STONE_NAMES = {code: name for name, code in _STONE_CODES.items()}
+
+
+def encode_board(message_type: str, state: dict) -> Optional[bytes]:
+    """GomokuState.model_dump() 를 바이너리 보드 프레임으로 (15x15 JSON 보드의 약 1/10 이하)
+
+    크기 / 좌표가 프레임 필드 범위를 넘으면 None (호출한 쪽은 JSON 으로 보냄)
+    """
+    stones = state["stones"]
+    try:
+        header = _HEADER.pack(
+            FRAME_BOARD,
+            FRAME_TYPES.index(message_type),
+            FRAME_TURNS.index(state["turn"]),
+            0,
+            state.get("width") or 0,
+            state.get("height") or 0,
+            len(stones),
+        )
+        return header + b"".join(
+            _STONE.pack(stone["x"], stone["y"], _STONE_CODES[stone["type"]])
+            for stone in stones
+        )
+    except struct.error:
+        return None
+
+
+def decode_board(frame: bytes) -> tuple[str, dict]:
+    """encode_board 의 역 (메시지 타입, {"turn", "width", "height", "stones"})"""
+    kind, message_type, turn, _, width, height, count = _HEADER.unpack_from(frame)
+    if kind != FRAME_BOARD:
+        raise ValueError(f"Unknown frame kind: {kind}")
+    stones = [
+        {"x": x, "y": y, "type": _STONE_NAMES[color]}
+        for x, y, color in _STONE.iter_unpack(frame[_HEADER.size :])
+    ]
+    if len(stones) != count:
+        raise ValueError("Truncated board frame")
+    state = {
+        "turn": FRAME_TURNS[turn],
+        "width": width or None,
+        "height": height or None,
+        "stones": stones,
+    }
+    return FRAME_TYPES[message_type], state
+
+
+# --- 연결별 송신 큐 ---
+
+
+class Frame:
+    """한 번 직렬화해 여러 연결이 함께 쓰는 메시지
+
+    JSON 텍스트와 바이너리 프레임은 처음 필요할 때 한 번만 만듦 (관전자 수와 무관)
+    """
+
+    __slots__ = ("payload", "_text", "_data")
+
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+        self._text: Optional[str] = None
+        self._data: Optional[bytes] = None
+
+    @property
+    def type(self) -> str:
+        return self.payload.get("type", "unknown")
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = json.dumps(self.payload)
+        return self._text
+
+    def data(self) -> Optional[bytes]:
+        """보드 프레임 ("state" 는 전체, "move" 는 새 돌만), 보드가 없거나 담을 수 없으면 None"""
+        board = self.payload.get("state") or self.payload.get("delta")
+        if board is None or self.type not in FRAME_TYPES:
+            return None
+        if self._data is None:
+            # b"": 바이너리로 담을 수 없음 (다시 시도하지 않도록 기억)
+            self._data = encode_board(self.type, board) or b""
+        return self._data or None
+
+
+def _message_type(payload) -> str:
+    if isinstance(payload, Frame):
+        return payload.type
+    return payload.get("type", "unknown")
+
+
+class Outbox:
+    """웹소켓 연결 하나의 송신 큐
+
+    - 핸들러는 send() 로 넣기만 하고 (기다리지 않음) 전송은 run() 태스크가 따로 함
+    - 같은 key 로 아직 보내지 않은 메시지가 있으면 새 메시지로 바꿔 끼움 (낡은 보드 상태는 보내지 않음)
+    - 쌓인 메시지가 max_pending 을 넘거나 전송 하나가 send_timeout 을 넘으면 끊음
+    - binary=True 면 보드 상태는 바이너리 프레임으로, 나머지는 상태를 뺀 JSON 으로 보냄
+    - Frame 은 이미 직렬화된 텍스트 / 바이너리를 그대로 보냄 (관전 방송)
+    """
+
+    def __init__(
+        self,
+        websocket,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        send_timeout: Optional[float] = DEFAULT_SEND_TIMEOUT,
+        binary: bool = False,
+    ) -> None:
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.binary = binary
+        self.closed = False
+        self.sent = 0
+        self.coalesced = 0
+        # [key, payload] (바꿔 끼울 수 있도록 list)
+        self._pending: deque[list] = deque()
+        self._keyed: dict[str, list] = {}
+        self._ready = asyncio.Event()
+        self._closing: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def send(self, payload: dict | Frame, key: Optional[str] = None) -> bool:
+        """보낼 메시지를 넣음. 이미 닫혔거나 넘쳐서 끊었으면 False"""
+        if self.closed:
+            return False
+        entry = self._keyed.get(key) if key is not None else None
+        if entry is not None:
+            entry[1] = payload
+            self.coalesced += 1
+            WS_COALESCED.inc(type=_message_type(payload))
+            return True
+        if len(self._pending) >= self.max_pending:
+            self._stall("queue full")
+            return False
+        entry = [key, payload]
+        self._pending.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self._ready.set()
+        return True
+
+    async def run(self) -> None:
+        """큐가 닫힐 때까지 차례로 전송 (연결마다 태스크 하나)"""
+        while True:
+            while not self._pending:
+                if self.closed:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+            key, payload = self._pending.popleft()
+            if key is not None:
+                del self._keyed[key]
+            try:
+                # wait_for 는 전송이 끝나는 순간 온 취소를 잃어버릴 수 있음 (3.11)
+                async with asyncio.timeout(self.send_timeout):
+                    await self._write(payload)
+            except TimeoutError:
+                self._stall("send timeout")
+                return
+            except Exception:
+                # 연결이 끊김: 남은 메시지는 버림
+                self.closed = True
+                self._pending.clear()
+                self._keyed.clear()
+                return
+            self.sent += 1
+
+    async def _write(self, payload: dict | Frame) -> None:
+        message_type = _message_type(payload)
+        with WS_SEND_SECONDS.time(type=message_type):
+            if isinstance(payload, Frame):
+                data = payload.data() if self.binary else None
+                if data is not None:
+                    await self.websocket.send_bytes(data)
+                else:
+                    await self.websocket.send_text(payload.text())
+                return
+            data = None
+            if self.binary and payload.get("state") and message_type in FRAME_TYPES:
+                data = encode_board(message_type, payload["state"])
+            if data is not None:
+                await self.websocket.send_bytes(data)
+                payload = {
+                    key: value for key, value in payload.items() if key != "state"
+                }
+                if len(payload) == 1:
+                    # 상태만 있는 메시지 ("state")
+                    return
+            await self.websocket.send_text(json.dumps(payload))
+
+    def _stall(self, reason: str) -> None:
+        logger.warning(
+            "🐢 느린 클라이언트 연결 끊음: %s (대기 %d)", reason, len(self._pending)
+        )
+        WS_DISCONNECTS.inc(reason=reason)
+        self.closed = True
+        self._pending.clear()
+        self._keyed.clear()
+        self._ready.set()
+        self._closing = asyncio.ensure_future(self._close(STALLED_CLOSE_CODE))
+
+    async def _close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """더 받지 않고, 남은 메시지를 다 보낸 뒤 run() 이 끝나도록 함"""
+        self.closed = True
+        self._ready.set()
+
+
+# --- 연결별 수신 루프 ---
+
+# 게임마다 잠금 하나: 같은 게임의 착수 / AI 차례 / 채팅은 연결이 달라도 한 번에 하나씩
+_game_locks: dict[str, asyncio.Lock] = {}
+
+
+def game_lock(game_id: str) -> asyncio.Lock:
+    lock = _game_locks.get(game_id)
+    if lock is None:
+        lock = _game_locks[game_id] = asyncio.Lock()
+    return lock
+
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+class Session:
+    """웹소켓 연결 하나의 수신 루프
+
+    - 받은 메시지마다 바로 응답하는 제어 메시지: "ping" (→ "pong"), "pong", "cancel"
+    - 나머지 action 은 handlers 의 코루틴을 작업 태스크로 실행 (게임 잠금 안에서)
+      그동안에도 수신 루프는 계속 돌아 취소 / ping 을 처리함
+    - "cancel" 은 이 연결의 진행 중 / 대기 중 작업을 모두 취소하고 "cancelled" 를 보냄
+    - heartbeat_interval 마다 "ping" 을 보내고, heartbeat_timeout 동안 아무것도 받지 못하면 끊음
+    """
+
+    def __init__(
+        self,
+        websocket,
+        outbox: Outbox,
+        handlers: dict[str, Handler],
+        lock: asyncio.Lock,
+        snapshot: Optional[Callable[[], Awaitable[dict]]] = None,
+        max_actions: int = DEFAULT_MAX_ACTIONS,
+        heartbeat_interval: Optional[float] = DEFAULT_HEARTBEAT_INTERVAL,
+        heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+    ) -> None:
+        self.websocket = websocket
+        self.outbox = outbox
+        self.handlers = handlers
+        self.lock = lock
+        # 취소 뒤 클라이언트에 보낼 현재 상태 ("cancelled" 메시지에 합칠 필드, 예: {"state": ...})
+        self.snapshot = snapshot
+        self.max_actions = max_actions
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.last_seen = time.monotonic()
+        self._actions: set[asyncio.Task] = set()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._actions)
+
+    async def run(self) -> None:
+        """연결이 끊길 때까지 수신 (끝나면 남은 작업은 취소)"""
+        heartbeat = None
+        if self.heartbeat_interval:
+            heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self.outbox.closed:
+                text = await self.websocket.receive_text()
+                self.last_seen = time.monotonic()
+                try:
+                    message = json.loads(text)
+                except ValueError as e:
+                    # 잘못된 프레임 하나로 연결 (과 게임 잠금) 을 잃지 않도록 오류만 알림
+                    self.outbox.send({"type": "error", "error": f"Invalid JSON: {e}"})
+                    continue
+                if not isinstance(message, dict):
+                    self.outbox.send(
+                        {"type": "error", "error": "Message must be a JSON object"}
+                    )
+                    continue
+                self.dispatch(message)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            for task in list(self._actions):
+                task.cancel()
+
+    def dispatch(self, message: dict) -> None:
+        action = message.get("action")
+        if action == "ping":
+            self.outbox.send({"type": "pong", "t": message.get("t")})
+        elif action == "pong":
+            pass
+        elif action == "cancel":
+            self.cancel()
+        elif action in self.handlers:
+            if len(self._actions) >= self.max_actions:
+                self.outbox.send({"type": "busy", "action": action})
+                return
+            task = asyncio.create_task(self._perform(action, message))
+            self._actions.add(task)
+            task.add_done_callback(self._actions.discard)
+        else:
+            self.outbox.send({"type": "error", "error": f"Unknown action: {action}"})
+
+    def cancel(self) -> int:
+        """진행 중 / 대기 중 작업을 모두 취소, 취소한 수"""
+        tasks = [task for task in self._actions if not task.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    async def _perform(self, action: str, message: dict) -> None:
+        try:
+            async with self.lock:
+                await self.handlers[action](message)
+        except asyncio.CancelledError:
+            logger.info("⏹️ 작업 취소: %s", action)
+            payload = {"type": "cancelled", "action": action}
+            if self.snapshot is not None:
+                payload.update(await self.snapshot())
+            self.outbox.send(payload, key="cancelled")
+        except Exception as e:
+            logger.exception("❌ 작업 오류 (%s): %s", action, e)
+            self.outbox.send({"type": "error", "action": action, "error": str(e)})
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if time.monotonic() - self.last_seen > self.heartbeat_timeout:
+                logger.warning("💤 응답 없는 클라이언트 연결 끊음")
+                WS_DISCONNECTS.inc(reason="heartbeat timeout")
+                self.outbox.close()
+                await self.websocket.close(code=IDLE_CLOSE_CODE)
+                return
+            self.outbox.send({"type": "ping", "t": time.time()}, key="ping")
+
+
+# --- 관전 방송 ---
+
+
+class Broadcast:
+    """게임 하나의 관전 허브 (읽기 전용 구독자 여럿에게 보드 변화를 뿌림)
+
+    - publish() 는 이전 상태와 비교해 새 돌만 담은 "move" 이벤트를 한 번 직렬화해
+      모든 구독자의 송신 큐에 같은 Frame 으로 넣음 (돌이 줄거나 규칙이 바뀌면 전체 "state")
+    - 새 구독자는 현재 상태 스냅샷 (seq 마다 한 번 직렬화) 을 받은 뒤 이어지는 이벤트를 받음
+    - since (마지막으로 받은 seq) 를 주면 최근 backlog 개 안에서는 빠진 이벤트만 다시 보냄
+    - 큐가 넘친 느린 관전자는 Outbox 가 끊음 (since 로 다시 붙으면 됨)
+    """
+
+    def __init__(self, backlog: int = DEFAULT_BACKLOG) -> None:
+        self.seq = 0
+        self.subscribers: set[Outbox] = set()
+        self._state: Optional[dict] = None
+        self._snapshot: Optional[Frame] = None
+        # seq 가 연속인 최근 이벤트 (맨 앞은 마지막 전체 "state" 이거나 그 뒤의 "move")
+        self._events: deque[Frame] = deque(maxlen=backlog)
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    @property
+    def state(self) -> Optional[dict]:
+        return self._state
+
+    def publish(self, state: dict) -> int:
+        """새 보드 상태 (GomokuState.model_dump()) 를 알림, 이벤트를 받은 구독자 수
+
+        이전과 같은 상태면 아무것도 보내지 않음
+        """
+        previous = self._state
+        if previous is not None and state == previous:
+            return 0
+        self.seq += 1
+        self._state = state
+        self._snapshot = None
+        if previous is not None and self._is_delta(previous, state):
+            frame = Frame(
+                {
+                    "type": "move",
+                    "seq": self.seq,
+                    "delta": {
+                        "turn": state["turn"],
+                        "width": state["width"],
+                        "height": state["height"],
+                        "stones": state["stones"][len(previous["stones"]) :],
+                    },
+                }
+            )
+        else:
+            frame = self.snapshot()
+            self._events.clear()
+        self._events.append(frame)
+
+        closed = []
+        for outbox in self.subscribers:
+            if not outbox.send(frame):
+                closed.append(outbox)
+        self.subscribers.difference_update(closed)
+        sent = len(self.subscribers)
+        WS_BROADCAST.inc(sent, type=frame.type)
+        return sent
+
+    @staticmethod
+    def _is_delta(previous: dict, state: dict) -> bool:
+        """돌이 늘기만 했고 보드 / 차례 말고는 그대로인지"""
+        known = previous["stones"]
+        if state["stones"][: len(known)] != known:
+            return False
+        return all(
+            state.get(key) == value
+            for key, value in previous.items()
+            if key not in ("stones", "board", "turn")
+        )
+
+    def snapshot(self) -> Frame:
+        """현재 상태 전체 ("state") Frame (seq 마다 한 번만 만듦)"""
+        if self._snapshot is None:
+            if self._state is None:
+                raise ValueError("Nothing has been published yet")
+            self._snapshot = Frame(
+                {"type": "state", "seq": self.seq, "state": self._state}
+            )
+        return self._snapshot
+
+    def subscribe(self, outbox: Outbox, since: Optional[int] = None) -> None:
+        """구독 시작: 빠진 이벤트 (가능하면) 또는 현재 스냅샷부터 보냄"""
+        missed = self.seq - since if since is not None else -1
+        if 0 <= missed <= len(self._events):
+            for i in range(len(self._events) - missed, len(self._events)):
+                outbox.send(self._events[i])
+        elif self._state is not None:
+            outbox.send(self.snapshot())
+        self.subscribers.add(outbox)
+
+    def unsubscribe(self, outbox: Outbox) -> None:
+        self.subscribers.discard(outbox)
+
+
+# 게임마다 관전 허브 하나 (한 프로세스 안에서 공유)
+_broadcasts: dict[str, Broadcast] = {}
+
+
+def broadcast(game_id: str) -> Broadcast:
+    """게임의 관전 허브 (없으면 만듦, 게임을 진행하는 쪽에서만 호출)"""
+    hub = _broadcasts.get(game_id)
+    if hub is None:
+        hub = _broadcasts[game_id] = Broadcast()
+    return hub
+
+
+def find_broadcast(game_id: str) -> Optional[Broadcast]:
+    """이미 있는 관전 허브 (관전자 쪽: 모르는 게임 id 로 허브를 만들지 않음)"""
+    return _broadcasts.get(game_id)
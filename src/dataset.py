@@ -0,0 +1,270 @@
+import os
+import json
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from game.gomoku import Gomoku
+from game.heuristic import Position
+from game.network import PLANES, position_planes, outcome_for
+from log import get_logger
+
+logger = get_logger(__name__)
+
+# 샤드 하나에 담는 예제 수 (15x15 기준 샤드 하나가 약 3MB)
+DEFAULT_SHARD_SIZE = 4096
+SHARD_FORMATS = ("npz", "npy")
+MANIFEST = "manifest.json"
+
+Example = tuple[np.ndarray, int, float]
+
+
+# --- 게임 레코드 → 예제 ---
+
+
+def read_records(paths: Iterable[str], part: int = 0, parts: int = 1) -> Iterator[dict]:
+    """JSONL 파일들 (한 줄에 게임 레코드 하나) 을 차례로 읽음
+
+    parts 개로 나눠 읽을 때는 part 번째 몫 (줄 번호 % parts) 만 파싱
+    """
+    line_no = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if line_no % parts == part:
+                    yield json.loads(line)
+                line_no += 1
+
+
+def game_examples(record: dict) -> Iterator[Example]:
+    """게임 레코드 하나에서 (둘 차례 기준 입력 평면, 둔 칸 index, 결과) 를 수마다"""
+    game = Gomoku.from_record(record)
+    turn = game.get_turn()
+    winner = record.get("winner", turn.removesuffix("_WIN") if "WIN" in turn else None)
+    state = game.get_state()
+    position = Position({}, state.width, state.height)
+    for stone in state.stones:
+        planes = position_planes(position, stone.type)
+        yield planes, stone.y * state.width + stone.x, outcome_for(winner, stone.type)
+        position.stones[(stone.x, stone.y)] = stone.type
+
+
+# --- 대칭 증강 ---
+
+
+def _transform(grid: np.ndarray, symmetry: int) -> np.ndarray:
+    """마지막 두 축 (y, x) 에 대칭 변환: 0~3 은 90도씩 회전, 4~7 은 좌우 뒤집은 뒤 회전"""
+    if symmetry >= 4:
+        grid = grid[..., ::-1]
+    return np.rot90(grid, symmetry % 4, axes=(-2, -1))
+
+
+def _symmetries(width: int, height: int) -> tuple[int, ...]:
+    """정사각형이면 8 가지, 아니면 크기가 바뀌지 않는 4 가지 (항등, 180도, 좌우, 상하)"""
+    return tuple(range(8)) if width == height else (0, 2, 4, 6)
+
+
+@functools.lru_cache(maxsize=None)
+def _index_map(width: int, height: int, symmetry: int) -> np.ndarray:
+    """변환 전 칸 index → 변환 후 칸 index"""
+    moved = _transform(np.arange(width * height).reshape(height, width), symmetry)
+    mapping = np.empty(width * height, dtype=np.int64)
+    mapping[moved.ravel()] = np.arange(width * height)
+    return mapping
+
+
+def augment(example: Example) -> Iterator[Example]:
+    """예제 하나를 보드 대칭 (정사각형이면 8 가지) 으로 늘림"""
+    planes, index, value = example
+    height, width = planes.shape[1:]
+    for symmetry in _symmetries(width, height):
+        yield (
+            np.ascontiguousarray(_transform(planes, symmetry)),
+            int(_index_map(width, height, symmetry)[index]),
+            value,
+        )
+
+
+def record_examples(
+    records: Iterable[dict], symmetries: bool = True
+) -> Iterator[Example]:
+    """레코드 스트림을 예제 스트림으로 (무한 보드 레코드는 건너뜀)"""
+    for record in records:
+        if record.get("width") is None:
+            logger.warning("⚠️ 무한 보드 레코드는 건너뜀")
+            continue
+        for example in game_examples(record):
+            if symmetries:
+                yield from augment(example)
+            else:
+                yield example
+
+
+# --- 샤드 ---
+
+
+class ShardWriter:
+    """예제를 보드 크기별 고정 크기 버퍼에 모아 가득 차면 샤드 파일로 씀
+
+    메모리에는 보드 크기마다 샤드 하나 분량만 있음. 샤드 안에서는 섞어서 씀
+    (한 게임의 연속된 수가 한 미니배치에 몰리지 않도록)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        prefix: str = "shard",
+        fmt: str = "npz",
+        seed: int = 0,
+    ) -> None:
+        if fmt not in SHARD_FORMATS:
+            raise ValueError(f"Unknown shard format: {fmt}")
+        if shard_size < 1:
+            raise ValueError("shard_size must be positive")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self.prefix = prefix
+        self.fmt = fmt
+        self.shards: list[dict] = []
+        self._buffers: dict[tuple[int, int], dict] = {}
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, example: Example) -> None:
+        planes, index, value = example
+        height, width = planes.shape[1:]
+        buffer = self._buffers.get((width, height))
+        if buffer is None:
+            buffer = self._buffers[(width, height)] = {
+                "planes": np.empty(
+                    (self.shard_size, PLANES, height, width), dtype=np.uint8
+                ),
+                "policy": np.empty(self.shard_size, dtype=np.int32),
+                "value": np.empty(self.shard_size, dtype=np.float32),
+                "size": 0,
+            }
+        i = buffer["size"]
+        buffer["planes"][i] = planes
+        buffer["policy"][i] = index
+        buffer["value"][i] = value
+        buffer["size"] = i + 1
+        if buffer["size"] == self.shard_size:
+            self._flush(width, height)
+
+    def extend(self, examples: Iterable[Example]) -> "ShardWriter":
+        for example in examples:
+            self.add(example)
+        return self
+
+    def close(self) -> list[dict]:
+        """남은 (크기가 덜 찬) 버퍼까지 쓰고 샤드 목록 반환"""
+        for width, height in list(self._buffers):
+            if self._buffers[(width, height)]["size"]:
+                self._flush(width, height)
+        return self.shards
+
+    def _flush(self, width: int, height: int) -> None:
+        buffer = self._buffers[(width, height)]
+        order = self._rng.permutation(buffer["size"])
+        arrays = {key: buffer[key][order] for key in ("planes", "policy", "value")}
+        name = f"{self.prefix}-{width}x{height}-{len(self.shards):05d}"
+        if self.fmt == "npz":
+            np.savez_compressed(os.path.join(self.directory, name + ".npz"), **arrays)
+        else:
+            for key, array in arrays.items():
+                np.save(os.path.join(self.directory, f"{name}.{key}.npy"), array)
+        self.shards.append(
+            {
+                "name": name,
+                "format": self.fmt,
+                "width": width,
+                "height": height,
+                "size": int(buffer["size"]),
+            }
+        )
+        buffer["size"] = 0
+
+
+def _shard_worker(job: tuple) -> list[dict]:
+    """워커 프로세스: 입력 레코드 중 자기 몫만 읽어 자기 이름의 샤드로"""
+    paths, directory, part, parts, shard_size, symmetries, fmt = job
+    writer = ShardWriter(directory, shard_size, f"part{part:03d}", fmt, seed=part)
+    records = read_records(paths, part, parts)
+    return writer.extend(record_examples(records, symmetries)).close()
+
+
+def build_shards(
+    paths: list[str],
+    directory: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    workers: int = 1,
+    symmetries: bool = True,
+    fmt: str = "npz",
+) -> list[dict]:
+    """레코드 파일들을 샤드 디렉터리로 변환하고 manifest.json 을 씀
+
+    workers 개 프로세스가 줄 번호로 입력을 나눠 각자 샤드를 씀 (서로 조율 없음)
+    """
+    jobs = [
+        (paths, directory, part, workers, shard_size, symmetries, fmt)
+        for part in range(workers)
+    ]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_shard_worker, jobs))
+    else:
+        parts = [_shard_worker(jobs[0])]
+    shards = [shard for part in parts for shard in part]
+
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"shards": shards}, f, indent=2)
+    logger.info(
+        "📦 샤드 %d개 (%d 예제): %s",
+        len(shards),
+        sum(shard["size"] for shard in shards),
+        directory,
+    )
+    return shards
+
+
+def load_shard(directory: str, shard: dict) -> dict[str, np.ndarray]:
+    """manifest 항목 하나를 읽음 (npy 형식은 memory-map 이라 필요한 행만 읽힘)"""
+    path = os.path.join(directory, shard["name"])
+    if shard["format"] == "npz":
+        with np.load(path + ".npz") as data:
+            return {key: data[key] for key in data.files}
+    return {
+        key: np.load(f"{path}.{key}.npy", mmap_mode="r")
+        for key in ("planes", "policy", "value")
+    }
+
+
+def shard_batches(
+    directory: str, batch_size: int = 64, seed: Optional[int] = 0
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """샤드 디렉터리를 (평면, one-hot 정책, 결과) 미니배치로 스트리밍
+
+    샤드 순서와 샤드 안 순서를 섞음. 메모리에는 샤드 하나만 올라옴
+    """
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+    rng = np.random.default_rng(seed)
+    for i in rng.permutation(len(shards)):
+        shard = shards[i]
+        data = load_shard(directory, shard)
+        cells = shard["width"] * shard["height"]
+        order = rng.permutation(shard["size"])
+        for start in range(0, len(order), batch_size):
+            rows = np.sort(order[start : start + batch_size])
+            policy = np.zeros((len(rows), cells), dtype=np.float32)
+            policy[np.arange(len(rows)), data["policy"][rows]] = 1.0
+            yield (
+                data["planes"][rows].astype(np.float32),
+                policy,
+                np.asarray(data["value"][rows], dtype=np.float32),
+            )
@@ -1,127 +1,276 @@
-from schema import GomokuState, Stone, WIDTH, HEIGHT, TurnTypeAll
-from typing import Optional
+from schema import (
+    GomokuState,
+    WIDTH,
+    TurnTypeAll,
+    RULE_SETS,
+    OPENINGS,
+    SWAP2_OPTIONS,
+    SWAP_OPTIONS,
+)
+from game.state import EMPTY, create_board_state
+from game.rules import board_reader, forbidden_reason, is_win
+from typing import Iterator, Optional, Union
 
 
 class Gomoku:
 
-    def __init__(self) -> None:
-        self.restart()
+    def __init__(
+        self,
+        width: Optional[int] = WIDTH,
+        height: Optional[int] = None,
+        rule: str = "freestyle",
+        opening: Optional[str] = None,
+    ):
+        self._set_rule(rule, opening)
+        self.resize(width, height)
 
     def restart(self):
-        self._state = GomokuState()
-        self._history: list[GomokuState] = [self._state.model_copy(deep=True)]
+        self._board = create_board_state(self.width, self.height)
+        self._reader = board_reader(self._board)
+        # 오프닝(swap2)에서 고른 선택들 (순서대로)
+        self._swap: list[str] = []
+        # (착수 수, 합법 수 목록): 렌주 흑 차례의 금수 판정 결과를 다음 착수 전까지 재사용
+        self._valid_cache: Optional[tuple[int, list[tuple[int, int]]]] = None
+        # 착수마다의 상태는 get_history() 를 호출할 때 착수 목록을 재생해서 만듦
+        # (_replay 는 마지막으로 기록한 상태까지 둔 게임, 다음 호출은 여기서 이어 둠)
+        self._history: list[GomokuState] = []
+        self._replay: Optional[Gomoku] = None
+        self._update_meta()
+
+    def _set_rule(self, rule: str, opening: Optional[str]) -> None:
+        if rule not in RULE_SETS:
+            raise ValueError(f"Unknown rule set: {rule}")
+        if opening is not None and opening not in OPENINGS:
+            raise ValueError(f"Unknown opening: {opening}")
+        self.rule = rule
+        self.opening = opening
+
+    def set_rule(self, rule: str, opening: Optional[str] = None) -> None:
+        """규칙 / 오프닝을 바꾸고 새 게임을 시작"""
+        self._set_rule(rule, opening)
+        self.restart()
+
+    def _update_meta(self) -> None:
+        self._board.set_meta(
+            {
+                "rule": self.rule,
+                "opening": self.opening,
+                "pending_choice": self.pending_choice(),
+                "swap_choices": list(self._swap),
+            }
+        )
+
+    def resize(self, width: Optional[int], height: Optional[int] = None) -> None:
+        """보드 크기를 바꾸고 새 게임을 시작
+
+        width 만 주면 정사각형 보드, width 가 None 이나 0 이면 좌표 제한 없는 무한 보드
+        """
+        if not width:
+            width = height = None
+        elif height is None:
+            height = width
+        if width is not None and (width < 5 or height < 5):
+            raise ValueError("Board must be at least 5x5")
+        self.width = width
+        self.height = height
+        self.restart()
+
+    @classmethod
+    def from_moves(
+        cls,
+        moves: list[tuple[int, int]],
+        width: Optional[int] = WIDTH,
+        height: Optional[int] = None,
+    ) -> "Gomoku":
+        """착수 순서대로 다시 두어 게임을 복원"""
+        game = cls(width, height)
+        for x, y in moves:
+            game._play(x, y)
+        return game
+
+    def record_meta(self) -> dict:
+        """착수 목록을 뺀 저장용 정보 (보드 크기, 기본값이 아닌 규칙 / 오프닝 선택)"""
+        meta = {"width": self.width, "height": self.height}
+        if self.rule != "freestyle":
+            meta["rule"] = self.rule
+        if self.opening is not None:
+            meta["opening"] = self.opening
+        if self._swap:
+            meta["swap"] = list(self._swap)
+        return meta
+
+    def to_record(self) -> dict:
+        """저장용 레코드 (record_meta + 착수 목록)"""
+        return {**self.record_meta(), "moves": self.get_moves()}
+
+    @classmethod
+    def from_record(cls, record: Union[dict, list]) -> "Gomoku":
+        """to_record() 결과로 복원 (착수 목록만 있는 예전 형식이면 15x15)"""
+        if isinstance(record, list):
+            return cls.from_moves(record)
+        game = cls(
+            record.get("width", WIDTH),
+            record.get("height"),
+            record.get("rule", "freestyle"),
+            record.get("opening"),
+        )
+        choices = iter(record.get("swap", ()))
+        for x, y in record["moves"]:
+            game._take_choices(choices)
+            game._play(x, y)
+        game._take_choices(choices)
+        return game
+
+    def _take_choices(self, choices: Iterator[str]) -> None:
+        """재생 중 선택을 기다리는 지점이면 저장된 선택을 적용"""
+        while self.pending_choice() is not None:
+            option = next(choices, None)
+            if option is None:
+                return
+            self.choose(option)
+
+    def pending_choice(self) -> Optional[str]:
+        """swap2 오프닝에서 기다리는 선택
+
+        - "swap2": 첫 플레이어가 3수(흑, 백, 흑)를 둔 뒤, 두 번째 플레이어가
+          black / white 로 색을 고르거나 place2 로 2수(백, 흑)를 더 둠
+        - "swap": place2 뒤 5수가 되면 첫 플레이어가 black / white 를 고름
+        """
+        if self.opening != "swap2":
+            return None
+        count, choices = len(self._board.moves), self._swap
+        if count == 3 and not choices:
+            return "swap2"
+        if count == 5 and choices == ["place2"]:
+            return "swap"
+        return None
+
+    def choose(self, option: str) -> GomokuState:
+        """오프닝 선택 (pending_choice 참고)"""
+        pending = self.pending_choice()
+        if pending is None:
+            raise ValueError("No opening choice is pending")
+        options = SWAP2_OPTIONS if pending == "swap2" else SWAP_OPTIONS
+        if option not in options:
+            raise ValueError(
+                f"Invalid choice {option!r}, expected one of {', '.join(options)}"
+            )
+        self._swap.append(option)
+        self._update_meta()
+        return self.get_state()
+
+    def get_moves(self) -> list[tuple[int, int]]:
+        """지금까지의 착수 좌표 (순서대로)"""
+        return self._board.move_list()
 
     def get_state(self) -> GomokuState:
-        return self._state
+        return self._board.to_model()
+
+    def get_state_json(self) -> str:
+        """get_state() 의 JSON 직렬화 (다음 착수 전까지 캐시)"""
+        return self._board.to_json()
+
+    def set_stone(self, x: int, y: int, turn: Optional[str] = None) -> GomokuState:
+        """turn 을 생략하면 현재 차례의 돌을 둠"""
+        self._play(x, y, turn)
+        return self.get_state()
 
-    def set_stone(self, x: int, y: int, turn: str) -> GomokuState:
-        if "WIN" in self._state.turn:
+    def _play(self, x: int, y: int, turn: Optional[str] = None) -> None:
+        board = self._board
+        if turn is None:
+            turn = board.turn
+        if "WIN" in board.turn:
             raise ValueError("Game is already over")
-        if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+        if self.pending_choice() is not None:
+            raise ValueError("Waiting for the swap2 color choice")
+        if not board.in_bounds(x, y):
             raise ValueError("Coordinates out of bounds")
-        if self._state.board[y][x] is not None:
+        if board.code_at(x, y) != EMPTY:
             raise ValueError("Cell is already occupied")
-        if self._state.turn != turn:
+        if board.turn != turn:
             raise ValueError(f"It is not {turn}'s turn.")
+        if self.rule == "renju" and turn == "BLACK":
+            reason = forbidden_reason(self._reader, x, y)
+            if reason is not None:
+                raise ValueError(
+                    f"Forbidden move for BLACK under renju rules: {reason}"
+                )
 
-        stone_type: TurnType = turn
-        stone = Stone(x=x, y=y, type=stone_type)
-        self._state.stones.append(stone)
-        self._state.board[y][x] = stone_type
-
+        board.place(x, y, turn, "WHITE" if turn == "BLACK" else "BLACK")
         if self._check_win(x, y):
-            self._state.turn = f"{stone_type}_WIN"
-        else:
-            self._state.turn = "WHITE" if self._state.turn == "BLACK" else "BLACK"
-
-        self._history.append(self._state.model_copy(deep=True))
-        return self._state
+            board.turn = f"{turn}_WIN"
+        if self.opening is not None:
+            self._update_meta()
 
     def get_history(self) -> list[GomokuState]:
+        """착수마다의 상태 목록 (처음 요청할 때 재생해서 만들고, 이후에는 새 착수분만 이어 둠)"""
+        if self._replay is None:
+            self._replay = Gomoku(self.width, self.height, self.rule, self.opening)
+            self._history.append(self._replay.get_state())
+        done = len(self._history) - 1
+        if done < len(self._board.moves):
+            replay = self._replay
+            choices = iter(self._swap[len(replay._swap) :])
+            for x, y in self._board.move_list()[done:]:
+                replay._take_choices(choices)
+                replay._play(x, y)
+                self._history.append(replay.get_state())
         return self._history
 
     def get_valid_moves(self) -> list[tuple[int, int]]:
-        """Gets a list of valid moves (empty cells)."""
-        valid_moves = []
-        for y in range(HEIGHT):
-            for x in range(WIDTH):
-                if self._state.board[y][x] is None:
-                    valid_moves.append((x, y))
-        return valid_moves
+        """Gets a list of valid moves (empty cells).
+
+        On large or unbounded boards only cells near existing stones are listed.
+        Under renju rules BLACK's forbidden moves are excluded, and nothing is
+        valid while a swap2 choice is pending.
+        """
+        if self.pending_choice() is not None:
+            return []
+        if self.rule != "renju" or self._board.turn != "BLACK":
+            return self._board.empty_cells()
+
+        count = len(self._board.moves)
+        if self._valid_cache is None or self._valid_cache[0] != count:
+            reader = self._reader
+            moves = [
+                (x, y)
+                for x, y in self._board.empty_cells()
+                if forbidden_reason(reader, x, y) is None
+            ]
+            self._valid_cache = (count, moves)
+        return list(self._valid_cache[1])
+
+    def get_forbidden_moves(self) -> dict[tuple[int, int], str]:
+        """렌주 규칙에서 흑 차례일 때 금수 자리와 이유"""
+        if self.rule != "renju" or self._board.turn != "BLACK":
+            return {}
+        reader = self._reader
+        forbidden = {}
+        for x, y in self._board.empty_cells():
+            reason = forbidden_reason(reader, x, y)
+            if reason is not None:
+                forbidden[(x, y)] = reason
+        return forbidden
 
     def get_turn(self) -> TurnTypeAll:
         """Gets the current turn (BLACK, WHITE, BLACK_WIN, WHITE_WIN)."""
-        return self._state.turn
+        return self._board.turn
 
     def _check_win(self, x: int, y: int) -> bool:
-        stone_type: Optional[TurnType] = self._state.board[y][x]
-        if stone_type is None:
+        code = self._board.code_at(x, y)
+        if code == EMPTY:
             return False
-
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
-        for dx, dy in directions:
-            count = 1
-            # Check in the positive direction
-            for i in range(1, 5):
-                nx, ny = x + i * dx, y + i * dy
-                if (
-                    0 <= nx < WIDTH
-                    and 0 <= ny < HEIGHT
-                    and self._state.board[ny][nx] == stone_type
-                ):
-                    count += 1
-                else:
-                    break
-            # Check in the negative direction
-            for i in range(1, 5):
-                nx, ny = x - i * dx, y - i * dy
-                if (
-                    0 <= nx < WIDTH
-                    and 0 <= ny < HEIGHT
-                    and self._state.board[ny][nx] == stone_type
-                ):
-                    count += 1
-                else:
-                    break
-            if count >= 5:
-                return True
-        return False
+        return is_win(self._reader, x, y, code, self.rule)
 
     # --- 추가된 메서드 ---
-    def visualize_board(self) -> str:
+    def visualize_board(
+        self, style: str = "default", highlight_last: bool = False
+    ) -> str:
         """
         현재 게임 보드를 텍스트 형식의 문자열로 생성합니다.
-        ●: 검은 돌
-        ○: 흰 돌
-        +: 빈 칸
+        - default: ● 검은 돌, ○ 흰 돌, + 빈 칸
+        - compact: X 검은 돌, O 흰 돌, . 빈 칸 (한 칸에 한 글자)
+        highlight_last 가 True 면 마지막 수를 표시합니다 (default: ●*, compact: 소문자).
+        렌더링 결과는 다음 착수 전까지 캐시되고, 착수 시에는 바뀐 칸만 다시 씁니다.
         """
-        # 각 상태에 맞는 심볼을 정의합니다.
-        symbols = {
-            "BLACK": "●",
-            "WHITE": "○",
-            None: "+",
-        }
-
-        # 최종 결과를 담을 문자열 리스트를 생성합니다.
-        board_lines = []
-
-        # 열 번호 헤더를 만듭니다 (e.g., "   0  1  2 ...")
-        # 행 번호(예: '14 ')와 정렬을 맞추기 위해 앞부분에 공백을 추가합니다.
-        header = "   " + " ".join(f"{i:<2}" for i in range(WIDTH))
-        board_lines.append(header)
-
-        # 각 행을 순회하며 문자열을 만듭니다.
-        for y in range(HEIGHT):
-            # 행 번호를 왼쪽에 추가하고, 두 자리로 정렬합니다.
-            row_str = f"{y:>2} "
-
-            # 해당 행의 각 칸을 순회합니다.
-            for x in range(WIDTH):
-                stone = self._state.board[y][x]
-                # 심볼과 공백을 추가하여 정렬을 맞춥니다.
-                row_str += symbols[stone] + "  "
-
-            board_lines.append(row_str)
-
-        # 모든 라인을 개행 문자로 합쳐 하나의 문자열로 반환합니다.
-        return "\n".join(board_lines)
+        return self._board.render(style, highlight_last)
@@ -0,0 +1,225 @@
+from typing import Optional
+
+from schema import GomokuState
+from game.rules import CellReader, EDGE, forbidden_reason
+from game.state import EMPTY, COLOR_CODES
+
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]
+
+# (연속된 돌 수, 열린 끝 수) -> 점수
+PATTERN_SCORES = {
+    (4, 2): 10_000,
+    (4, 1): 1_000,
+    (3, 2): 1_000,
+    (3, 1): 100,
+    (2, 2): 100,
+    (2, 1): 10,
+    (1, 2): 10,
+    (1, 1): 1,
+}
+FIVE_SCORE = 100_000
+
+
+def opponent(color: str) -> str:
+    return "WHITE" if color == "BLACK" else "BLACK"
+
+
+# 보드 밖 칸 (돌 색 / None 과 구분)
+OUTSIDE = "OUTSIDE"
+
+
+class Position:
+    """휴리스틱용 보드 보기: 돌 좌표 dict + 보드 크기 (width 가 None 이면 무한 보드)
+
+    비용이 보드 넓이가 아니라 돌 수에 비례하므로 큰 보드 / 무한 보드에서도 쓸 수 있음
+    """
+
+    __slots__ = ("stones", "width", "height")
+
+    def __init__(
+        self,
+        stones: dict[tuple[int, int], str],
+        width: Optional[int],
+        height: Optional[int],
+    ) -> None:
+        self.stones = stones
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_state(cls, state: GomokuState) -> "Position":
+        stones = {(stone.x, stone.y): stone.type for stone in state.stones}
+        return cls(stones, state.width, state.height)
+
+    @classmethod
+    def from_board(cls, board: list[list[Optional[str]]]) -> "Position":
+        """2차원 리스트 보드 (GomokuState.board) 에서 생성"""
+        stones = {
+            (x, y): cell
+            for y, row in enumerate(board)
+            for x, cell in enumerate(row)
+            if cell is not None
+        }
+        return cls(stones, len(board[0]), len(board))
+
+    def get(self, x: int, y: int) -> Optional[str]:
+        """돌 색, 빈 칸이면 None, 보드 밖이면 OUTSIDE"""
+        if self.width is not None and not (
+            0 <= x < self.width and 0 <= y < self.height
+        ):
+            return OUTSIDE
+        return self.stones.get((x, y))
+
+    def reader(self) -> CellReader:
+        """game.rules 용 칸 읽기 함수 (EMPTY / BLACK / WHITE / EDGE)"""
+
+        def cell(x: int, y: int) -> int:
+            value = self.get(x, y)
+            if value is None:
+                return EMPTY
+            return EDGE if value == OUTSIDE else COLOR_CODES[value]
+
+        return cell
+
+
+def as_position(board) -> Position:
+    """Position / GomokuState / 2차원 리스트 보드를 Position 으로"""
+    if isinstance(board, Position):
+        return board
+    if isinstance(board, GomokuState):
+        return Position.from_state(board)
+    return Position.from_board(board)
+
+
+def line_shape(board, x: int, y: int, dx: int, dy: int, color: str) -> tuple[int, int]:
+    """(x, y) 에 color 돌을 둔다고 가정했을 때 (dx, dy) 방향의 (연속 돌 수, 열린 끝 수)"""
+    get = as_position(board).get
+    count, open_ends = 1, 0
+    for sign in (1, -1):
+        nx, ny = x + sign * dx, y + sign * dy
+        while get(nx, ny) == color:
+            count += 1
+            nx, ny = nx + sign * dx, ny + sign * dy
+        if get(nx, ny) is None:
+            open_ends += 1
+    return count, open_ends
+
+
+def score_cell(board, x: int, y: int, color: str) -> int:
+    """(x, y) 에 color 돌을 뒀을 때 만들어지는 모양의 점수 합"""
+    position = as_position(board)
+    score = 0
+    for dx, dy in DIRECTIONS:
+        count, open_ends = line_shape(position, x, y, dx, dy, color)
+        if count >= 5:
+            return FIVE_SCORE
+        score += PATTERN_SCORES.get((count, open_ends), 0)
+    return score
+
+
+def candidate_moves(board, distance: int = 2) -> list[tuple[int, int]]:
+    """기존 돌에서 distance 칸 이내의 빈 칸 (돌이 없으면 중앙)"""
+    position = as_position(board)
+    candidates = set()
+    for x, y in position.stones:
+        for ny in range(y - distance, y + distance + 1):
+            for nx in range(x - distance, x + distance + 1):
+                if position.get(nx, ny) is None:
+                    candidates.add((nx, ny))
+    if not candidates and not position.stones:
+        if position.width is None:
+            candidates.add((0, 0))
+        else:
+            candidates.add((position.width // 2, position.height // 2))
+    return sorted(candidates)
+
+
+def winning_moves(board, color: str) -> list[tuple[int, int]]:
+    """color 가 두면 바로 5목이 되는 자리들"""
+    position = as_position(board)
+    return [
+        (x, y)
+        for x, y in candidate_moves(position, distance=1)
+        if score_cell(position, x, y, color) >= FIVE_SCORE
+    ]
+
+
+def best_move(state: GomokuState) -> Optional[tuple[int, int]]:
+    """공격/수비 모양 점수로 고르는 간단한 휴리스틱 착수 (LLM 응답이 없을 때의 대체 수)"""
+    if "WIN" in state.turn or state.pending_choice is not None:
+        return None
+
+    board, color = Position.from_state(state), state.turn
+    enemy = opponent(color)
+    # 렌주 규칙의 흑은 금수 자리를 건너뜀
+    reader = board.reader() if state.rule == "renju" and color == "BLACK" else None
+
+    def allowed(x: int, y: int) -> bool:
+        return reader is None or forbidden_reason(reader, x, y) is None
+
+    # 내 5목 > 상대 5목 차단 > 나머지
+    for moves in (winning_moves(board, color), winning_moves(board, enemy)):
+        moves = [move for move in moves if allowed(*move)]
+        if moves:
+            return moves[0]
+
+    best, best_score = None, -1
+    for x, y in candidate_moves(board):
+        if not allowed(x, y):
+            continue
+        # 공격을 약간 우선
+        attack = score_cell(board, x, y, color)
+        defense = score_cell(board, x, y, enemy)
+        score = attack * 11 // 10 + defense
+        if score > best_score:
+            best, best_score = (x, y), score
+    return best
+
+
+def best_option(state: GomokuState) -> Optional[str]:
+    """Swap2 색 선택 휴리스틱 (둘 차례의 최고 모양 점수가 상대 이상이면 "white")"""
+    if state.pending_choice is None:
+        return None
+
+    board, color = Position.from_state(state), state.turn
+
+    def best(side: str) -> int:
+        return max(
+            (score_cell(board, x, y, side) for x, y in candidate_moves(board)),
+            default=0,
+        )
+
+    return "white" if best(color) >= best(opponent(color)) else "black"
+
+
+def strong_moves(board, color: str, limit: int = 5) -> list[tuple[int, int]]:
+    """color 입장에서 모양 점수가 높은 자리 (열린 3 이상을 만드는 자리만)"""
+    position = as_position(board)
+    scored = [
+        (score_cell(position, x, y, color), (x, y))
+        for x, y in candidate_moves(position)
+    ]
+    scored = [item for item in scored if item[0] >= PATTERN_SCORES[(3, 2)]]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [move for _, move in scored[:limit]]
+
+
+def threat_summary(state: GomokuState) -> str:
+    """현재 둘 차례 기준의 위협 요약 (프롬프트에 그대로 넣을 수 있는 짧은 영어 문장)"""
+    if "WIN" in state.turn:
+        return f"Game over: {state.turn}."
+
+    board, color = Position.from_state(state), state.turn
+    enemy = opponent(color)
+
+    def fmt(moves):
+        return ", ".join(f"({x}, {y})" for x, y in moves) or "none"
+
+    return "\n".join(
+        [
+            f"- {color} wins immediately at: {fmt(winning_moves(board, color))}",
+            f"- {enemy} threatens five at (must block): {fmt(winning_moves(board, enemy))}",
+            f"- {color} strong attacking points: {fmt(strong_moves(board, color))}",
+            f"- {enemy} strong points to deny: {fmt(strong_moves(board, enemy))}",
+        ]
+    )
@@ -0,0 +1,509 @@
+import math
+import time
+import uuid
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, NamedTuple, Optional, Union
+
+from schema import GomokuState
+from game.gomoku import Gomoku
+from game.heuristic import Position, candidate_moves, opponent, score_cell
+from game.rules import EDGE, forbidden_reason, is_win
+from game.state import EMPTY, BLACK, COLOR_CODES, COLOR_NAMES
+
+DEFAULT_TIME_LIMIT = 2.0
+# 상대 차례에 미리 생각하는 최대 시간 (트리 메모리 상한 겸용)
+DEFAULT_PONDER_LIMIT = 60.0
+# PUCT / UCT 탐험 상수
+DEFAULT_EXPLORATION = {"puct": 1.5, "uct": 1.4}
+# 노드마다 사전 확률이 높은 자식만 남김 (나머지 수는 탐색하지 않음)
+DEFAULT_MAX_CHILDREN = 24
+# 롤아웃 최대 수 (넘으면 무승부)
+DEFAULT_ROLLOUT_DEPTH = 60
+# 롤아웃은 기존 돌에서 이 거리 안의 빈 칸에만 둠
+ROLLOUT_DISTANCE = 1
+# 워커 프로세스마다 유지하는 탐색 트리 수 (게임별 트리 재사용)
+WORKER_TREES = 8
+
+Point = tuple[int, int]
+# (국면, 둘 차례, 후보 수) -> (후보 수별 사전 확률, 둘 차례 기준 가치 -1~1 또는 None)
+# 가치가 None 이면 롤아웃으로 평가함
+Evaluator = Callable[[Position, str, list[Point]], tuple[list[float], Optional[float]]]
+
+
+class SearchResult(NamedTuple):
+    move: Optional[Point]
+    visits: int  # 고른 수의 방문 수
+    value: float  # 고른 수의 승률 (둘 차례 기준, 0~1)
+    playouts: int  # 이번 탐색에서 모든 프로세스가 한 시뮬레이션 수
+    elapsed: float
+    stats: dict[Point, tuple[int, float]]  # 루트 자식별 (방문 수, 승점 합)
+    reused: int = 0  # 이전 탐색 / 생각하기에서 물려받은 루트 방문 수
+
+
+def heuristic_evaluator(
+    position: Position, color: str, moves: list[Point]
+) -> tuple[list[float], Optional[float]]:
+    """heuristic.score_cell 의 공격 / 수비 점수를 사전 확률로 (가치는 롤아웃에 맡김)"""
+    enemy = opponent(color)
+    scores = [
+        score_cell(position, x, y, color) * 11 // 10
+        + score_cell(position, x, y, enemy)
+        + 1
+        for x, y in moves
+    ]
+    # 점수 차가 너무 커서 한 수에 쏠리지 않도록 제곱근으로 완화
+    weights = [math.sqrt(score) for score in scores]
+    total = sum(weights)
+    return [weight / total for weight in weights], None
+
+
+def uniform_evaluator(
+    position: Position, color: str, moves: list[Point]
+) -> tuple[list[float], Optional[float]]:
+    """사전 지식 없음 (순수 UCT + 롤아웃)"""
+    return [1.0 / len(moves)] * len(moves), None
+
+
+class Node:
+    __slots__ = ("move", "color", "prior", "children", "visits", "wins", "winner")
+
+    def __init__(self, move: Optional[Point], color: int, prior: float) -> None:
+        self.move = move
+        self.color = color  # 이 수를 둔 쪽 (루트는 직전에 둔 쪽)
+        self.prior = prior
+        self.children: Optional[list["Node"]] = None  # None 이면 아직 확장 전
+        self.visits = 0
+        self.wins = 0.0  # self.color 기준 승점 (승 1 / 무 0.5 / 패 0)
+        # 이 수로 끝난 국면이면 이긴 쪽 (무승부 EMPTY)
+        self.winner: Optional[int] = None
+
+
+class MCTS:
+    """Gomoku 용 몬테카를로 트리 탐색 엔진
+
+    - 선택: "puct" (사전 확률 가중) 또는 "uct"
+    - 확장: evaluator 의 사전 확률 상위 max_children 수만 자식으로 둠
+    - 평가: evaluator 가 가치를 주면 그대로, 아니면 돌 주변 칸에만 두는 빠른 롤아웃
+    - 트리 재사용: 다음 search 의 국면이 이전 루트에서 이어지면 해당 서브트리에서 시작
+    - 생각하기: ponder() 로 상대 차례 동안 스레드에서 트리를 키움. 상대가 예측한 수를
+      두면 물려받은 방문 수만큼 탐색 예산을 줄여 (한 수 분량 이상이면) 바로 둠
+    - 병렬: workers > 1 이면 (workers - 1) 개 프로세스가 같은 국면을 각자 탐색하고
+      (root parallelism) 루트 자식 통계를 합쳐서 수를 고름. 워커 프로세스도 트리를
+      게임별로 유지하므로 재사용됨
+    """
+
+    def __init__(
+        self,
+        selection: str = "puct",
+        exploration: Optional[float] = None,
+        evaluator: Optional[Evaluator] = None,
+        max_children: int = DEFAULT_MAX_CHILDREN,
+        rollout_depth: int = DEFAULT_ROLLOUT_DEPTH,
+        time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+        playouts: Optional[int] = None,
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        seed: Optional[int] = None,
+        ponder_limit: float = DEFAULT_PONDER_LIMIT,
+    ) -> None:
+        if selection not in DEFAULT_EXPLORATION:
+            raise ValueError(f"Unknown selection rule: {selection}")
+        self.selection = selection
+        self.exploration = exploration or DEFAULT_EXPLORATION[selection]
+        self.evaluator = evaluator or (
+            heuristic_evaluator if selection == "puct" else uniform_evaluator
+        )
+        self.max_children = max_children
+        self.rollout_depth = rollout_depth
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.workers = workers
+        self.ponder_limit = ponder_limit
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_stop = threading.Event()
+        # stop() 이 켜면 진행 중인 run / search 가 다음 시뮬레이션 전에 끝남
+        self._stop = threading.Event()
+        # 초당 시뮬레이션 수 (시간 제한 탐색에서 측정, 생각하기 예산 환산용)
+        self._rate: Optional[float] = None
+        self._executor = executor
+        self._owns_executor = False
+        self._rng = random.Random(seed)
+        # 워커 프로세스가 이 엔진의 트리를 찾는 키
+        self.tree_id = uuid.uuid4().hex
+
+        self.width: Optional[int] = None
+        self.height: Optional[int] = None
+        self.rule = "freestyle"
+        self.stones: dict[Point, int] = {}
+        self.moves: list[Point] = []
+        self.state: Optional[GomokuState] = None
+        self.root = Node(None, EMPTY, 1.0)
+
+    # --- 국면 ---
+
+    def cell(self, x: int, y: int) -> int:
+        if self.width is not None and not (
+            0 <= x < self.width and 0 <= y < self.height
+        ):
+            return EDGE
+        return self.stones.get((x, y), EMPTY)
+
+    def to_move(self) -> int:
+        return BLACK if len(self.stones) % 2 == 0 else 3 - BLACK
+
+    def sync(self, source: Union[Gomoku, GomokuState]) -> None:
+        """탐색할 국면을 맞춤 (이전 루트에서 이어지는 국면이면 서브트리 재사용)"""
+        self.stop_pondering()
+        state = source.get_state() if isinstance(source, Gomoku) else source
+        moves = [(stone.x, stone.y) for stone in state.stones]
+        config = (state.width, state.height, state.rule)
+        reused = (
+            config == (self.width, self.height, self.rule)
+            and moves[: len(self.moves)] == self.moves
+        )
+        root = self.root if reused else None
+        if root is not None:
+            for move in moves[len(self.moves) :]:
+                root = next(
+                    (child for child in root.children or () if child.move == move),
+                    None,
+                )
+                if root is None:
+                    break
+
+        self.width, self.height, self.rule = config
+        self.stones = {
+            (stone.x, stone.y): COLOR_CODES[stone.type] for stone in state.stones
+        }
+        self.moves = moves
+        self.state = state
+        if root is None:
+            root = Node(moves[-1] if moves else None, 3 - self.to_move(), 1.0)
+        root.winner = None  # 끝난 국면은 탐색하지 않으므로 루트는 항상 진행 중
+        self.root = root
+
+    def _position(self) -> Position:
+        return Position(
+            {point: COLOR_NAMES[code] for point, code in self.stones.items()},
+            self.width,
+            self.height,
+        )
+
+    def _legal_moves(self, color: int) -> list[Point]:
+        moves = candidate_moves(self._position())
+        if self.rule == "renju" and color == BLACK:
+            moves = [
+                move for move in moves if forbidden_reason(self.cell, *move) is None
+            ]
+        return moves
+
+    # --- 탐색 ---
+
+    def _expand(self, node: Node, color: int) -> Optional[float]:
+        """자식 생성. evaluator 가 준 가치 (color 기준 -1~1) 를 반환"""
+        moves = self._legal_moves(color)
+        if not moves:
+            node.children = []
+            return None
+        priors, value = self.evaluator(self._position(), COLOR_NAMES[color], moves)
+        ranked = sorted(zip(priors, moves), reverse=True)[: self.max_children]
+        node.children = [Node(move, color, prior) for prior, move in ranked]
+        return value
+
+    def _select(self, node: Node) -> Node:
+        c = self.exploration
+        if self.selection == "uct":
+            log_visits = math.log(node.visits or 1)
+            best, best_score = None, -1.0
+            for child in node.children:
+                if child.visits == 0:
+                    return child
+                score = child.wins / child.visits + c * math.sqrt(
+                    log_visits / child.visits
+                )
+                if score > best_score:
+                    best, best_score = child, score
+            return best
+
+        sqrt_visits = math.sqrt(node.visits or 1)
+        best, best_score = None, -1.0
+        for child in node.children:
+            # 안 가 본 수의 가치는 중립 (0.5) 으로 봄
+            q = child.wins / child.visits if child.visits else 0.5
+            score = q + c * child.prior * sqrt_visits / (1 + child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _rollout(self, color: int) -> int:
+        """color 차례부터 주변 칸에 무작위로 둬서 이긴 쪽 (무승부 EMPTY)"""
+        stones, cell, rng = self.stones, self.cell, self._rng
+        reach = range(-ROLLOUT_DISTANCE, ROLLOUT_DISTANCE + 1)
+
+        def neighbors(x: int, y: int) -> list[Point]:
+            return [
+                (x + dx, y + dy)
+                for dy in reach
+                for dx in reach
+                if cell(x + dx, y + dy) == EMPTY
+            ]
+
+        candidates = [point for x, y in stones for point in neighbors(x, y)]
+        if not candidates and not stones:
+            candidates = self._legal_moves(color)
+        placed, winner = [], EMPTY
+        while candidates and len(placed) < self.rollout_depth:
+            # 중복 / 이미 찬 칸은 뽑을 때 거름 (swap-remove)
+            index = rng.randrange(len(candidates))
+            candidates[index], candidates[-1] = candidates[-1], candidates[index]
+            point = candidates.pop()
+            if point in stones:
+                continue
+            stones[point] = color
+            placed.append(point)
+            if is_win(cell, *point, color, self.rule):
+                winner = color
+                break
+            candidates.extend(neighbors(*point))
+            color = 3 - color
+        for point in placed:
+            del stones[point]
+        return winner
+
+    def _simulate(self) -> None:
+        node, path = self.root, [self.root]
+        color = self.to_move()
+        while node.children and node.winner is None:
+            node = self._select(node)
+            self.stones[node.move] = color
+            if node.visits == 0 and is_win(self.cell, *node.move, color, self.rule):
+                node.winner = color
+            path.append(node)
+            color = 3 - color
+
+        value = None
+        if node.winner is not None:
+            winner = node.winner
+        elif node.children is None:
+            value = self._expand(node, color)
+            if node.children == []:
+                winner = EMPTY  # 둘 곳이 없으면 무승부
+            elif value is None:
+                winner = self._rollout(color)
+        else:
+            winner = EMPTY
+
+        for step in path:
+            if value is not None:
+                # evaluator 의 가치는 color (leaf 에서 둘 차례) 기준
+                score = (1 + value) / 2 if step.color == color else (1 - value) / 2
+            elif winner == EMPTY:
+                score = 0.5
+            else:
+                score = 1.0 if step.color == winner else 0.0
+            step.visits += 1
+            step.wins += score
+        for step in path[1:]:
+            del self.stones[step.move]
+
+    def run(
+        self, time_limit: Optional[float] = None, playouts: Optional[int] = None
+    ) -> int:
+        """현재 루트에서 시뮬레이션 (둘 다 None 이면 엔진 기본 예산). 한 시뮬레이션 수"""
+        if time_limit is None and playouts is None:
+            time_limit, playouts = self.time_limit, self.playouts
+        started = time.perf_counter()
+        deadline = started + time_limit if time_limit else float("inf")
+        count = 0
+        while (
+            (playouts is None or count < playouts)
+            and time.perf_counter() < deadline
+            and not self._stop.is_set()
+        ):
+            self._simulate()
+            count += 1
+            if playouts is None and not time_limit:
+                break
+        if time_limit and count:
+            self._rate = count / (time.perf_counter() - started)
+        return count
+
+    def _remaining_budget(
+        self, reused: int, time_limit: Optional[float], playouts: Optional[int]
+    ) -> tuple[Optional[float], Optional[int]]:
+        """물려받은 방문 수만큼 이번 수의 예산을 줄임"""
+        if playouts is not None:
+            return time_limit, max(0, playouts - reused)
+        if time_limit and self._rate:
+            return time_limit * max(0.0, 1 - reused / (self._rate * time_limit)), None
+        return time_limit, playouts
+
+    # --- 생각하기 ---
+
+    @property
+    def pondering(self) -> bool:
+        return self._ponder_thread is not None
+
+    def ponder(self, source: Union[Gomoku, GomokuState, None] = None) -> None:
+        """상대 차례 동안 백그라운드 스레드에서 현재 국면의 트리를 계속 키움
+
+        search / sync 가 시작될 때 멈춤
+        """
+        self.stop_pondering()
+        if source is not None:
+            self.sync(source)
+        if self.state is None or "WIN" in self.state.turn or self._stop.is_set():
+            return
+        self._ponder_stop.clear()
+        deadline = time.perf_counter() + self.ponder_limit
+
+        def loop() -> None:
+            while not self._ponder_stop.is_set() and time.perf_counter() < deadline:
+                self._simulate()
+
+        self._ponder_thread = threading.Thread(
+            target=loop, name="mcts-ponder", daemon=True
+        )
+        self._ponder_thread.start()
+
+    def stop_pondering(self) -> None:
+        if self._ponder_thread is not None:
+            self._ponder_stop.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
+
+    def root_stats(self) -> dict[Point, tuple[int, float]]:
+        return {
+            child.move: (child.visits, child.wins)
+            for child in self.root.children or ()
+            if child.visits
+        }
+
+    # --- 병렬 ---
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+            self._owns_executor = True
+        return self._executor
+
+    def _job(self, search_id: str, index: int, time_limit, playouts) -> tuple:
+        config = dict(
+            selection=self.selection,
+            exploration=self.exploration,
+            evaluator=self.evaluator,
+            max_children=self.max_children,
+            rollout_depth=self.rollout_depth,
+            seed=self._rng.getrandbits(32) + index,
+        )
+        return (self.tree_id, search_id, config, self.state, time_limit, playouts)
+
+    def search(
+        self,
+        source: Union[Gomoku, GomokuState],
+        time_limit: Optional[float] = None,
+        playouts: Optional[int] = None,
+    ) -> SearchResult:
+        """source 국면에서 둘 차례의 수를 고름"""
+        started = time.perf_counter()
+        self.sync(source)
+        if "WIN" in self.state.turn:
+            return SearchResult(None, 0, 0.0, 0, 0.0, {})
+        if time_limit is None and playouts is None:
+            time_limit, playouts = self.time_limit, self.playouts
+        reused = self.root.visits
+        time_limit, playouts = self._remaining_budget(reused, time_limit, playouts)
+        budget = bool(time_limit or playouts)
+
+        futures = []
+        if self.workers > 1 and budget:
+            pool = self._pool()
+            search_id = uuid.uuid4().hex
+            futures = [
+                pool.submit(
+                    _worker_search, self._job(search_id, i, time_limit, playouts)
+                )
+                for i in range(self.workers - 1)
+            ]
+        total = self.run(time_limit, playouts) if budget else 0
+        stats = dict(self.root_stats())
+        for future in futures:
+            if self._stop.is_set():
+                # 멈춘 탐색: 워커 결과를 기다리지 않음
+                future.cancel()
+                continue
+            count, worker_stats = future.result()
+            total += count
+            for move, (visits, wins) in worker_stats.items():
+                old_visits, old_wins = stats.get(move, (0, 0.0))
+                stats[move] = (old_visits + visits, old_wins + wins)
+
+        if not stats:
+            return SearchResult(
+                None, 0, 0.0, total, time.perf_counter() - started, stats, reused
+            )
+        move = max(stats, key=lambda point: stats[point])
+        visits, wins = stats[move]
+        elapsed = time.perf_counter() - started
+        return SearchResult(move, visits, wins / visits, total, elapsed, stats, reused)
+
+    def choose_option(self, source: Union[Gomoku, GomokuState]) -> str:
+        """Swap2 선택: 둘 차례 (백) 의 승률이 절반 이상이면 "white", 아니면 "black\" """
+        result = self.search(source)
+        return "white" if result.value >= 0.5 else "black"
+
+    def stop(self) -> None:
+        """다른 스레드에서 도는 search / 생각하기를 멈춤 (이 엔진은 더 탐색하지 않음)"""
+        self._stop.set()
+        self._ponder_stop.set()
+
+    def close(self) -> None:
+        self.stop_pondering()
+        if self._owns_executor:
+            # 워커에서 돌고 있는 작업은 기다리지 않음 (시간 제한이 지나면 끝남)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._owns_executor = False
+
+
+# 워커 프로세스의 tree_id -> 엔진 (LRU)
+_worker_engines: "OrderedDict[str, MCTS]" = OrderedDict()
+
+
+# 워커 프로세스의 tree_id -> (search_id, 그 탐색에서 이미 돌려준 루트 통계)
+_worker_reported: dict[str, tuple[str, dict[Point, tuple[int, float]]]] = {}
+
+
+def _worker_search(job: tuple) -> tuple[int, dict[Point, tuple[int, float]]]:
+    """워커 프로세스에서 한 국면을 탐색하고 루트 자식 통계를 돌려줌
+
+    한 탐색의 작업 둘이 같은 프로세스에 오면 두 번째는 첫 번째가 돌려준 방문을 빼고 돌려줌
+    (같은 트리를 이어서 키우므로 그대로 합치면 두 번 셈)
+    """
+    tree_id, search_id, config, state, time_limit, playouts = job
+    engine = _worker_engines.pop(tree_id, None)
+    if engine is None:
+        engine = MCTS(**config)
+    else:
+        engine._rng.seed(config["seed"])
+    _worker_engines[tree_id] = engine
+    while len(_worker_engines) > WORKER_TREES:
+        evicted, _ = _worker_engines.popitem(last=False)
+        _worker_reported.pop(evicted, None)
+
+    engine.sync(state)
+    count = engine.run(time_limit, playouts)
+    stats = engine.root_stats()
+    last_search, reported = _worker_reported.get(tree_id, (None, {}))
+    _worker_reported[tree_id] = (search_id, stats)
+    if last_search != search_id:
+        return count, stats
+    new_stats = {}
+    for move, (visits, wins) in stats.items():
+        old_visits, old_wins = reported.get(move, (0, 0.0))
+        if visits > old_visits:
+            new_stats[move] = (visits - old_visits, wins - old_wins)
+    return count, new_stats
@@ -0,0 +1,342 @@
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "game.network requires the 'numpy' package: pip install numpy"
+    ) from e
+
+from schema import GomokuState
+from game.heuristic import Position
+
+# 입력 평면: 둘 차례의 돌 / 상대 돌 / 보드 안 (패딩 0 과 구분해 가장자리를 알 수 있음)
+PLANES = 3
+DEFAULT_CHANNELS = 32
+DEFAULT_LAYERS = 3
+# 배치 큐: 최대 배치 크기와, 첫 요청 뒤 더 모으며 기다리는 최대 시간 (초)
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT = 0.002
+# 합법 수가 아닌 칸의 logit
+MASKED = -1e9
+_STOP = object()
+
+
+def position_planes(position: Position, color: str) -> "np.ndarray":
+    """Position 을 color 기준 입력 평면 (PLANES, height, width) 으로"""
+    if position.width is None:
+        raise ValueError("The network needs a bounded board")
+    planes = np.zeros((PLANES, position.height, position.width), dtype=np.float32)
+    for (x, y), stone in position.stones.items():
+        planes[0 if stone == color else 1, y, x] = 1.0
+    planes[2] = 1.0
+    return planes
+
+
+def board_planes(state: GomokuState, color: Optional[str] = None) -> "np.ndarray":
+    """GomokuState.board 에서 입력 평면 (color 기본: 둘 차례)"""
+    if state.board is None:
+        raise ValueError("The network needs a bounded board (state.board is None)")
+    return position_planes(Position.from_board(state.board), color or state.turn)
+
+
+def _im2col(x: "np.ndarray") -> "np.ndarray":
+    """(N, C, H, W) -> (N, C * 9, H, W): 3x3 이웃 (0 패딩) 을 채널로 펼침"""
+    n, c, h, w = x.shape
+    padded = np.pad(x, ((0, 0), (0, 0), (1, 1), (1, 1)))
+    cols = np.empty((n, c, 9, h, w), dtype=x.dtype)
+    for i in range(3):
+        for j in range(3):
+            cols[:, :, i * 3 + j] = padded[:, :, i : i + h, j : j + w]
+    return cols.reshape(n, c * 9, h, w)
+
+
+def _col2im(cols: "np.ndarray", shape: tuple) -> "np.ndarray":
+    """_im2col 의 역전파 (겹치는 칸의 기울기를 더함)"""
+    n, c, h, w = shape
+    cols = cols.reshape(n, c, 9, h, w)
+    padded = np.zeros((n, c, h + 2, w + 2), dtype=cols.dtype)
+    for i in range(3):
+        for j in range(3):
+            padded[:, :, i : i + h, j : j + w] += cols[:, :, i * 3 + j]
+    return padded[:, :, 1:-1, 1:-1]
+
+
+class PolicyValueNet:
+    """NumPy 로만 도는 작은 정책 / 가치망 (CPU 전용)
+
+    3x3 conv + ReLU 몸통 위에 칸별 1x1 conv 정책 머리와, 전역 평균 + 선형 + tanh 가치
+    머리를 둠. 완전 합성곱이라 (한정된) 보드 크기와 관계없이 같은 가중치를 씀
+    """
+
+    def __init__(
+        self,
+        channels: int = DEFAULT_CHANNELS,
+        layers: int = DEFAULT_LAYERS,
+        seed: Optional[int] = None,
+    ) -> None:
+        rng = np.random.default_rng(seed)
+        self.channels = channels
+        self.layers = layers
+        self.params: dict[str, np.ndarray] = {}
+        fan_in = PLANES
+        for i in range(layers):
+            self.params[f"conv{i}_w"] = (
+                rng.standard_normal((channels, fan_in * 9)) * np.sqrt(2 / (fan_in * 9))
+            ).astype(np.float32)
+            self.params[f"conv{i}_b"] = np.zeros(channels, dtype=np.float32)
+            fan_in = channels
+        self.params["policy_w"] = (
+            rng.standard_normal(channels) * np.sqrt(1 / channels)
+        ).astype(np.float32)
+        self.params["policy_b"] = np.zeros(1, dtype=np.float32)
+        self.params["value_w"] = (
+            rng.standard_normal(channels) * np.sqrt(1 / channels)
+        ).astype(np.float32)
+        self.params["value_b"] = np.zeros(1, dtype=np.float32)
+        self._adam: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._step = 0
+
+    # --- 저장 ---
+
+    def save(self, path: str) -> None:
+        np.savez(path, **self.params)
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyValueNet":
+        with np.load(path) as data:
+            params = {key: data[key] for key in data.files}
+        layers = sum(1 for key in params if key.endswith("_w") and key[:4] == "conv")
+        net = cls(channels=len(params["conv0_b"]), layers=layers)
+        net.params = params
+        return net
+
+    # --- 추론 ---
+
+    def _forward(self, planes: "np.ndarray"):
+        """(정책 logit (N, H*W), 가치 (N,), 역전파용 캐시)"""
+        params, cache = self.params, []
+        x = planes
+        for i in range(self.layers):
+            cols = _im2col(x)
+            z = (
+                np.einsum("nkhw,fk->nfhw", cols, params[f"conv{i}_w"], optimize=True)
+                + params[f"conv{i}_b"][None, :, None, None]
+            )
+            cache.append((x.shape, cols, z))
+            x = np.maximum(z, 0)
+        n = x.shape[0]
+        logits = np.einsum("nfhw,f->nhw", x, params["policy_w"]) + params["policy_b"]
+        pooled = x.mean(axis=(2, 3))
+        value = np.tanh(pooled @ params["value_w"] + params["value_b"])
+        return logits.reshape(n, -1), value, (cache, x, pooled)
+
+    def predict(self, planes: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+        """planes (N, PLANES, H, W) -> (빈 칸에 대한 정책 확률 (N, H, W), 가치 (N,))"""
+        logits, value, _ = self._forward(planes.astype(np.float32, copy=False))
+        n, _, h, w = planes.shape
+        empty = (planes[:, 0] + planes[:, 1] == 0).reshape(n, -1)
+        logits = np.where(empty, logits, MASKED)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs.reshape(n, h, w), value
+
+    # --- 학습 ---
+
+    def gradients(
+        self, planes: "np.ndarray", policy: "np.ndarray", value: "np.ndarray"
+    ) -> tuple[dict[str, float], dict[str, "np.ndarray"]]:
+        """손실 (정책 교차 엔트로피 + 가치 제곱 오차) 과 파라미터별 기울기
+
+        planes (N, PLANES, H, W), policy (N, H*W) 목표 분포, value (N,) 둘 차례 기준 결과 (-1~1)
+        """
+        params = self.params
+        n = planes.shape[0]
+        logits, predicted, (cache, top, pooled) = self._forward(planes)
+        h, w = planes.shape[2:]
+
+        empty = (planes[:, 0] + planes[:, 1] == 0).reshape(n, -1)
+        logits = np.where(empty, logits, MASKED)
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        policy_loss = -np.sum(policy * np.log(probs + 1e-12)) / n
+        value_loss = np.mean((predicted - value) ** 2)
+
+        grads: dict[str, np.ndarray] = {}
+        dlogits = ((probs - policy) / n).reshape(n, h, w)
+        grads["policy_w"] = np.einsum("nhw,nfhw->f", dlogits, top)
+        grads["policy_b"] = np.array([dlogits.sum()])
+        dvalue = 2 * (predicted - value) / n * (1 - predicted**2)
+        grads["value_w"] = pooled.T @ dvalue
+        grads["value_b"] = np.array([dvalue.sum()])
+
+        dx = dlogits[:, None] * params["policy_w"][None, :, None, None]
+        dx = dx + (np.outer(dvalue, params["value_w"]) / (h * w))[:, :, None, None]
+        for i in reversed(range(self.layers)):
+            shape, cols, z = cache[i]
+            dz = dx * (z > 0)
+            grads[f"conv{i}_w"] = np.einsum("nfhw,nkhw->fk", dz, cols, optimize=True)
+            grads[f"conv{i}_b"] = dz.sum(axis=(0, 2, 3))
+            if i:
+                dcols = np.einsum(
+                    "nfhw,fk->nkhw", dz, params[f"conv{i}_w"], optimize=True
+                )
+                dx = _col2im(dcols, shape)
+        losses = {"policy_loss": float(policy_loss), "value_loss": float(value_loss)}
+        return losses, grads
+
+    def train_step(
+        self,
+        planes: "np.ndarray",
+        policy: "np.ndarray",
+        value: "np.ndarray",
+        lr: float = 1e-3,
+        weight_decay: float = 1e-4,
+    ) -> dict[str, float]:
+        """미니배치 하나로 Adam 한 스텝 (인자는 gradients 와 같음)"""
+        params = self.params
+        losses, grads = self.gradients(planes, policy, value)
+        self._step += 1
+        beta1, beta2 = 0.9, 0.999
+        for key, grad in grads.items():
+            grad = grad.astype(np.float32) + weight_decay * params[key]
+            m, v = self._adam.get(key, (np.zeros_like(grad), np.zeros_like(grad)))
+            m = beta1 * m + (1 - beta1) * grad
+            v = beta2 * v + (1 - beta2) * grad**2
+            self._adam[key] = (m, v)
+            m_hat = m / (1 - beta1**self._step)
+            v_hat = v / (1 - beta2**self._step)
+            step = lr * m_hat / (np.sqrt(v_hat) + 1e-8)
+            params[key] = (params[key] - step).astype(np.float32)
+        return losses
+
+
+class BatchingEvaluator:
+    """여러 탐색 / 게임 스레드의 평가 요청을 모아 배치로 추론하는 큐
+
+    첫 요청이 오면 max_wait 초 동안 (또는 max_batch 개까지) 더 모아 한 번에 predict.
+    보드 크기가 다른 요청은 크기별로 나눠 돌림. 스레드에서는 evaluate(),
+    asyncio 에서는 await evaluate_async() 로 씀
+    """
+
+    def __init__(
+        self,
+        net: PolicyValueNet,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ) -> None:
+        self.net = net
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.evaluations = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="net-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, planes: "np.ndarray") -> Future:
+        """planes (PLANES, H, W) 하나 -> Future[(정책 확률 (H, W), 가치)]"""
+        future: Future = Future()
+        self._queue.put((planes, future))
+        return future
+
+    def evaluate(self, planes: "np.ndarray") -> tuple["np.ndarray", float]:
+        return self.submit(planes).result()
+
+    async def evaluate_async(self, planes: "np.ndarray") -> tuple["np.ndarray", float]:
+        return await asyncio.wrap_future(self.submit(planes))
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = (
+                        self._queue.get(timeout=timeout)
+                        if timeout > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._evaluate(batch)
+
+    def _evaluate(self, batch: list) -> None:
+        groups: dict[tuple, list] = {}
+        for planes, future in batch:
+            groups.setdefault(planes.shape, []).append((planes, future))
+        for group in groups.values():
+            try:
+                probs, values = self.net.predict(np.stack([p for p, _ in group]))
+            except Exception as e:
+                for _, future in group:
+                    future.set_exception(e)
+                continue
+            for i, (_, future) in enumerate(group):
+                future.set_result((probs[i], float(values[i])))
+            self.batches += 1
+            self.evaluations += len(group)
+
+
+class NetworkEvaluator:
+    """MCTS 의 evaluator: 정책망 확률을 사전 확률로, 가치망 출력을 가치로
+
+    batcher 를 주면 그 큐로 추론 (같은 큐를 쓰는 여러 게임 / 탐색의 요청이 배치로 묶임).
+    워커 프로세스로 보낼 때는 큐 없이 망만 보냄
+    """
+
+    # 입력 평면이 보드 크기라서 무한 보드는 평가하지 못함 (GameManager.engine 참고)
+    bounded_only = True
+
+    def __init__(
+        self, net: PolicyValueNet, batcher: Optional[BatchingEvaluator] = None
+    ) -> None:
+        self.net = net
+        self.batcher = batcher
+
+    def __getstate__(self) -> dict:
+        return {"net": self.net, "batcher": None}
+
+    def __call__(
+        self, position: Position, color: str, moves: list[tuple[int, int]]
+    ) -> tuple[list[float], Optional[float]]:
+        planes = position_planes(position, color)
+        if self.batcher is not None:
+            probs, value = self.batcher.evaluate(planes)
+        else:
+            batch_probs, values = self.net.predict(planes[None])
+            probs, value = batch_probs[0], float(values[0])
+        priors = [float(probs[y, x]) for x, y in moves]
+        total = sum(priors)
+        if total <= 0:
+            return [1.0 / len(moves)] * len(moves), value
+        return [prior / total for prior in priors], value
+
+
+def outcome_for(winner: Optional[str], color: str) -> float:
+    """게임 결과 (이긴 쪽, 무승부 None) 를 color 기준 가치로 (승 1 / 패 -1 / 무 0)"""
+    if winner is None:
+        return 0.0
+    return 1.0 if winner == color else -1.0
@@ -0,0 +1,132 @@
+from typing import Optional
+
+from schema import WIDTH, HEIGHT
+
+# 스타일별 칸 심볼 (칸 값 0 빈 칸 / 1 흑 / 2 백 순서)과 마지막 수 강조 심볼
+STYLES = {
+    # 기존 visualize_board 출력과 동일 (칸마다 심볼 + 공백 2칸)
+    "default": {
+        "cells": ("+  ", "●  ", "○  "),
+        "last": (None, "●* ", "○* "),
+    },
+    # ASCII 한 글자씩 (열 번호는 일의 자리만), 마지막 수는 소문자
+    "compact": {
+        "cells": (".", "X", "O"),
+        "last": (None, "x", "o"),
+    },
+}
+# 큰 / 무한 보드는 돌이 있는 영역에서 이만큼 여백을 두고 그림
+WINDOW_MARGIN = 2
+
+
+def _header(style: str, columns: range, label_width: int = 2) -> str:
+    """열 번호 줄 (행 번호 칸만큼 들여씀)"""
+    indent = " " * (label_width + 1)
+    if style == "compact":
+        return indent + "".join(str(abs(i) % 10) for i in columns)
+    # 칸 폭(3글자)에 맞춰 왼쪽 정렬 (15x15 에서는 기존 헤더와 동일)
+    return (indent + "".join(f"{i:<3}" for i in columns)).rstrip()
+
+
+class BoardRenderer:
+    """스타일마다 미리 할당한 토큰 버퍼를 두고, 착수 때 바뀐 칸만 고쳐 쓰는 렌더러
+
+    렌더링한 문자열은 (스타일, 강조 여부) 별로 다음 착수 전까지 캐시함
+    """
+
+    __slots__ = ("width", "height", "_buffers", "_cache")
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT) -> None:
+        self.width = width
+        self.height = height
+        self._buffers: dict[str, list[str]] = {}
+        self._cache: dict[tuple[str, bool], str] = {}
+
+    def _cell_position(self, index: int) -> int:
+        """버퍼에서 칸의 위치 (헤더, 줄바꿈, 행 번호 토큰을 건너뜀)"""
+        y, x = divmod(index, self.width)
+        return 2 + y * (self.width + 2) + 1 + x
+
+    def _buffer(self, style: str, cells: bytearray) -> list[str]:
+        buffer = self._buffers.get(style)
+        if buffer is None:
+            width = self.width
+            symbols = STYLES[style]["cells"]
+            buffer = [_header(style, range(width)), "\n"]
+            for y in range(self.height):
+                buffer.append(f"{y:>2} ")
+                buffer.extend(
+                    symbols[code] for code in cells[y * width : (y + 1) * width]
+                )
+                buffer.append("\n")
+            buffer.pop()  # 마지막 줄바꿈 제거
+            self._buffers[style] = buffer
+        return buffer
+
+    def update(self, index: int, code: int) -> None:
+        """한 칸이 바뀜 (이미 만든 스타일 버퍼만 고쳐 씀)"""
+        position = self._cell_position(index)
+        for style, buffer in self._buffers.items():
+            buffer[position] = STYLES[style]["cells"][code]
+        self._cache.clear()
+
+    def render(
+        self,
+        cells: bytearray,
+        last: Optional[int],
+        style: str = "default",
+        highlight_last: bool = False,
+    ) -> str:
+        if style not in STYLES:
+            raise ValueError(f"Unknown board style: {style}")
+        highlight_last = highlight_last and last is not None
+        key = (style, highlight_last)
+        text = self._cache.get(key)
+        if text is None:
+            buffer = self._buffer(style, cells)
+            if highlight_last:
+                position = self._cell_position(last)
+                original = buffer[position]
+                buffer[position] = STYLES[style]["last"][cells[last]]
+                text = "".join(buffer)
+                buffer[position] = original
+            else:
+                text = "".join(buffer)
+            self._cache[key] = text
+        return text
+
+
+def render_window(
+    stones: dict[tuple[int, int], int],
+    width: Optional[int],
+    height: Optional[int],
+    last: Optional[tuple[int, int]],
+    style: str = "default",
+) -> str:
+    """큰 / 무한 보드용: 돌이 있는 영역(+ WINDOW_MARGIN)만 실제 좌표와 함께 그림"""
+    if style not in STYLES:
+        raise ValueError(f"Unknown board style: {style}")
+    if stones:
+        xs = [x for x, _ in stones]
+        ys = [y for _, y in stones]
+        left, right = min(xs) - WINDOW_MARGIN, max(xs) + WINDOW_MARGIN
+        top, bottom = min(ys) - WINDOW_MARGIN, max(ys) + WINDOW_MARGIN
+    else:
+        cx, cy = (0, 0) if width is None else (width // 2, height // 2)
+        left, right = cx - WINDOW_MARGIN, cx + WINDOW_MARGIN
+        top, bottom = cy - WINDOW_MARGIN, cy + WINDOW_MARGIN
+    if width is not None:
+        left, right = max(left, 0), min(right, width - 1)
+        top, bottom = max(top, 0), min(bottom, height - 1)
+
+    symbols, highlight = STYLES[style]["cells"], STYLES[style]["last"]
+    columns = range(left, right + 1)
+    label_width = max(2, len(str(top)), len(str(bottom)))
+    lines = [_header(style, columns, label_width)]
+    for y in range(top, bottom + 1):
+        row = [f"{y:>{label_width}} "]
+        for x in columns:
+            code = stones.get((x, y), 0)
+            row.append(highlight[code] if (x, y) == last else symbols[code])
+        lines.append("".join(row))
+    return "\n".join(lines)
@@ -0,0 +1,191 @@
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+
+from game.state import EMPTY, BLACK, AnyBoardState
+
+# 보드 밖 (상대 돌과 마찬가지로 막힌 칸)
+EDGE = 3
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+# 한 방향으로 읽는 거리: 중심 ±5 칸이면 5목 / 6목 / 열린 4 판정에 충분함
+REACH = 5
+CENTER = REACH
+# 3-3 판정에서 "진짜 3" 인지 확인하는 재귀 깊이 (넘으면 진짜 3으로 봄)
+MAX_FORBIDDEN_DEPTH = 3
+
+# 규칙 설명 (MCP get_rules / 프롬프트용)
+RULE_DESCRIPTIONS = {
+    "freestyle": "Freestyle: five or more in a row wins for both colors. "
+    "There are no special rules for 'three-three' or 'four-four'.",
+    "standard": "Standard: exactly five in a row wins for both colors. "
+    "Six or more in a row (an overline) does not win.",
+    "renju": "Renju: BLACK wins only with exactly five; WHITE wins with five or more. "
+    "BLACK may not play a forbidden move: an overline (six or more), "
+    "a double four (two fours at once) or a double three (two open threes at once). "
+    "A move that makes exactly five is always allowed.",
+}
+SWAP2_DESCRIPTION = (
+    "Swap2 opening: the first player places three stones (BLACK, WHITE, BLACK). "
+    "The second player then calls choose_color with 'black' or 'white' to pick a color, "
+    "or 'place2' to place two more stones (WHITE, BLACK), after which the first player "
+    "picks 'black' or 'white'. No stone can be placed while a choice is pending."
+)
+
+# (x, y) -> EMPTY / BLACK / WHITE / EDGE
+CellReader = Callable[[int, int], int]
+
+
+class LineShape(NamedTuple):
+    """중심에 돌을 둔다고 가정했을 때 한 줄의 모양"""
+
+    five: bool  # 중심을 포함한 정확히 5목
+    overline: bool  # 중심을 포함한 6목 이상
+    fours: int  # 한 수 더 두면 정확히 5목이 되는 4의 수 (같은 돌 조합은 하나로 셈)
+    straight_four: bool  # 완성점이 두 곳인 열린 4
+    three_points: tuple[int, ...]  # 두면 열린 4가 되는 빈 칸 (중심 기준 offset)
+
+
+def board_reader(board: AnyBoardState) -> CellReader:
+    """BoardState / SparseBoardState 를 CellReader 로 (보드 밖은 EDGE)"""
+    code_at, in_bounds = board.code_at, board.in_bounds
+
+    def cell(x: int, y: int) -> int:
+        return code_at(x, y) if in_bounds(x, y) else EDGE
+
+    return cell
+
+
+def _with_stone(cell: CellReader, x: int, y: int, code: int) -> CellReader:
+    def placed(nx: int, ny: int) -> int:
+        return code if nx == x and ny == y else cell(nx, ny)
+
+    return placed
+
+
+def line_key(cell: CellReader, x: int, y: int, dx: int, dy: int, color: int) -> str:
+    """(x, y) 를 중심으로 한 방향 11칸 ("1" 내 돌 / "0" 빈 칸 / "x" 막힘, 중심은 "1")"""
+    chars = []
+    for i in range(-REACH, REACH + 1):
+        code = cell(x + i * dx, y + i * dy) if i else color
+        chars.append("1" if code == color else "0" if code == EMPTY else "x")
+    return "".join(chars)
+
+
+def _four_groups(key: str, exact: bool = True) -> dict[tuple[int, ...], set[int]]:
+    """중심을 포함한 5칸 창 중 돌 4 + 빈 칸 1 이고 채우면 5목이 되는 것들
+
+    같은 돌 4개로 이루어진 창은 하나의 4로 묶음 (열린 4는 완성점이 두 곳).
+    exact 면 채웠을 때 6목 이상이 되는 창은 제외
+    """
+    groups: dict[tuple[int, ...], set[int]] = {}
+    for start in range(CENTER - 4, CENTER + 1):
+        window = key[start : start + 5]
+        if "x" in window or window.count("1") != 4:
+            continue
+        # 창 바로 바깥이 내 돌이면 채웠을 때 6목 이상
+        if exact and (key[start - 1] == "1" or key[start + 5] == "1"):
+            continue
+        stones = tuple(i for i in range(start, start + 5) if key[i] == "1")
+        groups.setdefault(stones, set()).add(start + window.index("0"))
+    return groups
+
+
+@lru_cache(maxsize=1 << 16)
+def analyze_line(key: str, exact: bool = True) -> LineShape:
+    """line_key 하나의 모양 (결과는 줄 패턴별로 memoise 되어 탐색 중 반복 호출이 싸다)
+
+    exact 가 False 면 6목 이상도 5목으로 봄 (freestyle, 렌주의 백)
+    """
+    run = 1
+    for step in (-1, 1):
+        i = CENTER + step
+        while 0 <= i < len(key) and key[i] == "1":
+            run += 1
+            i += step
+    if run >= 5:
+        if not exact:
+            return LineShape(True, False, 0, False, ())
+        return LineShape(run == 5, run > 5, 0, False, ())
+
+    groups = _four_groups(key, exact)
+    if groups:
+        straight = any(len(points) == 2 for points in groups.values())
+        return LineShape(False, False, len(groups), straight, ())
+
+    three_points = []
+    for i in range(CENTER - 4, CENTER + 5):
+        if key[i] != "0":
+            continue
+        filled = key[:i] + "1" + key[i + 1 :]
+        if any(len(points) == 2 for points in _four_groups(filled, exact).values()):
+            three_points.append(i - CENTER)
+    return LineShape(False, False, 0, False, tuple(three_points))
+
+
+def line_shapes(cell: CellReader, x: int, y: int, color: int) -> list[LineShape]:
+    return [analyze_line(line_key(cell, x, y, dx, dy, color)) for dx, dy in DIRECTIONS]
+
+
+def forbidden_reason(cell: CellReader, x: int, y: int, depth: int = 0) -> Optional[str]:
+    """흑이 빈 칸 (x, y) 에 두는 수가 렌주 금수면 이유, 아니면 None
+
+    - 정확히 5목을 만들면 다른 모양과 관계없이 허용
+    - "overline": 6목 이상
+    - "double-four": 4를 둘 이상 만듦 (한 줄 안의 두 4 포함)
+    - "double-three": 열린 3을 둘 이상 만듦. 3을 열린 4로 만드는 자리가 모두
+      금수면 진짜 3이 아니므로, 그 자리만 재귀로 확인함
+    """
+    shapes = line_shapes(cell, x, y, BLACK)
+    if any(shape.five for shape in shapes):
+        return None
+    if any(shape.overline for shape in shapes):
+        return "overline"
+    if sum(shape.fours for shape in shapes) >= 2:
+        return "double-four"
+
+    threes = [
+        (direction, shape)
+        for direction, shape in zip(DIRECTIONS, shapes)
+        if shape.three_points
+    ]
+    if len(threes) < 2:
+        return None
+    if depth >= MAX_FORBIDDEN_DEPTH:
+        return "double-three"
+
+    placed = _with_stone(cell, x, y, BLACK)
+    real_threes = 0
+    for (dx, dy), shape in threes:
+        if any(
+            forbidden_reason(placed, x + offset * dx, y + offset * dy, depth + 1)
+            is None
+            for offset in shape.three_points
+        ):
+            real_threes += 1
+    return "double-three" if real_threes >= 2 else None
+
+
+def run_lengths(cell: CellReader, x: int, y: int, color: int) -> list[int]:
+    """(x, y) 를 지나는 네 방향의 연속 돌 수 (6 이상은 6 으로)"""
+    runs = []
+    for dx, dy in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            for i in range(1, REACH + 1):
+                if cell(x + sign * i * dx, y + sign * i * dy) != color:
+                    break
+                count += 1
+        runs.append(min(count, REACH + 1))
+    return runs
+
+
+def exact_five(rule: str, color: int) -> bool:
+    """이 규칙에서 color 는 정확히 5목이어야 이기는지 (아니면 6목 이상도 승)"""
+    return rule == "standard" or (rule == "renju" and color == BLACK)
+
+
+def is_win(cell: CellReader, x: int, y: int, color: int, rule: str) -> bool:
+    """(x, y) 에 둔 color 돌로 이겼는지 (규칙별 5목 조건)"""
+    runs = run_lengths(cell, x, y, color)
+    if exact_five(rule, color):
+        return 5 in runs
+    return max(runs) >= 5
@@ -0,0 +1,370 @@
+import time
+import random
+from typing import Optional, Union
+
+from schema import ForcedWin, GomokuState, Stone
+from game.gomoku import Gomoku
+from game.state import EMPTY, BLACK, COLOR_CODES, COLOR_NAMES
+from game.rules import (
+    DIRECTIONS,
+    EDGE,
+    REACH,
+    LineShape,
+    analyze_line,
+    exact_five,
+    forbidden_reason,
+    line_key,
+)
+
+# 한 줄에서 돌 하나가 위협에 관여할 수 있는 거리
+SPAN = 4
+# 공격 수 기준 최대 깊이 (VCT 는 분기가 많아 얕게)
+DEFAULT_MAX_DEPTH = {"vcf": 20, "vct": 6}
+DEFAULT_MAX_NODES = 200_000
+DEFAULT_TIME_LIMIT = 5.0
+# MCP 도구 (LLM 이 정하는 time_limit) 에 허용하는 최대 탐색 시간 (초)
+MAX_TIME_LIMIT = 30.0
+
+Point = tuple[int, int]
+# 수순: (좌표, 돌 색 코드) 목록
+Line = list[tuple[Point, int]]
+
+
+class SearchLimit(Exception):
+    """노드 수 / 시간 제한 초과"""
+
+
+class Threats:
+    """한 색의 위협 자리 (두면 5목 / 4 / 열린 3 / 열린 4 가 되는 빈 칸)"""
+
+    __slots__ = ("fives", "fours", "threes", "straight")
+
+    def __init__(
+        self, shapes: dict[Point, list[tuple[tuple[int, int], LineShape]]]
+    ) -> None:
+        self.fives: list[Point] = []
+        self.fours: list[Point] = []
+        self.threes: list[Point] = []
+        # 열린 4 가 되는 자리 -> 그 방향들
+        self.straight: dict[Point, list[tuple[int, int]]] = {}
+        scored = []
+        for point, point_shapes in shapes.items():
+            if any(shape.five for _, shape in point_shapes):
+                self.fives.append(point)
+                continue
+            directions = [d for d, shape in point_shapes if shape.straight_four]
+            if directions:
+                self.straight[point] = directions
+            fours = sum(shape.fours for _, shape in point_shapes)
+            threes = sum(1 for _, shape in point_shapes if shape.three_points)
+            scored.append((-(fours * 10 + threes), point, fours))
+        # 위협이 많이 겹치는 자리부터 (같은 점수면 좌표 순으로 결정적)
+        for _, point, fours in sorted(scored):
+            (self.fours if fours else self.threes).append(point)
+        self.fives.sort()
+
+
+class ThreatSolver:
+    """위협 공간 탐색으로 VCF (연속 4) / VCT (4 와 열린 3) 필승 수순을 찾음
+
+    공격은 강제 수만, 수비는 그 위협을 막는 수 (+ VCT 에서는 역 4) 만 두는 AND/OR
+    깊이 우선 탐색. 공격 수 기준 반복 심화로 가장 짧은 수순을 먼저 찾고, Zobrist
+    해시 치환표로 수순만 다르고 같은 국면은 다시 풀지 않음. 줄 모양 판정은
+    game.rules 의 memoise 된 패턴 표를 그대로 씀.
+    """
+
+    def __init__(
+        self,
+        stones: dict[Point, int],
+        width: Optional[int],
+        height: Optional[int],
+        rule: str = "freestyle",
+    ) -> None:
+        self.stones = dict(stones)
+        self.width = width
+        self.height = height
+        self.rule = rule
+        self.kind = "vcf"
+        self.nodes = 0
+        self._rng = random.Random(0)
+        self._zobrist: dict[tuple[Point, int], int] = {}
+        self._table: dict[tuple[int, bool], tuple[int, Optional[Line]]] = {}
+        self._max_nodes = DEFAULT_MAX_NODES
+        self._deadline = float("inf")
+        self.hash = 0
+        for point, color in self.stones.items():
+            self.hash ^= self._zobrist_key(point, color)
+
+    @classmethod
+    def from_state(cls, state: GomokuState) -> "ThreatSolver":
+        stones = {(stone.x, stone.y): COLOR_CODES[stone.type] for stone in state.stones}
+        return cls(stones, state.width, state.height, state.rule)
+
+    def _zobrist_key(self, point: Point, color: int) -> int:
+        # 무한 보드도 있으므로 좌표별 난수는 처음 쓸 때 만듦
+        key = self._zobrist.get((point, color))
+        if key is None:
+            key = self._zobrist[(point, color)] = self._rng.getrandbits(64)
+        return key
+
+    def cell(self, x: int, y: int) -> int:
+        if self.width is not None and not (
+            0 <= x < self.width and 0 <= y < self.height
+        ):
+            return EDGE
+        return self.stones.get((x, y), EMPTY)
+
+    def _play(self, point: Point, color: int) -> None:
+        self.stones[point] = color
+        self.hash ^= self._zobrist_key(point, color)
+
+    def _undo(self, point: Point) -> None:
+        self.hash ^= self._zobrist_key(point, self.stones.pop(point))
+
+    def _legal(self, point: Point, color: int) -> bool:
+        if self.rule != "renju" or color != BLACK:
+            return True
+        return forbidden_reason(self.cell, *point) is None
+
+    def threats(self, color: int) -> Threats:
+        """color 돌이 지나는 줄마다 칸을 한 번만 읽어 문자열로 만들고, 돌 주변 빈 칸의
+        11칸 줄 패턴 (rules.line_key 와 같은 형식) 을 잘라 판정"""
+        exact = exact_five(self.rule, color)
+        cell = self.cell
+        # (방향, 줄의 원점) -> 그 줄 위 color 돌들의 위치 t (점 = 원점 + t * 방향)
+        lines: dict[tuple[int, int, int, int], list[int]] = {}
+        for (x, y), stone in self.stones.items():
+            if stone != color:
+                continue
+            for dx, dy in DIRECTIONS:
+                t = x if dx else y
+                lines.setdefault((dx, dy, x - t * dx, y - t * dy), []).append(t)
+
+        shapes: dict[Point, list[tuple[tuple[int, int], LineShape]]] = {}
+        for (dx, dy, ox, oy), ts in lines.items():
+            lo = min(ts) - SPAN - REACH
+            segment = "".join(
+                "1" if code == color else "0" if code == EMPTY else "x"
+                for code in (
+                    cell(ox + t * dx, oy + t * dy)
+                    for t in range(lo, max(ts) + SPAN + REACH + 1)
+                )
+            )
+            targets = {t + k for t in ts for k in range(-SPAN, SPAN + 1)}
+            for t in targets:
+                i = t - lo
+                if segment[i] != "0":
+                    continue
+                key = segment[i - REACH : i] + "1" + segment[i + 1 : i + REACH + 1]
+                shape = analyze_line(key, exact)
+                if shape.five or shape.fours or shape.three_points:
+                    point = (ox + t * dx, oy + t * dy)
+                    shapes.setdefault(point, []).append(((dx, dy), shape))
+        return Threats(shapes)
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.nodes > self._max_nodes or time.perf_counter() > self._deadline:
+            raise SearchLimit()
+
+    def _lookup(self, key: tuple[int, bool], depth: int):
+        """치환표: 증명은 더 깊은 탐색에도, 반증은 같거나 얕은 탐색에만 유효"""
+        entry = self._table.get(key)
+        if entry is None:
+            return False, None
+        stored_depth, line = entry
+        if line is not None and stored_depth <= depth:
+            return True, line
+        if line is None and stored_depth >= depth:
+            return True, None
+        return False, None
+
+    def _attack(self, attacker: int, depth: int) -> Optional[Line]:
+        """공격 차례 (OR 노드): 이기는 수순이 있으면 반환"""
+        self._tick()
+        key = (self.hash, True)
+        hit, cached = self._lookup(key, depth)
+        if hit:
+            return cached
+
+        own = self.threats(attacker)
+        if own.fives:
+            return [(own.fives[0], attacker)]
+
+        defender = 3 - attacker
+        opponent = self.threats(defender)
+        remaining = depth - 1
+        if opponent.fives:
+            # 상대의 4 를 막는 수밖에 없음 (막은 뒤에도 위협이 남는지는 수비 노드에서 확인).
+            # 강제로 막는 수는 깊이를 쓰지 않음 (상대의 4 는 유한하므로 끝남)
+            remaining = depth
+            block = opponent.fives[0]
+            candidates = (
+                [block]
+                if len(opponent.fives) == 1 and self._legal(block, attacker)
+                else []
+            )
+        elif depth <= 0:
+            candidates = []
+        else:
+            candidates = own.fours + (own.threes if self.kind == "vct" else [])
+
+        result = None
+        for point in candidates:
+            if not self._legal(point, attacker):
+                continue
+            self._play(point, attacker)
+            line = self._defend(attacker, remaining)
+            self._undo(point)
+            if line is not None:
+                result = [(point, attacker)] + line
+                break
+        self._table[key] = (depth, result)
+        return result
+
+    def _defense_points(self, attacker: int, own: Threats) -> list[Point]:
+        """열린 3 (열린 4가 되는 자리) 을 모두 없애는 수비 자리 (없으면 그 줄 위의 빈 칸 전부)
+
+        수비 돌은 공격의 새 위협을 만들 수 없으므로, 후보는 열린 4 가 되는 줄 위의
+        빈 칸만 보고 확인도 그 줄들만 다시 판정함
+        """
+        defender = 3 - attacker
+        exact = exact_five(self.rule, attacker)
+        lines = [
+            (point, direction)
+            for point, directions in own.straight.items()
+            for direction in directions
+        ]
+        candidates = set()
+        for (x, y), (dx, dy) in lines:
+            for k in range(-SPAN, SPAN + 1):
+                if self.cell(x + k * dx, y + k * dy) == EMPTY:
+                    candidates.add((x + k * dx, y + k * dy))
+
+        points = []
+        for point in sorted(candidates):
+            self._play(point, defender)
+            if not any(
+                (x, y) != point
+                and analyze_line(
+                    line_key(self.cell, x, y, dx, dy, attacker), exact
+                ).straight_four
+                for (x, y), (dx, dy) in lines
+            ):
+                points.append(point)
+            self._undo(point)
+        # 한 수로 다 막을 수 없으면 (3-3 등) 줄 위의 어느 칸으로 막아도 공격이 이어지는지 봄
+        return points or sorted(candidates)
+
+    def _defend(self, attacker: int, depth: int) -> Optional[Line]:
+        """수비 차례 (AND 노드): 모든 수비에 대해 공격이 이기면 가장 오래 버틴 수순"""
+        self._tick()
+        key = (self.hash, False)
+        hit, cached = self._lookup(key, depth)
+        if hit:
+            return cached
+
+        defender = 3 - attacker
+        opponent = self.threats(defender)
+        own = self.threats(attacker)
+        if opponent.fives:
+            result = None  # 수비가 먼저 5목
+        elif len(own.fives) >= 2:
+            result = [(own.fives[0], defender), (own.fives[1], attacker)]
+        else:
+            if own.fives:
+                defenses = own.fives
+            elif self.kind == "vct" and own.straight:
+                # 열린 3 을 막거나, 역 4 로 선수를 잡음
+                defenses = self._defense_points(attacker, own) + opponent.fours
+            else:
+                defenses = []  # 위협이 없으면 수비가 자유롭게 둠 (공격 실패)
+
+            result = None
+            if defenses:
+                result = []
+                for point in defenses:
+                    if not self._legal(point, defender):
+                        continue
+                    self._play(point, defender)
+                    line = self._attack(attacker, depth)
+                    self._undo(point)
+                    if line is None:
+                        result = None
+                        break
+                    if len(line) + 1 > len(result):
+                        result = [(point, defender)] + line
+                if result == [] and own.fives:
+                    # 렌주에서 흑이 막을 자리가 금수면 막을 수 없음
+                    result = [(own.fives[0], attacker)]
+        self._table[key] = (depth, result)
+        return result
+
+    def solve(
+        self,
+        attacker: int,
+        kind: str = "vcf",
+        max_depth: Optional[int] = None,
+        max_nodes: int = DEFAULT_MAX_NODES,
+        time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+    ) -> ForcedWin:
+        """attacker 가 둘 차례라고 보고 필승 수순 탐색"""
+        if kind not in DEFAULT_MAX_DEPTH:
+            raise ValueError(f"Unknown search kind: {kind}")
+        started = time.perf_counter()
+        self.kind = kind
+        self.nodes = 0
+        self._table.clear()
+        self._max_nodes = max_nodes
+        # None 만 시간 제한 없음 (0 은 바로 멈춤, 노드 제한은 항상 적용)
+        self._deadline = (
+            started + time_limit if time_limit is not None else float("inf")
+        )
+        stones, board_hash = dict(self.stones), self.hash
+
+        line, complete = None, True
+        try:
+            for depth in range(1, (max_depth or DEFAULT_MAX_DEPTH[kind]) + 1):
+                line = self._attack(attacker, depth)
+                if line is not None:
+                    break
+        except SearchLimit:
+            complete = False
+        finally:
+            # 제한에 걸려 중간에 빠져나왔을 수 있으므로 국면을 되돌림
+            self.stones, self.hash = stones, board_hash
+
+        return ForcedWin(
+            attacker=COLOR_NAMES[attacker],
+            kind=kind,
+            found=line is not None,
+            moves=[
+                Stone(x=x, y=y, type=COLOR_NAMES[color]) for (x, y), color in line or []
+            ],
+            nodes=self.nodes,
+            elapsed=round(time.perf_counter() - started, 4),
+            complete=complete,
+        )
+
+
+def find_forced_win(
+    source: Union[Gomoku, GomokuState],
+    color: Optional[str] = None,
+    kind: str = "vcf",
+    max_depth: Optional[int] = None,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+) -> ForcedWin:
+    """color (기본: 둘 차례) 의 VCF / VCT 필승 수순 탐색
+
+    color 가 둘 차례가 아니어도 color 가 먼저 둔다고 보고 탐색함 (위협 분석용)
+    """
+    state = source.get_state() if isinstance(source, Gomoku) else source
+    if "WIN" in state.turn:
+        raise ValueError("Game is already over")
+    color = color or state.turn
+    if color not in COLOR_CODES:
+        raise ValueError(f"Unknown color: {color}")
+    return ThreatSolver.from_state(state).solve(
+        COLOR_CODES[color], kind, max_depth, max_nodes, time_limit
+    )
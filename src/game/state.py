@@ -0,0 +1,261 @@
+from array import array
+from typing import Optional, Union
+
+from schema import GomokuState, Stone, WIDTH, HEIGHT
+from game.render import BoardRenderer, render_window
+
+EMPTY, BLACK, WHITE = 0, 1, 2
+COLOR_CODES = {"BLACK": BLACK, "WHITE": WHITE}
+COLOR_NAMES = (None, "BLACK", "WHITE")
+
+# 칸 수가 이보다 많거나 무한 보드면 sparse 표현 사용 (메모리 / 수 생성이 돌 수에 비례)
+DENSE_MAX_CELLS = 32 * 32
+# sparse 보드에서 둘 만한 자리로 보는 거리 (기존 돌 주변)
+NEIGHBOR_DISTANCE = 2
+
+
+class BoardState:
+    """bytearray 기반 내부 게임 상태 (보통 크기 보드)
+
+    - cells: width * height 바이트 (0 빈 칸, 1 흑, 2 백)
+    - moves: 착수 순서대로 칸 번호 (y * width + x)
+
+    pydantic GomokuState 는 MCP / websocket 경계에서 필요할 때만 만들고,
+    다음 착수 전까지 캐시함 (직렬화한 JSON, 텍스트 보드도 마찬가지)
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "cells",
+        "moves",
+        "turn",
+        "meta",
+        "_model",
+        "_json",
+        "_renderer",
+    )
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT) -> None:
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.moves = array("H")
+        self.turn = "BLACK"
+        # 규칙 / 오프닝 등 GomokuState 에 그대로 실을 게임 정보
+        self.meta: dict = {}
+        self._model: Optional[GomokuState] = None
+        self._json: Optional[str] = None
+        self._renderer: Optional[BoardRenderer] = None
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def code_at(self, x: int, y: int) -> int:
+        """(x, y) 의 칸 값 (범위 밖이면 EMPTY)"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x]
+        return EMPTY
+
+    def color_at(self, x: int, y: int) -> Optional[str]:
+        return COLOR_NAMES[self.code_at(x, y)]
+
+    def place(self, x: int, y: int, color: str, next_turn: str) -> None:
+        index = y * self.width + x
+        self.cells[index] = COLOR_CODES[color]
+        self.moves.append(index)
+        self.turn = next_turn
+        self._model = self._json = None
+        if self._renderer is not None:
+            self._renderer.update(index, self.cells[index])
+
+    def move_list(self) -> list[tuple[int, int]]:
+        width = self.width
+        return [(index % width, index // width) for index in self.moves]
+
+    def last_move(self) -> Optional[tuple[int, int]]:
+        if not self.moves:
+            return None
+        return self.moves[-1] % self.width, self.moves[-1] // self.width
+
+    def empty_cells(self) -> list[tuple[int, int]]:
+        """빈 칸 전체 (행 우선 순서)"""
+        width = self.width
+        return [
+            (index % width, index // width)
+            for index, code in enumerate(self.cells)
+            if code == EMPTY
+        ]
+
+    def set_meta(self, meta: dict) -> None:
+        self.meta = meta
+        self._model = self._json = None
+
+    def to_model(self) -> GomokuState:
+        """pydantic 표현 (캐시를 공유하므로 읽기 전용으로 다룰 것)"""
+        if self._model is None:
+            cells, width = self.cells, self.width
+            # 내부 값은 이미 검증되어 있으므로 model_construct 로 검증을 건너뜀
+            self._model = GomokuState.model_construct(
+                turn=self.turn,
+                stones=[
+                    Stone.model_construct(
+                        x=index % width,
+                        y=index // width,
+                        type=COLOR_NAMES[cells[index]],
+                    )
+                    for index in self.moves
+                ],
+                board=[
+                    [COLOR_NAMES[code] for code in cells[y * width : (y + 1) * width]]
+                    for y in range(self.height)
+                ],
+                width=width,
+                height=self.height,
+                **self.meta,
+            )
+        return self._model
+
+    def to_json(self) -> str:
+        """GomokuState JSON (다음 착수 전까지 캐시)"""
+        if self._json is None:
+            self._json = self.to_model().model_dump_json()
+        return self._json
+
+    def render(self, style: str = "default", highlight_last: bool = False) -> str:
+        """텍스트 보드 (렌더러는 처음 요청할 때 만들고 이후 착수분만 반영)"""
+        if self._renderer is None:
+            self._renderer = BoardRenderer(self.width, self.height)
+        last = self.moves[-1] if self.moves else None
+        return self._renderer.render(self.cells, last, style, highlight_last)
+
+
+class SparseBoardState:
+    """dict 기반 내부 게임 상태 (큰 보드 / 무한 보드)
+
+    - stones: (x, y) -> 칸 값
+    - moves: 착수 순서대로 (x, y)
+
+    메모리와 수 생성 비용이 보드 넓이가 아니라 돌 수에 비례함.
+    width / height 가 None 이면 좌표 제한이 없음 (음수 좌표 포함).
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "stones",
+        "moves",
+        "turn",
+        "meta",
+        "_model",
+        "_json",
+        "_text",
+    )
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None):
+        self.width = width
+        self.height = height
+        self.stones: dict[tuple[int, int], int] = {}
+        self.moves: list[tuple[int, int]] = []
+        self.turn = "BLACK"
+        # 규칙 / 오프닝 등 GomokuState 에 그대로 실을 게임 정보
+        self.meta: dict = {}
+        self._model: Optional[GomokuState] = None
+        self._json: Optional[str] = None
+        self._text: dict[tuple[str, bool], str] = {}
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        if self.width is None:
+            return True
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def code_at(self, x: int, y: int) -> int:
+        return self.stones.get((x, y), EMPTY)
+
+    def color_at(self, x: int, y: int) -> Optional[str]:
+        return COLOR_NAMES[self.stones.get((x, y), EMPTY)]
+
+    def place(self, x: int, y: int, color: str, next_turn: str) -> None:
+        self.stones[(x, y)] = COLOR_CODES[color]
+        self.moves.append((x, y))
+        self.turn = next_turn
+        self._model = self._json = None
+        self._text.clear()
+
+    def move_list(self) -> list[tuple[int, int]]:
+        return list(self.moves)
+
+    def last_move(self) -> Optional[tuple[int, int]]:
+        return self.moves[-1] if self.moves else None
+
+    def empty_cells(self) -> list[tuple[int, int]]:
+        """기존 돌 NEIGHBOR_DISTANCE 칸 이내의 빈 칸 (행 우선 순서, 빈 보드면 중앙)"""
+        if not self.stones:
+            if self.width is None:
+                return [(0, 0)]
+            return [(self.width // 2, self.height // 2)]
+        d = NEIGHBOR_DISTANCE
+        cells = {
+            (nx, ny)
+            for x, y in self.stones
+            for ny in range(y - d, y + d + 1)
+            for nx in range(x - d, x + d + 1)
+        }
+        return sorted(
+            (
+                (x, y)
+                for x, y in cells
+                if (x, y) not in self.stones and self.in_bounds(x, y)
+            ),
+            key=lambda cell: (cell[1], cell[0]),
+        )
+
+    def set_meta(self, meta: dict) -> None:
+        self.meta = meta
+        self._model = self._json = None
+
+    def to_model(self) -> GomokuState:
+        """pydantic 표현 (board 는 None, 캐시를 공유하므로 읽기 전용으로 다룰 것)"""
+        if self._model is None:
+            self._model = GomokuState.model_construct(
+                turn=self.turn,
+                stones=[
+                    Stone.model_construct(
+                        x=x, y=y, type=COLOR_NAMES[self.stones[(x, y)]]
+                    )
+                    for x, y in self.moves
+                ],
+                board=None,
+                width=self.width,
+                height=self.height,
+                **self.meta,
+            )
+        return self._model
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = self.to_model().model_dump_json()
+        return self._json
+
+    def render(self, style: str = "default", highlight_last: bool = False) -> str:
+        """돌이 있는 영역(+ 여백)만 그린 텍스트 보드 (다음 착수 전까지 캐시)"""
+        key = (style, highlight_last)
+        if key not in self._text:
+            self._text[key] = render_window(
+                self.stones,
+                self.width,
+                self.height,
+                self.last_move() if highlight_last else None,
+                style,
+            )
+        return self._text[key]
+
+
+AnyBoardState = Union[BoardState, SparseBoardState]
+
+
+def create_board_state(width: Optional[int], height: Optional[int]) -> AnyBoardState:
+    """보드 크기에 맞는 내부 표현 (작으면 bytearray, 크거나 무한이면 dict)"""
+    if width is None or width * height > DENSE_MAX_CELLS:
+        return SparseBoardState(width, height)
+    return BoardState(width, height)
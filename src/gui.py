@@ -1,3 +1,7 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import sys
 import json
@@ -5,40 +9,138 @@ import asyncio
 from typing import Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-import uvicorn
 
-from openai import OpenAI
-
-from mcp_server.client import get_mcp_client
 from manager import GameManager
+from scheduler import RequestScheduler, INTERACTIVE
+from metrics import REGISTRY, STARTUP_SECONDS
+from connection import (
+    REJECTED_CLOSE_CODE,
+    Outbox,
+    Session,
+    broadcast,
+    find_broadcast,
+    game_lock,
+)
+from mcp_server.store import DEFAULT_GAME_ID
+from log import ensure_logging, get_logger, setup_logging
 from utils import *
-from models import AVAILABLE_MODELS
+from models import AVAILABLE_MODELS, ENGINE_MODELS
 
 # --- 설정 ---
+# openai / fastmcp 는 import 만으로 1초 이상 걸리므로 모듈 import 시점이 아니라
+# 서버 시작 후 백그라운드에서 불러옴 (그동안 /, /metrics 는 바로 응답)
+logger = get_logger("gui")
 api_key = os.environ.get("OPENROUTER_API_KEY")
 
-mcp_client = get_mcp_client()
-openrouter_client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=api_key,
-)
-
 app = FastAPI()
-game_manager = GameManager(mcp_client=mcp_client, openrouter_client=openrouter_client)
+scheduler = RequestScheduler()
+game_manager: Optional[GameManager] = None
+# 열려 있는 플레이어 /ws 연결 수 (마지막 연결이 끊기면 엔진의 생각하기를 멈춤)
+_players = 0
+_ready: Optional[asyncio.Task] = None
+
+
+def create_game_manager() -> GameManager:
+    """무거운 의존성 import + 클라이언트 생성 (이벤트 루프를 막지 않도록 스레드에서 실행)"""
+    from openai import OpenAI
+
+    from mcp_server.client import get_mcp_client
+    from cache import MoveCache
+
+    # 착수 캐시 (opt-in): GOMOKU_MOVE_CACHE=<sqlite 파일 경로>
+    move_cache_path = os.environ.get("GOMOKU_MOVE_CACHE")
+    manager = GameManager(
+        mcp_client=get_mcp_client(),
+        openrouter_client=OpenAI(
+            base_url="https://openrouter.ai/api/v1",
+            api_key=api_key,
+        ),
+        move_cache=MoveCache(move_cache_path) if move_cache_path else None,
+        scheduler=scheduler,
+        priority=INTERACTIVE,
+    )
+
+    # 단일 요청 착수 모드 (opt-in): GOMOKU_MOVE_MODE=structured
+    manager.move_mode = os.environ.get("GOMOKU_MOVE_MODE", "tools")
+
+    # 투기적 실행 (opt-in): GOMOKU_SPECULATIVE_MODELS="model-a,model-b,model-a"
+    #                       GOMOKU_SPECULATIVE_DEADLINE=<초>
+    speculative_models = os.environ.get("GOMOKU_SPECULATIVE_MODELS")
+    if speculative_models:
+        manager.speculative_models = [
+            model.strip() for model in speculative_models.split(",") if model.strip()
+        ]
+        speculative_deadline = os.environ.get("GOMOKU_SPECULATIVE_DEADLINE")
+        if speculative_deadline:
+            manager.speculative_deadline = float(speculative_deadline)
+
+    # 로컬 MCTS 엔진 ("MCTS Engine" 모델 선택 시): GOMOKU_ENGINE_TIME=<수마다 초>
+    #                                             GOMOKU_ENGINE_WORKERS=<프로세스 수>
+    engine_time = os.environ.get("GOMOKU_ENGINE_TIME")
+    if engine_time:
+        manager.engine_options["time_limit"] = float(engine_time)
+    manager.engine_options["workers"] = int(
+        os.environ.get("GOMOKU_ENGINE_WORKERS", "1")
+    )
+    # 사람 차례 동안 엔진이 미리 생각함 (opt-in): GOMOKU_ENGINE_PONDER=1
+    manager.engine_ponder = os.environ.get("GOMOKU_ENGINE_PONDER") == "1"
+    # 정책 / 가치망 (opt-in, numpy 필요): GOMOKU_ENGINE_NET=<train.py fit 으로 만든 .npz>
+    engine_net = os.environ.get("GOMOKU_ENGINE_NET")
+    if engine_net:
+        from game.network import BatchingEvaluator, NetworkEvaluator, PolicyValueNet
+
+        net = PolicyValueNet.load(engine_net)
+        manager.engine_options["evaluator"] = NetworkEvaluator(
+            net, BatchingEvaluator(net)
+        )
+    return manager
+
+
+async def initialize():
+    """GameManager 생성 + MCP 초기화 (프로세스당 한 번)"""
+    global game_manager
+    started = time.perf_counter()
+    with STARTUP_SECONDS.time(phase="imports"):
+        manager = await asyncio.to_thread(create_game_manager)
+    with STARTUP_SECONDS.time(phase="mcp_init"):
+        await manager.initialize_mcp()
+    game_manager = manager
+    logger.info(
+        "🚀 초기화 완료: 모듈 import %.0f ms, 의존성 + MCP %.0f ms",
+        _IMPORT_SECONDS * 1000,
+        (time.perf_counter() - started) * 1000,
+    )
+
+
+async def get_game_manager() -> GameManager:
+    """초기화가 끝날 때까지 기다렸다가 GameManager 반환"""
+    await asyncio.shield(_ready)
+    return game_manager
 
 
 @app.on_event("startup")
 async def startup_event():
-    """서버 시작 시 MCP 초기화"""
-    await game_manager.initialize_mcp()
+    """서버 시작 시 초기화를 백그라운드로 시작 (요청은 get_game_manager 에서 대기)"""
+    global _ready
+    ensure_logging()
+    STARTUP_SECONDS.observe(_IMPORT_SECONDS, phase="module_import")
+    _ready = asyncio.create_task(initialize())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 형식 메트릭"""
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.get("/models")
 async def get_models():
     """사용 가능한 모델 목록 반환"""
-    return {"models": AVAILABLE_MODELS}
+    return {"models": AVAILABLE_MODELS + ENGINE_MODELS}
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -48,7 +150,7 @@ async def get_homepage():
     model_options = "\n".join(
         [
             f'<option value="{model["id"]}">{model["name"]}</option>'
-            for model in AVAILABLE_MODELS
+            for model in AVAILABLE_MODELS + ENGINE_MODELS
         ]
     )
 
@@ -232,6 +334,17 @@ async def get_homepage():
                 cursor: not-allowed;
             }
             
+            #cancelButton, #resumeButton {
+                display: none;
+                padding: 10px 18px;
+                background: white;
+                color: #2f2f2f;
+                border: 1px solid #2f2f2f;
+                border-radius: 20px;
+                font-size: 15px;
+                cursor: pointer;
+            }
+            
             /* 오른쪽 바둑판 영역 */
             .board-container {
                 width: 600px;
@@ -261,8 +374,9 @@ async def get_homepage():
             .board-wrapper {
                 flex: 1;
                 display: flex;
-                justify-content: center;
-                align-items: center;
+                justify-content: safe center;
+                align-items: safe center;
+                overflow: auto;
             }
             
             #gomoku-board-container {
@@ -274,8 +388,6 @@ async def get_homepage():
             
             #gomoku-board {
                 position: relative;
-                width: 450px;
-                height: 450px;
                 background: #e3c16f;
                 border: 2px solid #5a4f41;
             }
@@ -293,8 +405,6 @@ async def get_homepage():
                 position: absolute;
                 top: 15px;
                 left: 15px;
-                width: 420px;
-                height: 420px;
                 background-image: 
                     repeating-linear-gradient(to right, transparent, transparent 30px, #5a4f41 30px, #5a4f41 31px),
                     repeating-linear-gradient(to bottom, transparent, transparent 30px, #5a4f41 30px, #5a4f41 31px);
@@ -406,6 +516,8 @@ async def get_homepage():
                             rows="1"
                         ></textarea>
                         <button id="sendButton">전송</button>
+                        <button id="cancelButton">중지</button>
+                        <button id="resumeButton">AI 계속</button>
                     </div>
                 </div>
             </div>
@@ -425,50 +537,109 @@ async def get_homepage():
         </div>
         
         <script>
-            const ws = new WebSocket(`ws://${window.location.host}/ws`);
+            // ?format=binary 로 열면 보드 상태를 바이너리 프레임으로 받음
+            // ?watch=<game_id> 로 열면 읽기 전용 관전 (/watch)
+            const params = new URLSearchParams(window.location.search);
+            const wsFormat = params.get('format') || 'json';
+            const watching = params.get('watch');
+            const ws = new WebSocket(watching
+                ? `ws://${window.location.host}/watch?game=${encodeURIComponent(watching)}&format=${wsFormat}`
+                : `ws://${window.location.host}/ws?format=${wsFormat}`);
+            ws.binaryType = 'arraybuffer';
             const messagesDiv = document.getElementById('messages');
             const messageInput = document.getElementById('messageInput');
             const sendButton = document.getElementById('sendButton');
+            const cancelButton = document.getElementById('cancelButton');
+            const resumeButton = document.getElementById('resumeButton');
             const modelSelect = document.getElementById('modelSelect');
             const boardElement = document.getElementById('gomoku-board');
             const turnInfoElement = document.getElementById('turnInfo');
             
-            let isProcessing = false;
+            // 관전 중에는 착수 / 채팅을 보내지 않음
+            let isProcessing = Boolean(watching);
+            // 취소 / 실패로 AI 차례가 남음: "AI 계속" 전까지 바둑판을 막음
+            let aiTurnPending = false;
+            
+            // 보이는 바둑판 영역: 실제 좌표 (x0, y0) 부터 cols x rows 칸
+            // 희소 / 무한 보드는 돌들을 감싸는 영역 + 여백만 그림
+            const CELL_SIZE = 30; // 격자 간격
+            const BOARD_OFFSET = 15; // 보드 가장자리에서 첫 교차점까지의 거리
+            const VIEW_MARGIN = 3;
+            const VIEW_MIN = 15;
+            let boardView = null;
+            let boardState = { turn: null, width: 15, height: 15, dense: true, stones: [] };
+            
+            // 한 축의 보이는 범위 [lo, hi] (size 가 null 이면 무한)
+            function viewRange(coords, size) {
+                let lo, hi;
+                if (coords.length) {
+                    lo = Math.min(...coords) - VIEW_MARGIN;
+                    hi = Math.max(...coords) + VIEW_MARGIN;
+                } else {
+                    lo = hi = size ? Math.floor(size / 2) : 0;
+                }
+                const grow = VIEW_MIN - (hi - lo + 1);
+                if (grow > 0) {
+                    lo -= Math.floor(grow / 2);
+                    hi += Math.ceil(grow / 2);
+                }
+                if (size) {
+                    // 유한 보드: 가장자리 밖으로 나간 만큼 안쪽으로 밀고 자름
+                    if (lo < 0) { hi -= lo; lo = 0; }
+                    if (hi > size - 1) { lo -= hi - (size - 1); hi = size - 1; }
+                    lo = Math.max(lo, 0);
+                }
+                return [lo, hi];
+            }
+            
+            function computeView({ width, height, dense, stones }) {
+                if (dense && width && height) {
+                    return { x0: 0, y0: 0, cols: width, rows: height };
+                }
+                const [x0, x1] = viewRange(stones.map(s => s.x), width);
+                const [y0, y1] = viewRange(stones.map(s => s.y), height);
+                return { x0, y0, cols: x1 - x0 + 1, rows: y1 - y0 + 1 };
+            }
             
-            // 바둑판 초기화
-            function initializeBoard() {
+            // 바둑판 초기화 (보이는 영역이 바뀔 때마다 다시 만듦)
+            function initializeBoard(view) {
+                boardView = view;
                 boardElement.innerHTML = '';
+                const span = (n) => (BOARD_OFFSET * 2 + (n - 1) * CELL_SIZE) + 'px';
+                boardElement.style.width = span(view.cols);
+                boardElement.style.height = span(view.rows);
                 
                 // 격자선 추가
                 const gridDiv = document.createElement('div');
                 gridDiv.className = 'board-grid';
+                gridDiv.style.width = ((view.cols - 1) * CELL_SIZE) + 'px';
+                gridDiv.style.height = ((view.rows - 1) * CELL_SIZE) + 'px';
                 boardElement.appendChild(gridDiv);
                 
-                // 교차점(셀) 생성
-                const cellSize = 30; // 격자 간격
-                const offset = 15; // 보드 가장자리에서 첫 교차점까지의 거리
-                
-                for (let r = 0; r < 15; r++) {
-                    for (let c = 0; c < 15; c++) {
+                // 교차점(셀) 생성: id / 좌표는 실제 보드 좌표
+                for (let r = 0; r < view.rows; r++) {
+                    for (let c = 0; c < view.cols; c++) {
+                        const x = view.x0 + c;
+                        const y = view.y0 + r;
                         const cell = document.createElement('div');
                         cell.className = 'cell';
-                        cell.id = `cell-${r}-${c}`;
-                        cell.dataset.row = r;
-                        cell.dataset.col = c;
+                        cell.id = `cell-${y}-${x}`;
+                        cell.dataset.row = y;
+                        cell.dataset.col = x;
                         
                         // 교차점 위치에 배치 (격자 중심에서 약간 빼서 중앙 정렬)
-                        cell.style.left = (offset + c * cellSize - 12) + 'px';
-                        cell.style.top = (offset + r * cellSize - 12) + 'px';
+                        cell.style.left = (BOARD_OFFSET + c * CELL_SIZE - 12) + 'px';
+                        cell.style.top = (BOARD_OFFSET + r * CELL_SIZE - 12) + 'px';
                         
                         // 좌표 표시 요소 추가
                         const coordinate = document.createElement('div');
                         coordinate.className = 'cell-coordinate';
-                        coordinate.textContent = `(${c}, ${r})`;
+                        coordinate.textContent = `(${x}, ${y})`;
                         cell.appendChild(coordinate);
                         
                         // 클릭 이벤트 추가 - 바둑돌 직접 놓기
                         cell.addEventListener('click', async () => {
-                            if (isProcessing) return;
+                            if (isProcessing || aiTurnPending) return;
                             
                             // 이미 돌이 놓여있는지 확인
                             if (cell.querySelector('.stone')) return;
@@ -477,14 +648,14 @@ async def get_homepage():
                             disableBoard();
                             
                             // 사용자 액션 메시지
-                            addMessage('user', `돌을 (${c}, ${r})에 놓습니다.`);
+                            addMessage('user', `돌을 (${x}, ${y})에 놓습니다.`);
                             addLoadingMessage();
                             
                             // 서버에 돌 놓기 요청
                             ws.send(JSON.stringify({
                                 action: 'place_stone',
-                                x: c,
-                                y: r,
+                                x: x,
+                                y: y,
                                 model: modelSelect.value
                             }));
                         });
@@ -494,6 +665,32 @@ async def get_homepage():
                 }
             }
             
+            // boardState 를 그림 (보이는 영역이 바뀌면 격자부터 다시 만듦)
+            function renderBoard() {
+                const view = computeView(boardState);
+                if (!boardView || ['x0', 'y0', 'cols', 'rows'].some(k => view[k] !== boardView[k])) {
+                    initializeBoard(view);
+                    if (isProcessing || aiTurnPending) disableBoard();
+                }
+                if (boardState.turn) {
+                    turnInfoElement.textContent = `Turn: ${boardState.turn}`;
+                }
+                
+                document.querySelectorAll('.cell .stone').forEach(stone => {
+                    stone.parentElement.classList.remove('disabled');
+                    stone.remove();
+                });
+                for (const { x, y, type } of boardState.stones) {
+                    const cell = document.getElementById(`cell-${y}-${x}`);
+                    if (!cell) continue;
+                    const stone = document.createElement('div');
+                    stone.className = `stone ${type.toLowerCase()}`;
+                    cell.appendChild(stone);
+                    cell.classList.add('disabled');
+                }
+                if (isProcessing || aiTurnPending) disableBoard();
+            }
+            
             // 바둑판 비활성화
             function disableBoard() {
                 document.querySelectorAll('.cell').forEach(cell => {
@@ -510,30 +707,43 @@ async def get_homepage():
                 });
             }
             
-            // 바둑판 업데이트
+            // AI 차례가 끝남 (성공 / 취소 / 실패): 아직 AI 차례면 "AI 계속" 버튼을 보여 줌
+            function endTurn(data) {
+                isProcessing = false;
+                aiTurnPending = Boolean(data.ai_turn_pending);
+                resumeButton.style.display = aiTurnPending ? 'inline-block' : 'none';
+                if (aiTurnPending) {
+                    disableBoard();
+                } else {
+                    enableBoard();
+                }
+            }
+            
+            // 바둑판 업데이트 (GomokuState: 희소 보드는 board 가 null 이고 stones 만 있음)
             function updateBoard(gameState) {
-                if (!gameState || !gameState.board) return;
-                
-                const { turn, board } = gameState;
-                turnInfoElement.textContent = `Turn: ${turn}`;
-                
-                for (let r = 0; r < board.length; r++) {
-                    for (let c = 0; c < board[r].length; c++) {
-                        const cell = document.getElementById(`cell-${r}-${c}`);
-                        if (!cell) continue;
-                        
-                        const existingStone = cell.querySelector('.stone');
-                        if (existingStone) existingStone.remove();
-                        
-                        const stoneType = board[r][c];
-                        if (stoneType) {
-                            const stone = document.createElement('div');
-                            stone.className = `stone ${stoneType.toLowerCase()}`;
-                            cell.appendChild(stone);
-                            cell.classList.add('disabled');
-                        }
-                    }
+                if (!gameState) return;
+                let stones = gameState.stones;
+                if (!stones && gameState.board) {
+                    stones = [];
+                    gameState.board.forEach((row, y) => row.forEach((type, x) => {
+                        if (type) stones.push({ x, y, type });
+                    }));
                 }
+                boardState = {
+                    turn: gameState.turn,
+                    width: gameState.width || null,
+                    height: gameState.height || null,
+                    dense: Boolean(gameState.board),
+                    stones: stones || [],
+                };
+                renderBoard();
+            }
+            
+            // 관전: 새로 놓인 돌만 추가 ("move" 이벤트)
+            function addStones(stones, turn) {
+                boardState.turn = turn;
+                boardState.stones = boardState.stones.concat(stones);
+                renderBoard();
             }
             
             // 메시지 추가
@@ -580,11 +790,78 @@ async def get_homepage():
                 if (loadingMsg) loadingMsg.remove();
             }
             
+            // 바이너리 보드 프레임 (connection.encode_board) → { turn, board }
+            const FRAME_TURNS = ['BLACK', 'WHITE', 'BLACK_WIN', 'WHITE_WIN'];
+            function decodeBoardFrame(buffer) {
+                const view = new DataView(buffer);
+                // 0 이면 무한 보드
+                const width = view.getUint16(4) || null;
+                const height = view.getUint16(6) || null;
+                const count = view.getUint16(8);
+                const stones = [];
+                for (let i = 0, offset = 10; i < count; i++, offset += 5) {
+                    const x = view.getInt16(offset);
+                    const y = view.getInt16(offset + 2);
+                    const type = view.getUint8(offset + 4) === 1 ? 'BLACK' : 'WHITE';
+                    stones.push({ x, y, type });
+                }
+                // 프레임에는 board 가 없으므로 dense 보드 (game.state.DENSE_MAX_CELLS 이하) 만 전체를 그림
+                const board = width && width * height <= 32 * 32 ? [] : null;
+                // 메시지 타입 5 ("move") 는 새 돌만 담긴 관전 이벤트
+                return { move: view.getUint8(1) === 5, turn: FRAME_TURNS[view.getUint8(2)], width, height, board, stones };
+            }
+            
             // WebSocket 메시지 처리
             ws.onmessage = (event) => {
+                if (event.data instanceof ArrayBuffer) {
+                    // 보드 상태만 담긴 프레임 (메시지 본문은 뒤따르는 JSON 프레임)
+                    const frame = decodeBoardFrame(event.data);
+                    if (frame.move) {
+                        addStones(frame.stones, frame.turn);
+                    } else {
+                        updateBoard(frame);
+                    }
+                    return;
+                }
                 const data = JSON.parse(event.data);
                 
-                if (data.type === 'stone_placed') {
+                // AI 차례 / 채팅 응답이 오면 중지 버튼을 숨김
+                if (['ai_response', 'response', 'cancelled', 'error'].includes(data.type)) {
+                    cancelButton.style.display = 'none';
+                }
+                
+                if (data.type === 'ping') {
+                    // 서버 heartbeat: 응답하지 않으면 연결이 끊김
+                    ws.send(JSON.stringify({ action: 'pong', t: data.t }));
+                    
+                } else if (data.type === 'busy') {
+                    addMessage('system', '⏳ 이전 요청을 처리하는 중입니다.');
+                    
+                } else if (data.type === 'cancelled' || data.type === 'error') {
+                    // 진행 중이던 AI 차례 / 채팅이 취소되었거나 실패함
+                    removeLoadingMessage();
+                    addMessage('system', data.type === 'cancelled' ? '⏹️ 취소했습니다.' : `❌ Error: ${data.error}`);
+                    if (data.state) {
+                        updateBoard(data.state);
+                    }
+                    endTurn(data);
+                    sendButton.disabled = false;
+                    messageInput.disabled = false;
+                    
+                } else if (data.type === 'move') {
+                    // 관전: 지난 이벤트 뒤로 새로 놓인 돌
+                    addStones(data.delta.stones, data.delta.turn);
+                    
+                } else if (data.type === 'state') {
+                    // 접속 시 현재 게임 상태 (재시작 후 복원된 게임 포함)
+                    if (data.state) {
+                        updateBoard(data.state);
+                    }
+                    if (!watching) {
+                        endTurn(data);
+                    }
+                    
+                } else if (data.type === 'stone_placed') {
                     // 사용자가 놓은 돌 반영
                     removeLoadingMessage();
                     if (data.state) {
@@ -592,6 +869,7 @@ async def get_homepage():
                     }
                     addMessage('system', '당신의 차례가 끝났습니다. AI가 수를 두는 중...');
                     addLoadingMessage();
+                    cancelButton.style.display = 'inline-block';
                     
                 } else if (data.type === 'ai_response') {
                     // AI가 놓은 돌 반영
@@ -606,8 +884,7 @@ async def get_homepage():
                         }
                     }
                     
-                    isProcessing = false;
-                    enableBoard();
+                    endTurn(data);
                     
                 } else if (data.type === 'response') {
                     // 일반 채팅 응답
@@ -648,6 +925,7 @@ async def get_homepage():
                 
                 addMessage('user', message);
                 addLoadingMessage();
+                cancelButton.style.display = 'inline-block';
                 
                 ws.send(JSON.stringify({
                     action: 'chat',
@@ -662,6 +940,21 @@ async def get_homepage():
             // 이벤트 리스너
             sendButton.addEventListener('click', sendMessage);
             
+            // 진행 중인 AI 차례 / 채팅 취소
+            cancelButton.addEventListener('click', () => {
+                ws.send(JSON.stringify({ action: 'cancel' }));
+            });
+            
+            // 취소 / 실패로 남은 AI 차례를 이어서 진행
+            resumeButton.addEventListener('click', () => {
+                if (isProcessing) return;
+                isProcessing = true;
+                resumeButton.style.display = 'none';
+                addLoadingMessage();
+                cancelButton.style.display = 'inline-block';
+                ws.send(JSON.stringify({ action: 'resume', model: modelSelect.value }));
+            });
+            
             messageInput.addEventListener('keydown', (e) => {
                 if (e.key === 'Enter' && !e.shiftKey) {
                     e.preventDefault();
@@ -675,7 +968,13 @@ async def get_homepage():
             });
             
             // 초기화
-            initializeBoard();
+            renderBoard();
+            if (watching) {
+                disableBoard();
+                sendButton.disabled = true;
+                messageInput.disabled = true;
+                addMessage('system', `👀 ${watching} 게임을 관전하는 중입니다.`);
+            }
         </script>
     </body>
     </html>
@@ -683,76 +982,176 @@ async def get_homepage():
     return HTMLResponse(content=html_content.replace("{model_options}", model_options))
 
 
+def leave_game() -> None:
+    """플레이어 연결이 끊김: 마지막 연결이면 엔진의 생각하기 / 워커 풀을 정리
+
+    아무도 두지 않는 게임을 위해 백그라운드에서 계속 생각하지 않도록
+    """
+    global _players
+    _players -= 1
+    if _players == 0 and game_manager is not None:
+        game_manager.close()
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket 엔드포인트"""
+    """WebSocket 엔드포인트 (?format=binary 면 보드 상태를 바이너리 프레임으로 받음)"""
     await websocket.accept()
+    # 전송은 연결별 송신 큐가 따로 함: 느린 클라이언트가 처리를 막지 않음
+    outbox = Outbox(websocket, binary=websocket.query_params.get("format") == "binary")
+    sender = asyncio.create_task(outbox.run())
+    global _players
+    _players += 1
 
     try:
-        while True:
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
-
-            action = message_data.get("action")
-            model = message_data.get("model", AVAILABLE_MODELS[0]["id"])
-
-            if action == "place_stone":
-                # 사용자가 바둑판에 돌을 놓음
-                x = message_data.get("x")
-                y = message_data.get("y")
-
-                try:
-                    # 1. 사용자가 돌 놓기
-                    await game_manager.set_stone(x, y)
-
-                    # 사용자 돌 놓기 결과 전송
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "stone_placed",
-                                "state": game_manager.current_state.model_dump(),
-                            }
-                        )
-                    )
-
-                    # 2. AI가 상대방으로 수 두기
-                    game_manager.current_model = model
-                    ai_result = await game_manager.process_ai_turn()
-
-                    # AI 응답 전송
-                    await websocket.send_text(
-                        json.dumps({"type": "ai_response", **ai_result})
-                    )
-
-                except Exception as e:
-                    print(f"❌ 돌 놓기 오류: {e}")
-                    import traceback
-
-                    traceback.print_exc()
-                    await websocket.send_text(
-                        json.dumps({"type": "ai_response", "error": str(e)})
-                    )
-
-            elif action == "chat":
-                # 일반 채팅 메시지 처리
-                user_message = message_data.get("message")
-                result = await game_manager.process_message(user_message, model)
-                await websocket.send_text(json.dumps({"type": "response", **result}))
+        game_manager = await get_game_manager()
+        # 보드가 바뀔 때마다 관전 허브에도 알림 (같은 상태면 허브가 무시)
+        spectators = broadcast(DEFAULT_GAME_ID)
+
+        async def snapshot() -> dict:
+            """현재 보드 + AI 차례가 남았는지 (접속 / 취소 직후 클라이언트가 이어서 둘 수 있는지)"""
+            state = (await game_manager.update_state()).model_dump()
+            spectators.publish(state)
+            return {"state": state, "ai_turn_pending": game_manager.ai_turn_pending}
+
+        async def ai_turn(message_data: dict):
+            """AI가 상대방으로 수 두기 (실패하면 AI 차례가 남아 resume 으로 다시 시도)"""
+            game_manager.current_model = message_data.get(
+                "model", AVAILABLE_MODELS[0]["id"]
+            )
+            ai_result = await game_manager.process_ai_turn()
+
+            # AI 응답 전송
+            outbox.send(
+                {
+                    "type": "ai_response",
+                    **ai_result,
+                    "ai_turn_pending": game_manager.ai_turn_pending,
+                }
+            )
+            if "state" in ai_result:
+                spectators.publish(ai_result["state"])
+
+        async def place_stone(message_data: dict):
+            """사용자가 바둑판에 돌을 놓고 AI 가 상대방으로 수를 둠"""
+            try:
+                # 1. 사용자가 돌 놓기 (AI 차례가 남아 있으면 거절)
+                await game_manager.place_human_stone(
+                    message_data.get("x"), message_data.get("y")
+                )
+
+                # 사용자 돌 놓기 결과 전송
+                state = game_manager.current_state.model_dump()
+                outbox.send({"type": "stone_placed", "state": state})
+                spectators.publish(state)
+
+                # 2. AI가 상대방으로 수 두기
+                await ai_turn(message_data)
+
+            except Exception as e:
+                logger.exception("❌ 돌 놓기 오류: %s", e)
+                outbox.send(
+                    {
+                        "type": "ai_response",
+                        "error": str(e),
+                        "ai_turn_pending": game_manager.ai_turn_pending,
+                    }
+                )
+
+        async def resume(message_data: dict):
+            """취소 / 실패로 남은 AI 차례를 이어서 진행"""
+            if not game_manager.ai_turn_pending:
+                outbox.send({"type": "ai_response", "error": "No AI turn is pending"})
+                return
+            try:
+                await ai_turn(message_data)
+            except Exception as e:
+                logger.exception("❌ AI 차례 재개 오류: %s", e)
+                outbox.send(
+                    {"type": "ai_response", "error": str(e), "ai_turn_pending": True}
+                )
+
+        async def chat(message_data: dict):
+            """일반 채팅 메시지 처리"""
+            result = await game_manager.process_message(
+                message_data.get("message"),
+                message_data.get("model", AVAILABLE_MODELS[0]["id"]),
+            )
+            outbox.send({"type": "response", **result})
+            if "state" in result:
+                spectators.publish(result["state"])
+
+        # 접속 시 현재 보드 전송 (착수 로그에서 복원된 게임이 있으면 이어서 둘 수 있음)
+        outbox.send({"type": "state", **await snapshot()}, key="state")
+
+        # 수신 루프는 작업 (AI 차례 / 채팅) 을 태스크로 돌리고 계속 받음: 그동안 cancel / ping 처리
+        session = Session(
+            websocket,
+            outbox,
+            {"place_stone": place_stone, "resume": resume, "chat": chat},
+            lock=game_lock(DEFAULT_GAME_ID),
+            snapshot=snapshot,
+        )
+        await session.run()
 
     except WebSocketDisconnect:
-        print("🔌 WebSocket 연결 종료")
+        logger.info("🔌 WebSocket 연결 종료")
     except Exception as e:
-        print(f"❌ WebSocket 오류: {e}")
-        import traceback
+        logger.exception("❌ WebSocket 오류: %s", e)
+    finally:
+        sender.cancel()
+        leave_game()
+
+
+@app.websocket("/watch")
+async def watch_endpoint(websocket: WebSocket):
+    """관전 WebSocket (읽기 전용)
 
-        traceback.print_exc()
+    ?game=<게임 id>, ?since=<마지막으로 받은 seq> (다시 붙을 때 빠진 이벤트만), ?format=binary
+    """
+    params = websocket.query_params
+    game_id = params.get("game") or DEFAULT_GAME_ID
+    since = params.get("since")
+    # 이 프로세스가 진행하는 게임만 (다른 id 로 허브가 늘어나지 않도록)
+    if game_id == DEFAULT_GAME_ID:
+        hub = broadcast(game_id)
+    else:
+        hub = find_broadcast(game_id)
+    if hub is None or (since is not None and not since.isdigit()):
+        logger.info("🚫 관전 거절: game=%r since=%r", game_id, since)
+        await websocket.close(code=REJECTED_CLOSE_CODE)
+        return
+
+    await websocket.accept()
+    outbox = Outbox(websocket, binary=params.get("format") == "binary")
+    sender = asyncio.create_task(outbox.run())
 
+    try:
+        if hub.state is None and game_id == DEFAULT_GAME_ID:
+            # 아직 아무도 두지 않았으면 현재 보드부터
+            game_manager = await get_game_manager()
+            hub.publish((await game_manager.update_state()).model_dump())
+        hub.subscribe(outbox, since=int(since) if since is not None else None)
+        logger.info("👀 관전 시작: %s (관전자 %d)", game_id, len(hub))
+
+        # 받는 것은 ping / pong 뿐 (착수 / 채팅은 "Unknown action")
+        await Session(websocket, outbox, {}, lock=game_lock(game_id)).run()
+
+    except WebSocketDisconnect:
+        logger.info("🔌 관전 연결 종료: %s", game_id)
+    except Exception as e:
+        logger.exception("❌ 관전 WebSocket 오류: %s", e)
+    finally:
+        hub.unsubscribe(outbox)
+        sender.cancel()
+
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 if __name__ == "__main__":
-    print("=" * 60)
-    print("🎮 Gomoku AI Web Application")
-    print("=" * 60)
-    print("서버 시작: http://127.0.0.1:8000")
-    print("=" * 60)
+    import uvicorn
+
+    setup_logging()
+    logger.info("🎮 Gomoku AI Web Application - 서버 시작: http://127.0.0.1:8000")
 
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+from typing import Optional
+
+# logging.LogRecord 의 기본 속성 (extra 로 넘어온 필드를 구분하기 위함)
+_RESERVED = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (extra 로 넘긴 필드도 함께 기록)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """WARNING 미만 레코드를 확률적으로 샘플링
+
+    - 전역 비율: rate (GOMOKU_LOG_SAMPLE)
+    - 레코드별 비율: logger.debug(..., extra={"sample_rate": 0.01})
+    """
+
+    def __init__(self, rate: float = 1.0) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, "sample_rate", 1.0) * self.rate
+        return rate >= 1.0 or random.random() < rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """메시지 포맷팅까지 리스너 스레드로 미루는 QueueHandler
+
+    기본 QueueHandler.prepare 는 호출한 스레드(이벤트 루프)에서 메시지를 포맷함
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # traceback 객체는 스레드를 넘기기 전에 문자열로 만들어 둠
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    stream=None,
+) -> None:
+    """루트 로거를 큐 핸들러 + 백그라운드 리스너 스레드 구성으로 설정
+
+    이벤트 루프에서는 큐에 레코드를 넣기만 하고, 포맷팅과 stdout/stderr 쓰기는
+    리스너 스레드가 담당. 환경 변수 GOMOKU_LOG_LEVEL / GOMOKU_LOG_FORMAT(text|json)
+    / GOMOKU_LOG_SAMPLE 로 기본값 변경 가능.
+    """
+    global _listener
+
+    level = level or os.environ.get("GOMOKU_LOG_LEVEL", "INFO")
+    fmt = fmt or os.environ.get("GOMOKU_LOG_FORMAT", "text")
+    if sample_rate is None:
+        sample_rate = float(os.environ.get("GOMOKU_LOG_SAMPLE", "1.0"))
+
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+        )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, output, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def ensure_logging() -> None:
+    """아직 설정되지 않았을 때만 setup_logging (uvicorn gui:app 처럼 __main__ 이 아닌 실행용)"""
+    if _listener is None:
+        setup_logging()
+
+
+def shutdown_logging() -> None:
+    """남은 로그를 모두 쓰고 리스너 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
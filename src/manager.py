@@ -1,19 +1,87 @@
 import json
+import asyncio
+from typing import Optional
 
 
 from game.gomoku import GomokuState
+from game.heuristic import Position, best_move, best_option, threat_summary
+from game.mcts import MCTS
+from game.rules import RULE_DESCRIPTIONS, SWAP2_DESCRIPTION, forbidden_reason
+from schema import ChoiceDecision, MoveDecision, SWAP2_OPTIONS, SWAP_OPTIONS
 from utils import *
+from cache import MoveCache, CachedMove, prompt_version
+from scheduler import RequestScheduler, INTERACTIVE
+from log import get_logger
+from metrics import (
+    LLM_REQUEST_SECONDS,
+    LLM_REQUEST_ERRORS,
+    MCP_TOOL_SECONDS,
+    MCP_TOOL_ERRORS,
+    STATE_PARSE_SECONDS,
+    TOOL_LOOP_ITERATIONS,
+    AI_TURN_SECONDS,
+    AI_TURNS,
+    span,
+)
 from prompts.system_prompt import SYSTEM_PROMPT
-from prompts.user_prompt import USER_PROMPT
-from models import AVAILABLE_MODELS
+from prompts.user_prompt import USER_PROMPT, CHOICE_PROMPT
+from prompts.structured_prompt import STRUCTURED_MOVE_PROMPT, STRUCTURED_CHOICE_PROMPT
+from models import AVAILABLE_MODELS, ENGINE_IDS
+
+logger = get_logger(__name__)
+
+PROMPT_VERSION = prompt_version(SYSTEM_PROMPT, USER_PROMPT)
+STRUCTURED_PROMPT_VERSION = prompt_version(SYSTEM_PROMPT, STRUCTURED_MOVE_PROMPT)
+
+MOVE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "gomoku_move",
+        "strict": True,
+        "schema": {
+            **MoveDecision.model_json_schema(),
+            "additionalProperties": False,
+        },
+    },
+}
+
+CHOICE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "gomoku_choice",
+        "strict": True,
+        "schema": {
+            **ChoiceDecision.model_json_schema(),
+            "additionalProperties": False,
+        },
+    },
+}
+
+# 투기적 실행 중에는 게임 상태를 바꾸는 도구를 실제로 실행하지 않음
+MUTATING_TOOLS = ("set_stone", "choose_color", "restart")
+
+# AI 착수(도구 루프 / 투기적 실행) 요청에 싣는 도구: 보드 보기 + 착수만
+MOVE_TOOLS = ("visualize", "set_stone")
+# Swap2 색 선택을 기다리는 동안에는 선택 도구도 실음
+CHOICE_TOOLS = MOVE_TOOLS + ("choose_color",)
 
 
 class GameManager:
-    def __init__(self, mcp_client, openrouter_client):
+    def __init__(
+        self,
+        mcp_client,
+        openrouter_client,
+        move_cache: Optional[MoveCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        priority: int = INTERACTIVE,
+    ):
         self.current_state: GomokuState = GomokuState()
         self.mcp_client = mcp_client
         self.openrouter_client = openrouter_client
-        self.gomoku_tools = []
+        self.move_cache = move_cache
+        self.scheduler = scheduler
+        self.priority = priority
+        self.tool_schemas: Optional[ToolSchemas] = None
         self.messages = [
             {
                 "role": "system",
@@ -21,39 +89,564 @@ class GameManager:
             }
         ]
         self.current_model = AVAILABLE_MODELS[0]["id"]
-        self.initialize_mcp()
+
+        # 투기적 실행 (opt-in): 같은 국면을 여러 모델(또는 같은 모델 여러 번)에 동시에
+        # 보내고 가장 먼저 합법적인 set_stone 을 낸 응답을 채택
+        self.speculative_models: list[str] = []
+        self.speculative_deadline: Optional[float] = None  # 초, 지나면 엔진 수로 대체
+
+        # 착수 방식: "tools" (도구 루프) / "structured" (보드를 프롬프트에 넣고 JSON 한 번)
+        self.move_mode = "tools"
+
+        # 로컬 엔진 (current_model 이 ENGINE_IDS 중 하나일 때): MCTS 생성 인자
+        self.engine_options: dict = {}
+        self._engine: Optional[MCTS] = None
+        self._engine_bounded = True
+        # 엔진이 둔 뒤 사람 차례 동안 미리 생각함 (예측한 수가 오면 바로 응답)
+        self.engine_ponder = False
+        # 사람이 둔 직후의 돌 수: AI 차례가 끝날 때까지 (취소 / 실패 포함) 사람은 두지 못함
+        self._ai_turn_at: Optional[int] = None
+
+        # MCP 초기화는 이벤트 루프 안에서 initialize_mcp() 로 (한 번만)
+        self._mcp_lock = asyncio.Lock()
+        self._mcp_ready = False
 
     async def initialize_mcp(self):
-        """MCP 클라이언트 초기화"""
-        await self.mcp_client.__aenter__()
-        mcp_tools_raw = await self.mcp_client.list_tools()
-        self.gomoku_tools = [to_openrouter_schema(tool) for tool in mcp_tools_raw]
-        print("✅ MCP 클라이언트 초기화 완료")
+        """MCP 클라이언트 초기화 (여러 번 호출해도 한 번만 수행)"""
+        async with self._mcp_lock:
+            if self._mcp_ready:
+                return
+            await self.mcp_client.__aenter__()
+            self.tool_schemas = await load_tool_schemas(self.mcp_client)
+            self._mcp_ready = True
+        logger.info(
+            "✅ MCP 클라이언트 초기화 완료 (도구 %d개, 스키마 %s)",
+            len(self.tool_schemas),
+            self.tool_schemas.version,
+        )
+        logger.debug(
+            "도구 스키마 크기: 전체 %d bytes, 착수용 %d bytes",
+            len(self.tool_schemas.json()),
+            len(self.tool_schemas.json(MOVE_TOOLS, compact=True)),
+        )
+
+    def _tools(self, names: Optional[tuple] = None, compact: bool = False):
+        """요청에 실을 도구 스키마 (메모이즈된 리스트)"""
+        return self.tool_schemas.select(names, compact=compact)
+
+    async def _create_completion(self, **kwargs):
+        """OpenRouter 호출 (동기 클라이언트를 스레드에서 실행해 이벤트 루프를 막지 않음)
+
+        scheduler 가 있으면 rate limit / 재시도 / 우선순위를 스케줄러가 관리
+        """
+        model = kwargs.get("model")
+        try:
+            with LLM_REQUEST_SECONDS.time(model=model):
+                if self.scheduler is not None:
+                    return await self.scheduler.submit(
+                        self.openrouter_client.chat.completions.create,
+                        priority=self.priority,
+                        **kwargs,
+                    )
+                return await asyncio.to_thread(
+                    self.openrouter_client.chat.completions.create, **kwargs
+                )
+        except Exception as e:
+            LLM_REQUEST_ERRORS.inc(model=model, error=type(e).__name__)
+            raise
+
+    async def _call_tool(self, name: str, args: Optional[dict] = None):
+        """MCP 도구 호출 (도구별 지연 시간 기록)"""
+        try:
+            with MCP_TOOL_SECONDS.time(tool=name):
+                return await self.mcp_client.call_tool(name, args)
+        except Exception:
+            MCP_TOOL_ERRORS.inc(tool=name)
+            raise
 
     async def update_state(self):
         try:
-            state_result = await self.mcp_client.call_tool("get_state")
+            state_result = await self._call_tool("get_state")
             json_string = state_result.content[0].text
-            self.current_state = GomokuState.model_validate_json(json_string)
+            with STATE_PARSE_SECONDS.time():
+                self.current_state = GomokuState.model_validate_json(json_string)
         except Exception as e:
-            print(f"⚠️ 상태 업데이트 실패: {e}")
+            logger.warning("⚠️ 상태 업데이트 실패: %s", e)
         return self.current_state
 
+    async def _play_tool(self, name: str, args: dict):
+        """게임 상태를 바꾸는 도구 호출 후 상태 갱신 (서버가 거절하면 ValueError)"""
+        try:
+            await self._call_tool(name, args)
+        except Exception as e:
+            # fastmcp 는 import 가 무거우므로 ToolError 를 이름으로 구분
+            if type(e).__name__ == "ToolError":
+                raise ValueError(str(e)) from e
+            raise
+        return await self.update_state()
+
     async def set_stone(self, x, y):
-        """현재 턴의 플레이어가 돌을 놓음"""
+        """현재 턴의 플레이어가 돌을 놓음 (서버가 거절한 수는 ValueError)"""
         current_turn = self.current_state.turn
-        await self.mcp_client.call_tool(
+        return await self._play_tool(
             "set_stone", {"x": x, "y": y, "turn": current_turn}
         )
-        return await self.update_state()
+
+    async def choose_color(self, option: str):
+        """Swap2 오프닝의 색 선택 (서버가 거절한 선택은 ValueError)"""
+        return await self._play_tool("choose_color", {"option": option})
+
+    def _move_tools(self) -> tuple:
+        """지금 AI 에게 줄 도구 이름 (색 선택을 기다리면 choose_color 포함)"""
+        if self.current_state.pending_choice is not None:
+            return CHOICE_TOOLS
+        return MOVE_TOOLS
+
+    def _choice_options(self) -> tuple:
+        """기다리는 Swap2 선택의 가능한 값"""
+        pending = self.current_state.pending_choice
+        if pending is None:
+            return ()
+        return SWAP2_OPTIONS if pending == "swap2" else SWAP_OPTIONS
+
+    @property
+    def ai_turn_pending(self) -> bool:
+        """사람이 둔 뒤 AI 가 아직 두지 않았는지 (채팅으로 보드가 바뀌었으면 False)"""
+        state = self.current_state
+        return self._ai_turn_at == len(state.stones) and "WIN" not in state.turn
+
+    async def place_human_stone(self, x, y):
+        """사람이 돌을 놓음 (AI 차례면 거절: 사람이 AI 의 돌을 대신 놓지 않도록)"""
+        if self.ai_turn_pending:
+            raise ValueError(f"It is the AI's turn ({self.current_state.turn}).")
+        state = await self.set_stone(x, y)
+        self._ai_turn_at = len(state.stones)
+        return state
+
+    async def _apply_cached_move(self, user_prompt: str, cached: CachedMove) -> dict:
+        """캐시된 착수를 LLM 호출 없이 그대로 재현"""
+        await self.set_stone(cached.x, cached.y)
+        self.messages.append({"role": "user", "content": user_prompt})
+        self.messages.append({"role": "assistant", "content": cached.response})
+        return {
+            "response": cached.response,
+            "state": self.current_state.model_dump(),
+            "cached": True,
+        }
+
+    def _check_move(self, args: dict, turn: str) -> tuple[int, int]:
+        """set_stone 인자를 현재 상태에 대해 로컬에서 검증 (Gomoku.set_stone 과 같은 규칙)"""
+        x, y = int(args["x"]), int(args["y"])
+        state = self.current_state
+        if state.pending_choice is not None:
+            raise ValueError("Waiting for the swap2 color choice")
+        if args.get("turn") != turn:
+            raise ValueError(f"It is not {args.get('turn')}'s turn.")
+        if state.width is not None and not (
+            0 <= x < state.width and 0 <= y < state.height
+        ):
+            raise ValueError("Coordinates out of bounds")
+        if any(stone.x == x and stone.y == y for stone in state.stones):
+            raise ValueError("Cell is already occupied")
+        if state.rule == "renju" and turn == "BLACK":
+            reason = forbidden_reason(Position.from_state(state).reader(), x, y)
+            if reason is not None:
+                raise ValueError(
+                    f"Forbidden move for BLACK under renju rules: {reason}"
+                )
+        return x, y
+
+    def _check_choice(self, option) -> str:
+        """choose_color 인자를 현재 상태에 대해 로컬에서 검증 (Gomoku.choose 와 같은 규칙)"""
+        options = self._choice_options()
+        if not options:
+            raise ValueError("No opening choice is pending")
+        if option not in options:
+            raise ValueError(
+                f"Invalid choice {option!r}, expected one of {', '.join(options)}"
+            )
+        return option
+
+    async def _play_decision(self, decision) -> str:
+        """검증한 착수 (x, y) 또는 색 선택을 두고, 기록용 표기를 반환"""
+        if isinstance(decision, str):
+            await self.choose_color(decision)
+            return f"Swap2 choice: {decision}"
+        x, y = decision
+        await self.set_stone(x, y)
+        return f"({x}, {y})"
+
+    async def _play_fallback(self) -> Optional[str]:
+        """내장 휴리스틱으로 두거나 색을 고름 (둘 수 없으면 None)"""
+        state = self.current_state
+        if state.pending_choice is not None:
+            decision = best_option(state)
+        else:
+            decision = best_move(state)
+        if decision is None:
+            return None
+        return await self._play_decision(decision)
+
+    async def _speculate(self, model: str, user_prompt: str, turn: str):
+        """후보 모델 하나로 도구 루프를 돌리되 set_stone / choose_color 는 검증만 하고 반환
+
+        Returns:
+            (model, (x, y) 또는 색 선택, content) 또는 합법적인 수를 내지 못하면 None
+        """
+        messages = self.messages + [{"role": "user", "content": user_prompt}]
+
+        try:
+            for _ in range(10):
+                response = await self._create_completion(
+                    model=model,
+                    messages=messages,
+                    tools=self._tools(self._move_tools(), compact=True),
+                    tool_choice="auto",
+                )
+                if not response or not response.choices:
+                    return None
+
+                response_message = response.choices[0].message
+                if not response_message.tool_calls:
+                    return None
+                messages.append(response_message)
+
+                for tool_call in response_message.tool_calls:
+                    function_name = tool_call.function.name
+                    try:
+                        function_args = json.loads(tool_call.function.arguments)
+                        if function_name == "set_stone":
+                            move = self._check_move(function_args, turn)
+                            return model, move, response_message.content
+                        if function_name == "choose_color":
+                            option = self._check_choice(function_args.get("option"))
+                            return model, option, response_message.content
+                        if function_name in MUTATING_TOOLS:
+                            raise ValueError(f"{function_name} is not allowed now")
+                        function_response = await self._call_tool(
+                            function_name, function_args
+                        )
+                    except Exception as e:
+                        function_response = f"Error executing function: {e}"
+
+                    messages.append(
+                        {
+                            "tool_call_id": tool_call.id,
+                            "role": "tool",
+                            "name": function_name,
+                            "content": str(function_response),
+                        }
+                    )
+        except Exception as e:
+            logger.warning("⚠️ 투기적 호출 실패 (%s): %s", model, e)
+        return None
+
+    async def _process_ai_turn_speculative(self, user_prompt: str) -> dict:
+        """여러 후보를 동시에 실행하고 첫 번째 합법 수를 채택, 나머지는 취소
+
+        취소된 후보의 HTTP 요청은 워커 스레드에서 끝까지 진행되지만 결과는 버려짐.
+        deadline 안에 합법 수가 없으면 내장 휴리스틱 엔진의 수를 둠.
+        """
+        turn = self.current_state.turn
+        loop = asyncio.get_running_loop()
+        deadline = (
+            loop.time() + self.speculative_deadline
+            if self.speculative_deadline is not None
+            else None
+        )
+
+        pending = {
+            asyncio.create_task(self._speculate(model, user_prompt, turn))
+            for model in self.speculative_models
+        }
+        winner = None
+        try:
+            while pending and winner is None:
+                timeout = None if deadline is None else max(0, deadline - loop.time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break  # deadline 초과
+                for task in done:
+                    if task.result() is not None:
+                        winner = task.result()
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if winner is not None:
+            model, decision, content = winner
+            try:
+                played = await self._play_decision(decision)
+                response = content or played
+            except ValueError as e:
+                # 로컬 검증을 통과했지만 서버가 거절: 엔진 수로 대체
+                logger.warning("⚠️ %s 의 수 %s 거절: %s", model, decision, e)
+                winner = None
+        if winner is None:
+            model = "engine"
+            played = await self._play_fallback()
+            if played is None:
+                return {"error": "둘 수 있는 수가 없습니다."}
+            response = f"⏱️ 제한 시간 안에 응답이 없어 엔진이 대신 두었습니다: {played}"
+
+        self.messages.append({"role": "user", "content": user_prompt})
+        self.messages.append({"role": "assistant", "content": response})
+        return {
+            "response": response,
+            "state": self.current_state.model_dump(),
+            "model": model,
+            "speculative": True,
+        }
+
+    async def _structured_prompt(self) -> str:
+        """보드 그림과 위협 요약을 담은 단일 요청용 프롬프트 생성"""
+        state = self.current_state
+        visual = await self._call_tool(
+            "visualize", {"style": "compact", "highlight_last": True}
+        )
+        if state.stones:
+            last = state.stones[-1]
+            last_move = f"{last.type} at ({last.x}, {last.y})"
+        else:
+            last_move = "none (empty board)"
+        if state.width is None:
+            board_size = "unbounded (any integer x / y, only the area around the stones is shown)"
+        else:
+            board_size = f"{state.width}x{state.height} (x 0-{state.width - 1}, y 0-{state.height - 1})"
+        if state.pending_choice is not None:
+            return STRUCTURED_CHOICE_PROMPT.format(
+                turn=state.turn,
+                rules=RULE_DESCRIPTIONS[state.rule],
+                opening=SWAP2_DESCRIPTION,
+                board=visual.content[0].text,
+                threats=threat_summary(state),
+                options=", ".join(f'"{option}"' for option in self._choice_options()),
+            )
+        return STRUCTURED_MOVE_PROMPT.format(
+            turn=state.turn,
+            board_size=board_size,
+            rules=RULE_DESCRIPTIONS[state.rule],
+            board=visual.content[0].text,
+            last_move=last_move,
+            threats=threat_summary(state),
+        )
+
+    async def _process_ai_turn_structured(
+        self, user_prompt: str, cache_key: Optional[str]
+    ) -> dict:
+        """도구 루프 없이 한 번의 요청으로 착수 (JSON 스키마 응답을 로컬에서 검증 후 적용)
+
+        응답이 잘못되면 오류를 알려주고 한 번 더 묻고, 그래도 안 되면 엔진 수로 대체.
+        Swap2 색 선택을 기다리는 중이면 같은 방식으로 선택 (ChoiceDecision, 캐시하지 않음).
+        """
+        turn = self.current_state.turn
+        choosing = self.current_state.pending_choice is not None
+        messages = [
+            self.messages[0],
+            {"role": "user", "content": await self._structured_prompt()},
+        ]
+
+        decision, move, played = None, None, None
+        for _ in range(2):
+            response = await self._create_completion(
+                model=self.current_model,
+                messages=messages,
+                response_format=(
+                    CHOICE_RESPONSE_FORMAT if choosing else MOVE_RESPONSE_FORMAT
+                ),
+            )
+            if not response or not response.choices:
+                return {"error": "API 응답이 비어있습니다."}
+
+            content = response.choices[0].message.content or ""
+            try:
+                if choosing:
+                    decision = ChoiceDecision.model_validate_json(content)
+                    move = self._check_choice(decision.option)
+                else:
+                    decision = MoveDecision.model_validate_json(content)
+                    move = self._check_move(
+                        {"x": decision.x, "y": decision.y, "turn": turn}, turn
+                    )
+                played = await self._play_decision(move)
+                break
+            except ValueError as e:
+                # pydantic ValidationError, 서버가 거절한 수 (set_stone) 도 ValueError
+                messages.append({"role": "assistant", "content": content})
+                messages.append(
+                    {"role": "user", "content": f"Invalid move: {e}. Try again."}
+                )
+
+        if played is not None:
+            final_response = decision.reasoning
+        else:
+            played = await self._play_fallback()
+            if played is None:
+                return {"error": "둘 수 있는 수가 없습니다."}
+            final_response = (
+                f"⚠️ 유효한 수를 받지 못해 엔진이 대신 두었습니다: {played}"
+            )
+            cache_key = None
+
+        # 대화 기록은 도구 루프와 같은 모양 (차례 프롬프트 → 응답)
+        self.messages.append({"role": "user", "content": user_prompt})
+        self.messages.append(
+            {"role": "assistant", "content": f"{played}: {final_response}"}
+        )
+
+        if cache_key is not None and not choosing:
+            x, y = move
+            self.move_cache.put(
+                cache_key, CachedMove(x=x, y=y, response=final_response)
+            )
+
+        return {
+            "response": final_response,
+            "state": self.current_state.model_dump(),
+        }
 
     async def process_ai_turn(self) -> dict:
-        """AI가 상대방 입장에서 수를 둠"""
+        """AI가 상대방 입장에서 수를 둠 (턴 단위 지연 시간 / 결과 / span 기록)"""
+        model = self.current_model
+        if model in ENGINE_IDS:
+            mode = "engine"
+        else:
+            mode = "speculative" if self.speculative_models else self.move_mode
+        mark = len(self.messages)
+        with span("ai_turn", model=model, mode=mode, turn=self.current_state.turn):
+            with AI_TURN_SECONDS.time(model=model, mode=mode):
+                try:
+                    result = await self._process_ai_turn()
+                except asyncio.CancelledError:
+                    # 사용자가 취소: 도구 응답이 빠진 대화가 남지 않도록 되돌림
+                    del self.messages[mark:]
+                    if mode == "engine":
+                        # 스레드의 탐색을 멈추고 (트리는 같이 쓰지 않음) 워커 풀도 정리
+                        self.close_engine()
+                    AI_TURNS.inc(model=model, mode=mode, outcome="cancelled")
+                    raise
+
+        if "error" in result:
+            # AI 차례는 그대로 남음 (resume 으로 다시 시도)
+            outcome = "error"
+        else:
+            self._ai_turn_at = None
+            outcome = "cached" if result.get("cached") else "ok"
+        AI_TURNS.inc(model=model, mode=mode, outcome=outcome)
+        return result
+
+    def close_engine(self) -> None:
+        """엔진의 탐색 / 생각하기를 멈추고 버림 (다음 엔진 차례에 새로 만듦)"""
+        engine, self._engine = self._engine, None
+        if engine is not None:
+            engine.stop()
+            engine.close()
+
+    def close(self) -> None:
+        """플레이어가 모두 떠났을 때: 생각하기 스레드 / 워커 풀을 정리 (게임 상태는 그대로)"""
+        self.close_engine()
+
+    def engine(self) -> MCTS:
+        """로컬 엔진 (게임 동안 같은 인스턴스를 써서 탐색 트리를 재사용)
+
+        정책 / 가치망 evaluator 는 유한 보드만 평가하므로 무한 보드에서는 빼고
+        기본 휴리스틱 evaluator 로 만듦 (보드 종류가 바뀌면 엔진을 새로 만듦)
+        """
+        bounded = self.current_state.width is not None
+        if self._engine is not None and self._engine_bounded != bounded:
+            self.close_engine()
+        if self._engine is None:
+            options = self.engine_options
+            evaluator = options.get("evaluator")
+            if not bounded and getattr(evaluator, "bounded_only", False):
+                logger.info("🧮 무한 보드: 망 대신 휴리스틱 evaluator 로 탐색합니다")
+                options = {k: v for k, v in options.items() if k != "evaluator"}
+            self._engine = MCTS(**options)
+            self._engine_bounded = bounded
+        return self._engine
+
+    async def _process_engine_turn(self) -> dict:
+        """LLM 대신 로컬 MCTS 엔진이 둠 (탐색은 이벤트 루프를 막지 않도록 스레드에서)"""
+        state = self.current_state
+        engine = self.engine()
+        try:
+            if state.pending_choice is not None:
+                option = await asyncio.to_thread(engine.choose_option, state)
+                await self._call_tool("choose_color", {"option": option})
+                await self.update_state()
+                response = f"Swap2 choice: {option}"
+            else:
+                result = await asyncio.to_thread(engine.search, state)
+                if result.move is None:
+                    return {"error": "둘 수 있는 수가 없습니다."}
+                x, y = result.move
+                await self.set_stone(x, y)
+                response = (
+                    f"({x}, {y}): MCTS {result.playouts} playouts, "
+                    f"win rate {result.value:.0%}"
+                )
+                if result.reused:
+                    response += f" ({result.reused} reused)"
+            if self.engine_ponder:
+                engine.ponder(self.current_state)
+        except Exception as e:
+            logger.exception("❌ 엔진 착수 중 오류 발생: %s", e)
+            return {"error": str(e), "error_type": type(e).__name__}
+
+        self.messages.append({"role": "assistant", "content": response})
+        return {"response": response, "state": self.current_state.model_dump()}
+
+    async def _process_ai_turn(self) -> dict:
+        if self.current_model in ENGINE_IDS:
+            return await self._process_engine_turn()
+
         current_turn = self.current_state.turn
+        choosing = self.current_state.pending_choice is not None
+
+        # USER_PROMPT에 현재 턴 정보 삽입 (Swap2 선택을 기다리면 선택 프롬프트)
+        if choosing:
+            user_prompt = CHOICE_PROMPT.format(
+                turn=current_turn,
+                options=", ".join(f'"{option}"' for option in self._choice_options()),
+            )
+        else:
+            user_prompt = USER_PROMPT.format(turn=current_turn)
+
+        if self.speculative_models:
+            try:
+                return await self._process_ai_turn_speculative(user_prompt)
+            except Exception as e:
+                logger.exception("❌ 투기적 실행 중 오류 발생: %s", e)
+                return {"error": str(e), "error_type": type(e).__name__}
+
+        structured = self.move_mode == "structured"
+
+        # 캐시 조회 (같은 모델/국면/프롬프트면 이전 결과 재사용, 색 선택은 캐시하지 않음)
+        cache_key = None
+        if self.move_cache is not None and not choosing:
+            version = STRUCTURED_PROMPT_VERSION if structured else PROMPT_VERSION
+            cache_key = MoveCache.make_key(
+                self.current_model, self.current_state, version
+            )
+            cached = self.move_cache.get(cache_key)
+            if cached is not None:
+                try:
+                    return await self._apply_cached_move(user_prompt, cached)
+                except Exception as e:
+                    logger.warning("⚠️ 캐시된 수 적용 실패, LLM 호출로 대체: %s", e)
+
+        if structured:
+            try:
+                return await self._process_ai_turn_structured(user_prompt, cache_key)
+            except Exception as e:
+                logger.exception("❌ API 호출 중 오류 발생: %s", e)
+                return {"error": str(e), "error_type": type(e).__name__}
 
-        # USER_PROMPT에 현재 턴 정보 삽입
-        user_prompt = USER_PROMPT.format(turn=current_turn)
         self.messages.append({"role": "user", "content": user_prompt})
+        placed_move = None
 
         try:
             # 반복적으로 도구를 호출하도록 루프 사용
@@ -61,10 +654,10 @@ class GameManager:
             iteration = 0
 
             while iteration < max_iterations:
-                response = self.openrouter_client.chat.completions.create(
+                response = await self._create_completion(
                     model=self.current_model,
                     messages=self.messages,
-                    tools=self.gomoku_tools,
+                    tools=self._tools(self._move_tools(), compact=True),
                     tool_choice="auto",
                 )
 
@@ -84,7 +677,7 @@ class GameManager:
 
                         try:
                             # MCP Tool 실행
-                            function_response = await self.mcp_client.call_tool(
+                            function_response = await self._call_tool(
                                 function_name, function_args
                             )
 
@@ -98,6 +691,9 @@ class GameManager:
 
                             await self.update_state()
 
+                            if function_name == "set_stone":
+                                placed_move = (function_args["x"], function_args["y"])
+
                         except Exception as e:
                             function_response = f"Error executing function: {e}"
                             tool_results.append(
@@ -128,34 +724,47 @@ class GameManager:
                         {"role": "assistant", "content": final_response}
                     )
 
+                    TOOL_LOOP_ITERATIONS.observe(
+                        iteration + 1, model=self.current_model
+                    )
+
+                    if cache_key is not None and placed_move is not None:
+                        x, y = placed_move
+                        self.move_cache.put(
+                            cache_key, CachedMove(x=x, y=y, response=final_response)
+                        )
+
                     return {
                         "response": final_response,
                         "state": self.current_state.model_dump(),
                     }
 
             # max_iterations 초과
+            TOOL_LOOP_ITERATIONS.observe(max_iterations, model=self.current_model)
             return {"error": "최대 반복 횟수를 초과했습니다."}
 
         except Exception as e:
-            print(f"❌ API 호출 중 오류 발생: {e}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("❌ API 호출 중 오류 발생: %s", e)
             if self.messages and self.messages[-1]["role"] == "user":
                 self.messages.pop()
-            return {"error": str(e)}
+            return {"error": str(e), "error_type": type(e).__name__}
 
     async def process_message(self, user_message: str, model: str) -> dict:
         """사용자 메시지를 처리하고 AI 응답 반환 (채팅용)"""
+        if model in ENGINE_IDS:
+            return {
+                "error": "로컬 엔진은 채팅을 지원하지 않습니다. LLM 모델을 선택하세요."
+            }
         self.current_model = model
+        mark = len(self.messages)
         self.messages.append({"role": "user", "content": user_message})
 
         try:
             # 첫 번째 요청
-            response = self.openrouter_client.chat.completions.create(
+            response = await self._create_completion(
                 model=self.current_model,
                 messages=self.messages,
-                tools=self.gomoku_tools,
+                tools=self._tools(),
                 tool_choice="required",
             )
 
@@ -175,7 +784,7 @@ class GameManager:
 
                     try:
                         # MCP Tool 실행
-                        function_response = await self.mcp_client.call_tool(
+                        function_response = await self._call_tool(
                             function_name, function_args
                         )
 
@@ -209,7 +818,7 @@ class GameManager:
                     )
 
                 # 두 번째 요청
-                second_response = self.openrouter_client.chat.completions.create(
+                second_response = await self._create_completion(
                     model=self.current_model,
                     messages=self.messages,
                 )
@@ -236,11 +845,11 @@ class GameManager:
                     "state": self.current_state.model_dump(),
                 }
 
+        except asyncio.CancelledError:
+            del self.messages[mark:]
+            raise
         except Exception as e:
-            print(f"❌ API 호출 중 오류 발생: {e}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("❌ API 호출 중 오류 발생: %s", e)
             if self.messages and self.messages[-1]["role"] == "user":
                 self.messages.pop()
-            return {"error": str(e)}
+            return {"error": str(e), "error_type": type(e).__name__}
@@ -1,9 +1,14 @@
-from mcp_server.server import get_mcp_server
+from typing import Optional
+
 from fastmcp import Client
+from mcp_server.server import get_mcp_server
 
-mcp_client = Client(get_mcp_server())
+mcp_client: Optional[Client] = None
 
 
 def get_mcp_client():
+    """기본 MCP 서버에 연결하는 클라이언트 (처음 호출할 때 생성)"""
     global mcp_client
+    if mcp_client is None:
+        mcp_client = Client(get_mcp_server())
     return mcp_client
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import queue
+import threading
+from typing import Optional
+
+from log import get_logger
+from schema import WIDTH, HEIGHT
+
+logger = get_logger(__name__)
+
+# 레코드 형식 (한 줄에 JSON 하나)
+#   {"g": game_id, "op": "move", "x": 7, "y": 7}
+#   {"g": game_id, "op": "reset", "w": 15, "h": 15, "rule": "renju", ...}
+#       restart / 되돌리기 / 보드 크기·규칙 변경 / 오프닝 선택 등 착수 목록이
+#       앞에서부터 바뀌었거나 게임 정보(Gomoku.record_meta)가 바뀐 경우
+#       (w, h 는 보드 크기, 무한 보드면 null, 생략하면 15x15.
+#        rule / opening / swap 은 기본값이 아닐 때만 기록)
+#   {"g": game_id, "op": "delete"}
+_STOP = object()
+
+
+def _encode(record: dict) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+# record_meta 에서 크기 외에 그대로 옮겨 적는 키
+_META_KEYS = ("rule", "opening", "swap")
+
+
+def reset_record(game_id: str, meta: dict) -> dict:
+    """Gomoku.record_meta() 로 reset 레코드 생성"""
+    record = {"g": game_id, "op": "reset", "w": meta["width"], "h": meta["height"]}
+    record.update((key, meta[key]) for key in _META_KEYS if key in meta)
+    return record
+
+
+def _new_record(reset: Optional[dict] = None) -> dict:
+    """reset 레코드로 빈 게임 레코드 생성 (reset 없이 move 가 오면 15x15)"""
+    reset = reset or {}
+    game = {"width": reset.get("w", WIDTH), "height": reset.get("h", HEIGHT)}
+    game.update((key, reset[key]) for key in _META_KEYS if key in reset)
+    game["moves"] = []
+    return game
+
+
+def replay(path: str) -> dict[str, dict]:
+    """로그를 처음부터 다시 읽어 게임별 레코드 (Gomoku.to_record 형식) 를 복원
+
+    크래시로 마지막 줄이 잘렸으면 그 줄부터 버리고 파일을 잘라냄
+    """
+    games: dict[str, dict] = {}
+    if not os.path.exists(path):
+        return games
+
+    valid_end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid_end += len(line)
+
+            game_id, op = record["g"], record["op"]
+            if op == "move":
+                game = games.setdefault(game_id, _new_record())
+                game["moves"].append((record["x"], record["y"]))
+            elif op == "reset":
+                games[game_id] = _new_record(record)
+            elif op == "delete":
+                games.pop(game_id, None)
+
+    if valid_end < os.path.getsize(path):
+        logger.warning(
+            "⚠️ 착수 로그 끝부분 손상, 잘라냄: %s (%d bytes)", path, valid_end
+        )
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
+    return games
+
+
+def write_snapshot(path: str, games: dict[str, dict]) -> None:
+    """현재 게임들만 담은 로그로 교체 (임시 파일에 쓰고 fsync 후 rename)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for game_id, game in games.items():
+            f.write(_encode(reset_record(game_id, game)))
+            for x, y in game["moves"]:
+                f.write(_encode({"g": game_id, "op": "move", "x": x, "y": y}))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MoveLog:
+    """append-only 착수 로그 (group commit)
+
+    append 는 큐에 넣고 바로 반환하고, 백그라운드 스레드가 commit_interval 동안 모인
+    레코드를 한 번에 쓰고 fsync 한 번으로 커밋함. 착수 경로에서는 fsync 를 기다리지
+    않으며, 크래시 시 잃을 수 있는 것은 마지막 commit_interval 동안의 착수뿐.
+    쓰기 / fsync 가 실패한 묶음은 커밋되지 않은 것으로 보고 그 레코드를 기다리던
+    flush 에 OSError 를 전달함 (파일은 마지막 커밋 위치로 되돌림).
+    """
+
+    def __init__(
+        self, path: str, commit_interval: float = 0.05, max_batch: int = 1024
+    ) -> None:
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self._file = open(path, "ab")
+        # 마지막으로 fsync 까지 끝난 파일 크기 (실패하면 여기까지 잘라냄)
+        self._size = self._file.tell()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._cond = threading.Condition()
+        self._appended = 0
+        # 처리한 레코드 수 (커밋 + 실패) 와 실패한 묶음 [(시작, 끝, 오류)]
+        self._processed = 0
+        self._failures: list[tuple[int, int, OSError]] = []
+        self._thread = threading.Thread(
+            target=self._run, name="gomoku-movelog", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, record: dict) -> None:
+        with self._cond:
+            self._appended += 1
+        self._queue.put(_encode(record))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 append 한 레코드가 모두 디스크에 커밋될 때까지 대기
+
+        기다린 레코드 중 쓰기에 실패한 것이 있으면 그 OSError 를 다시 발생시킴
+        """
+        with self._cond:
+            start, target = self._processed, self._appended
+            if not self._cond.wait_for(lambda: self._processed >= target, timeout):
+                return False
+            for first, end, error in self._failures:
+                if first < target and end > start:
+                    raise error
+            return True
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # 첫 레코드가 들어온 뒤 commit_interval 동안 더 모아서 한 번에 커밋
+            deadline = time.monotonic() + self.commit_interval
+            try:
+                while len(batch) < self.max_batch and batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                pass
+
+            if _STOP in batch:
+                stopping = True
+                batch = [line for line in batch if line is not _STOP]
+            if batch:
+                self._commit(batch)
+
+    def _commit(self, lines: list[str]) -> None:
+        data = "".join(lines).encode("utf-8")
+        error = None
+        try:
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._size += len(data)
+        except (OSError, ValueError) as e:
+            # ValueError: 이전 실패 뒤 파일을 다시 열지 못해 닫힌 상태
+            logger.error("❌ 착수 로그 쓰기 실패: %s", e)
+            error = e if isinstance(e, OSError) else OSError(str(e))
+            self._reopen()
+        with self._cond:
+            if error is not None:
+                start = self._processed
+                self._failures.append((start, start + len(lines), error))
+            self._processed += len(lines)
+            self._cond.notify_all()
+
+    def _reopen(self) -> None:
+        """쓰다 만 레코드를 잘라내고 마지막 커밋 위치에서 다시 열기"""
+        try:
+            self._file.close()
+        except OSError:
+            pass  # 버퍼에 남은 부분 쓰기 실패 (아래에서 잘라냄)
+        try:
+            with open(self.path, "r+b") as f:
+                f.truncate(self._size)
+            self._file = open(self.path, "ab")
+        except OSError as e:
+            logger.error("❌ 착수 로그 다시 열기 실패: %s", e)
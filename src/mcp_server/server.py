@@ -1,183 +1,382 @@
+import os
+import asyncio
+import argparse
+from typing import Literal, Optional, Union
+
 from fastmcp import FastMCP
 from game.gomoku import Gomoku
-from schema import GomokuState, TurnTypeAll
-
-mcp_server = FastMCP(name="Gomoku MCP Server")
-
-
-def get_mcp_server():
-    global mcp_server
-    return mcp_server
-
-
-gomoku_game = Gomoku()
-
-
-@mcp_server.tool
-def restart() -> GomokuState:
-    """
-    🔄 Resets the game to its initial state.
-
-    Use this when starting a completely new game. This clears the board of all stones
-    and resets the move history. After calling this, BLACK will have the first move.
-
-    Returns:
-        GomokuState: The fresh state of the newly started game.
+from mcp_server.store import (
+    GameStore,
+    MemoryGameStore,
+    DEFAULT_GAME_ID,
+    create_store,
+)
+from schema import ForcedWin, GomokuState, TurnType, TurnTypeAll, RuleType
+from game import solver
+from game.rules import RULE_DESCRIPTIONS, SWAP2_DESCRIPTION
+from game.solver import DEFAULT_TIME_LIMIT, MAX_TIME_LIMIT
+
+
+def create_mcp_server(source: Union[Gomoku, GameStore]) -> FastMCP:
+    """MCP 서버 생성
+
+    - Gomoku 인스턴스를 주면 그 게임 하나를 "default" 게임으로 조작
+    - GameStore 를 주면 도구 호출마다 game_id 로 저장소에서 게임을 꺼내 씀
     """
-    gomoku_game.restart()
-    return gomoku_game.get_state()
+    if isinstance(source, Gomoku):
+        store = MemoryGameStore({DEFAULT_GAME_ID: source})
+    else:
+        store = source
+    server = FastMCP(name="Gomoku MCP Server")
+
+    @server.tool
+    def restart(
+        size: Optional[int] = None,
+        rule: Optional[RuleType] = None,
+        opening: Optional[Literal["none", "swap2"]] = None,
+        game_id: str = DEFAULT_GAME_ID,
+    ) -> GomokuState:
+        """
+        🔄 Resets the game to its initial state.
+
+        Use this when starting a completely new game. This clears the board of all stones
+        and resets the move history. After calling this, BLACK will have the first move.
+
+        Args:
+            size (int, optional): Board size for the new game (e.g. 15 or 19 for a square board).
+                Use 0 for an unbounded board where any integer coordinate is allowed.
+                Omit it to keep the current board size.
+            rule (str, optional): "freestyle" (five or more wins), "standard" (exactly five wins)
+                or "renju" (forbidden moves for BLACK). Omit it to keep the current rule set.
+            opening (str, optional): "swap2" for a Swap2 opening, "none" for a normal start.
+                Omit it to keep the current opening.
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            GomokuState: The fresh state of the newly started game.
+        """
+
+        def _restart(game: Gomoku) -> GomokuState:
+            if rule is not None or opening is not None:
+                new_opening = game.opening
+                if opening is not None:
+                    new_opening = None if opening == "none" else opening
+                game.set_rule(rule or game.rule, new_opening)
+            if size is None:
+                game.restart()
+            else:
+                game.resize(size)
+            return game.get_state()
+
+        return store.update(game_id, _restart)
+
+    @server.tool
+    def visualize(
+        style: Literal["default", "compact"] = "default",
+        highlight_last: bool = False,
+        game_id: str = DEFAULT_GAME_ID,
+    ) -> str:
+        """
+        👁️ Returns a text-based visual representation of the current game board.
+
+        **IMPORTANT: Call this BEFORE making moves to see the current board layout.**
+
+        This shows you where all the stones are placed in an easy-to-read grid format.
+        Use this to understand the current game situation before deciding your next move.
+        On large or unbounded boards only the area around the stones is drawn, labelled
+        with the real coordinates.
+
+        Args:
+            style (str): "default" draws ● for BLACK, ○ for WHITE and + for empty.
+                "compact" draws X, O and . with one character per intersection.
+            highlight_last (bool): Mark the most recent move (●* / ○* in default style,
+                lowercase x / o in compact style).
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            str: A string depicting the board with ● for BLACK stones, ○ for WHITE stones,
+                 and + for empty intersections (or X / O / . in compact style).
+        """
+        return store.load(game_id).visualize_board(style, highlight_last)
+
+    @server.tool
+    def get_state(game_id: str = DEFAULT_GAME_ID) -> GomokuState:
+        """
+        📊 Retrieves the complete current state of the game.
+
+        **IMPORTANT: Call this FIRST to understand the current game before making any move.**
+
+        This provides structured data about:
+        - The board size (width / height, null for an unbounded board)
+        - The board layout (a width x height grid, null on large or unbounded boards)
+        - Whose turn it is (BLACK or WHITE)
+        - All stones that have been played
+        - Game status (ongoing, won, draw)
+
+        Args:
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            GomokuState: An object containing all information about the current game state.
+        """
+        return store.load(game_id).get_state()
+
+    @server.tool
+    def set_stone(
+        x: int, y: int, turn: str, game_id: str = DEFAULT_GAME_ID
+    ) -> GomokuState:
+        """
+        🎯 Places a stone for the specified player at the specified coordinates.
+
+        **Call this AFTER analyzing the board with get_state() or visualize().**
+
+        Args:
+            x (int): The horizontal coordinate (0 to width-1, left to right) where to place the stone.
+            y (int): The vertical coordinate (0 to height-1, top to bottom) where to place the stone.
+            turn (str): The player making the move - must be "BLACK" or "WHITE".
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            GomokuState: The updated game state after the move.
+
+        Raises:
+            ValueError: If the move is invalid because:
+                        - The cell is already occupied
+                        - Coordinates are out of bounds (outside the board size)
+                        - It's not the specified player's turn
+                        - The game is already over
+                        - The move is forbidden for BLACK under renju rules
+                        - A Swap2 color choice is pending
+
+        Example:
+            set_stone(7, 7, "BLACK")  # Places a black stone at the center
+        """
+        return store.update(game_id, lambda game: game.set_stone(x, y, turn))
+
+    @server.tool
+    def choose_color(
+        option: Literal["black", "white", "place2"], game_id: str = DEFAULT_GAME_ID
+    ) -> GomokuState:
+        """
+        🔀 Makes the pending Swap2 opening choice.
+
+        Only needed when get_state() shows a pending_choice:
+        - "swap2" (after 3 stones): the second player picks "black", "white" or "place2"
+          (place two more stones, WHITE then BLACK, and let the first player pick).
+        - "swap" (after 5 stones): the first player picks "black" or "white".
+
+        Args:
+            option (str): "black", "white" or "place2".
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            GomokuState: The updated game state after the choice.
+        """
+        return store.update(game_id, lambda game: game.choose(option))
+
+    @server.tool
+    def get_valid_moves(game_id: str = DEFAULT_GAME_ID) -> list[tuple[int, int]]:
+        """
+        ✅ Provides a list of all valid (empty) positions where a stone can be placed.
+
+        **RECOMMENDED: Call this after get_state() to see your options.**
+
+        This helps you identify all possible next moves without trying invalid placements.
+        Use this to narrow down your strategic choices to only legal moves.
+        Under renju rules BLACK's forbidden moves are left out.
+
+        Args:
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            list[tuple[int, int]]: A list of (x, y) coordinate tuples for each empty cell.
+                                    Returns an empty list if the board is full.
+                                    On large or unbounded boards only empty cells within
+                                    two intersections of an existing stone are listed.
+        """
+        return store.load(game_id).get_valid_moves()
+
+    @server.tool
+    def get_history(game_id: str = DEFAULT_GAME_ID) -> list[GomokuState]:
+        """
+        📜 Returns a chronological list of all game states from the beginning.
+
+        This can be used to:
+        - Review the game's progression
+        - Analyze past moves and strategies
+        - Understand how the current position developed
+
+        Each state in the list represents the board after one move.
+
+        Args:
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            list[GomokuState]: A list of game state objects, one for each turn taken.
+        """
+        return store.load(game_id).get_history()
+
+    @server.tool
+    def get_turn(game_id: str = DEFAULT_GAME_ID) -> TurnTypeAll:
+        """
+        🎲 Gets the current turn status.
+
+        Returns one of:
+        - "BLACK": It's Black's turn to move
+        - "WHITE": It's White's turn to move
+        - "BLACK_WIN": Black has won the game
+        - "WHITE_WIN": White has won the game
+        - "DRAW": The game ended in a draw (board full, no winner)
+
+        Args:
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            TurnTypeAll: A string indicating whose turn it is or if the game has ended.
+        """
+        return store.load(game_id).get_turn()
+
+    @server.tool
+    async def find_forced_win(
+        kind: Literal["vcf", "vct"] = "vcf",
+        color: Optional[TurnType] = None,
+        time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+        game_id: str = DEFAULT_GAME_ID,
+    ) -> ForcedWin:
+        """
+        🧠 Searches for a forced win (a sequence the opponent cannot escape).
+
+        Use this to check whether a player can win by force from the current position,
+        or whether the opponent threatens one that must be stopped.
+
+        Args:
+            kind (str): "vcf" (victory by continuous fours: every attacking move makes a four)
+                or "vct" (victory by continuous threats: fours and open threes, slower).
+            color (str, optional): The attacking player, "BLACK" or "WHITE". Defaults to the
+                player to move. The attacker is assumed to move first either way.
+            time_limit (float): Seconds to search before giving up, at most 30. 0 or null
+                means the default (5).
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            ForcedWin: found is true with the winning sequence in moves (attacker and
+                defender moves alternating, ending with the five). complete is false when
+                the search hit its time or node limit, so a missing win is not a proof.
+        """
+        # 0 / null / 음수는 기본값, 상한은 MAX_TIME_LIMIT (도구 호출 하나가 끝없이 돌지 않도록)
+        if time_limit is None or not 0 < time_limit:
+            time_limit = DEFAULT_TIME_LIMIT
+        time_limit = min(time_limit, MAX_TIME_LIMIT)
+        state = store.load(game_id).get_state()
+        # 탐색은 스레드에서 (이벤트 루프의 다른 세션을 막지 않음)
+        return await asyncio.to_thread(
+            solver.find_forced_win, state, color, kind, time_limit=time_limit
+        )
+
+    @server.tool
+    def get_rules(game_id: str = DEFAULT_GAME_ID) -> str:
+        """
+        📖 Returns the complete rules of the Gomoku game.
+
+        Call this if you need a refresher on how Gomoku works.
+
+        Args:
+            game_id (str): The game session to act on. Keep the default unless you were given a game id.
+
+        Returns:
+            str: A detailed explanation of Gomoku rules and objectives.
+        """
+
+        game = store.load(game_id)
+        rule_text = RULE_DESCRIPTIONS[game.rule]
+        if game.opening == "swap2":
+            rule_text += "\n           " + SWAP2_DESCRIPTION
+
+        rules = f"""
+        Gomoku (also known as Five in a Row) Rules:
+
+        1. The game is played on a 15x15 grid by default (other sizes, or an unbounded
+           board, can be chosen with restart(size=...)).
+        2. Two players, Black and White, take turns placing their stones on empty intersections.
+        3. Black plays first.
+        4. The objective is to be the first player to get an unbroken row of five stones
+           horizontally, vertically, or diagonally.
+        5. Once a stone is placed, it cannot be moved or removed.
+        6. This game uses the following rule set (change it with restart(rule=...)):
+           {rule_text}
+        7. The game ends when a player achieves five in a row or the board is full (draw).
+
+        Strategic Tips:
+        - Control the center early in the game
+        - Look for opportunities to create multiple threats
+        - Always consider both offensive and defensive moves
+        - Block opponent's potential five-in-a-row sequences
+        """
+
+        return rules
+
+    return server
 
 
-@mcp_server.tool
-def visualize() -> str:
-    """
-    👁️ Returns a text-based visual representation of the current game board.
-
-    **IMPORTANT: Call this BEFORE making moves to see the current board layout.**
-
-    This shows you where all the stones are placed in an easy-to-read grid format.
-    Use this to understand the current game situation before deciding your next move.
-
-    Returns:
-        str: A string depicting the board with ● for BLACK stones, ○ for WHITE stones,
-             and + for empty intersections.
-    """
-    return gomoku_game.visualize_board()
-
-
-@mcp_server.tool
-def get_state() -> GomokuState:
-    """
-    📊 Retrieves the complete current state of the game.
-
-    **IMPORTANT: Call this FIRST to understand the current game before making any move.**
-
-    This provides structured data about:
-    - The board layout (15x15 grid)
-    - Whose turn it is (BLACK or WHITE)
-    - All stones that have been played
-    - Game status (ongoing, won, draw)
-
-    Returns:
-        GomokuState: An object containing all information about the current game state.
-    """
-    return gomoku_game.get_state()
-
-
-@mcp_server.tool
-def set_stone(x: int, y: int, turn: str) -> GomokuState:
-    """
-    🎯 Places a stone for the specified player at the specified coordinates.
-
-    **Call this AFTER analyzing the board with get_state() or visualize().**
-
-    Args:
-        x (int): The horizontal coordinate (0-14, left to right) where to place the stone.
-        y (int): The vertical coordinate (0-14, top to bottom) where to place the stone.
-        turn (str): The player making the move - must be "BLACK" or "WHITE".
-
-    Returns:
-        GomokuState: The updated game state after the move.
-
-    Raises:
-        ValueError: If the move is invalid because:
-                    - The cell is already occupied
-                    - Coordinates are out of bounds (not 0-14)
-                    - It's not the specified player's turn
-                    - The game is already over
-
-    Example:
-        set_stone(7, 7, "BLACK")  # Places a black stone at the center
-    """
-    return gomoku_game.set_stone(x, y, turn)
-
-
-@mcp_server.tool
-def get_valid_moves() -> list[tuple[int, int]]:
-    """
-    ✅ Provides a list of all valid (empty) positions where a stone can be placed.
-
-    **RECOMMENDED: Call this after get_state() to see your options.**
-
-    This helps you identify all possible next moves without trying invalid placements.
-    Use this to narrow down your strategic choices to only legal moves.
+gomoku_game = Gomoku()
+mcp_server: Optional[FastMCP] = None
 
-    Returns:
-        list[tuple[int, int]]: A list of (x, y) coordinate tuples for each empty cell.
-                                Returns an empty list if the board is full.
-    """
-    return gomoku_game.get_valid_moves()
 
+def get_mcp_server() -> FastMCP:
+    """기본 MCP 서버 (처음 호출할 때 생성)
 
-@mcp_server.tool
-def get_history() -> list[GomokuState]:
+    GOMOKU_STORE 가 있으면 그 저장소를 쓰고 (wal:///path 면 재시작해도 게임이 이어짐),
+    없으면 gomoku_game 하나를 조작
     """
-    📜 Returns a chronological list of all game states from the beginning.
+    global mcp_server
+    if mcp_server is None:
+        url = os.environ.get("GOMOKU_STORE")
+        mcp_server = create_mcp_server(create_store(url) if url else gomoku_game)
+    return mcp_server
 
-    This can be used to:
-    - Review the game's progression
-    - Analyze past moves and strategies
-    - Understand how the current position developed
 
-    Each state in the list represents the board after one move.
+def create_http_app():
+    """uvicorn 워커용 앱 팩토리 (stateless HTTP)
 
-    Returns:
-        list[GomokuState]: A list of game state objects, one for each turn taken.
+    워커마다 프로세스가 따로 뜨므로, 워커가 여럿이면 게임 상태는 GOMOKU_STORE 로
+    지정한 공유 저장소 (sqlite:///..., redis://...) 에 둬야 워커 간에 일관됨
     """
-    return gomoku_game.get_history()
+    return get_mcp_server().http_app(stateless_http=True)
 
 
-@mcp_server.tool
-def get_turn() -> TurnTypeAll:
-    """
-    🎲 Gets the current turn status.
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gomoku MCP 서버")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수")
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("GOMOKU_STORE", "memory://"),
+        help="게임 저장소 URL (memory://, wal:///path, sqlite:///path, redis://host:port/0)",
+    )
+    args = parser.parse_args(argv)
 
-    Returns one of:
-    - "BLACK": It's Black's turn to move
-    - "WHITE": It's White's turn to move
-    - "BLACK_WIN": Black has won the game
-    - "WHITE_WIN": White has won the game
-    - "DRAW": The game ended in a draw (board full, no winner)
+    # 서버(또는 uvicorn 워커)는 get_mcp_server() 에서 이 값으로 저장소를 만듦
+    os.environ["GOMOKU_STORE"] = args.store
 
-    Returns:
-        TurnTypeAll: A string indicating whose turn it is or if the game has ended.
-    """
-    return gomoku_game.get_turn()
+    if args.transport == "stdio":
+        get_mcp_server().run()
+        return
 
+    if args.workers > 1 and args.store.startswith(("memory://", "wal://")):
+        parser.error("--workers > 1 requires a shared --store (sqlite:// or redis://)")
 
-@mcp_server.tool
-def get_rules() -> str:
-    """
-    📖 Returns the complete rules of the Gomoku game.
+    import uvicorn
 
-    Call this if you need a refresher on how Gomoku works.
-
-    Returns:
-        str: A detailed explanation of Gomoku rules and objectives.
-    """
-
-    rules = """
-    Gomoku (also known as Five in a Row) Rules:
-    
-    1. The game is played on a 15x15 grid.
-    2. Two players, Black and White, take turns placing their stones on empty intersections.
-    3. Black plays first.
-    4. The objective is to be the first player to get an unbroken row of five stones
-       horizontally, vertically, or diagonally.
-    5. Once a stone is placed, it cannot be moved or removed.
-    6. There are no special rules for 'three-three' or 'four-four' (free Gomoku).
-    7. The game ends when a player achieves five in a row or the board is full (draw).
-    
-    Strategic Tips:
-    - Control the center early in the game
-    - Look for opportunities to create multiple threats
-    - Always consider both offensive and defensive moves
-    - Block opponent's potential five-in-a-row sequences
-    """
-
-    return rules
+    uvicorn.run(
+        "mcp_server.server:create_http_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
-
-    mcp_server.run()
+    main()
@@ -0,0 +1,236 @@
+import json
+import time
+import sqlite3
+import threading
+from typing import Callable, Optional, TypeVar
+
+from game.gomoku import Gomoku
+from mcp_server.movelog import MoveLog, replay, reset_record, write_snapshot
+from log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_GAME_ID = "default"
+
+T = TypeVar("T")
+
+
+class GameStore:
+    """게임 상태 저장소 인터페이스
+
+    도구 호출마다 load / update 로 게임을 꺼내 쓰므로, 저장소가 프로세스 밖에 있으면
+    (SQLite, Redis) 여러 uvicorn 워커가 같은 게임을 나눠서 처리할 수 있음
+    """
+
+    def load(self, game_id: str) -> Gomoku:
+        """게임을 읽음 (없으면 새 게임)"""
+        raise NotImplementedError
+
+    def update(self, game_id: str, fn: Callable[[Gomoku], T]) -> T:
+        """게임을 읽어 fn 을 적용하고 저장 (원자적). fn 이 예외를 내면 저장하지 않음"""
+        raise NotImplementedError
+
+    def delete(self, game_id: str) -> None:
+        raise NotImplementedError
+
+    def list_games(self) -> list[str]:
+        raise NotImplementedError
+
+
+class MemoryGameStore(GameStore):
+    """프로세스 메모리에 Gomoku 객체를 그대로 보관 (단일 프로세스 전용)"""
+
+    def __init__(self, games: Optional[dict[str, Gomoku]] = None) -> None:
+        self._games: dict[str, Gomoku] = dict(games or {})
+        self._lock = threading.RLock()
+
+    def load(self, game_id: str) -> Gomoku:
+        with self._lock:
+            if game_id not in self._games:
+                self._games[game_id] = Gomoku()
+            return self._games[game_id]
+
+    def update(self, game_id: str, fn: Callable[[Gomoku], T]) -> T:
+        with self._lock:
+            return fn(self.load(game_id))
+
+    def delete(self, game_id: str) -> None:
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def list_games(self) -> list[str]:
+        with self._lock:
+            return list(self._games)
+
+
+class SQLiteGameStore(GameStore):
+    """SQLite 파일에 게임별 레코드 (보드 크기 + 착수 목록) 를 저장 (여러 프로세스가 공유 가능)"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    game_id TEXT PRIMARY KEY,
+                    moves TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다 연결을 따로 둠 (fastmcp 는 동기 도구를 스레드에서 실행할 수 있음)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _read(self, conn: sqlite3.Connection, game_id: str) -> Gomoku:
+        row = conn.execute(
+            "SELECT moves FROM games WHERE game_id = ?", (game_id,)
+        ).fetchone()
+        return Gomoku.from_record(json.loads(row[0])) if row else Gomoku()
+
+    def load(self, game_id: str) -> Gomoku:
+        return self._read(self._connect(), game_id)
+
+    def update(self, game_id: str, fn: Callable[[Gomoku], T]) -> T:
+        conn = self._connect()
+        # 쓰기 잠금을 먼저 잡아 다른 워커와의 read-modify-write 경합을 막음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            game = self._read(conn, game_id)
+            result = fn(game)
+            conn.execute(
+                "INSERT OR REPLACE INTO games (game_id, moves, updated_at) "
+                "VALUES (?, ?, ?)",
+                (game_id, json.dumps(game.to_record()), time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def delete(self, game_id: str) -> None:
+        self._connect().execute("DELETE FROM games WHERE game_id = ?", (game_id,))
+
+    def list_games(self) -> list[str]:
+        rows = self._connect().execute("SELECT game_id FROM games").fetchall()
+        return [row[0] for row in rows]
+
+
+class RedisGameStore(GameStore):
+    """Redis (또는 Redis 프로토콜 호환 로컬 서버) 에 게임별 레코드를 저장
+
+    redis 패키지가 필요함 (pip install redis)
+    """
+
+    def __init__(self, url: str, prefix: str = "gomoku:game:") -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "RedisGameStore requires the 'redis' package: pip install redis"
+            ) from e
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, game_id: str) -> str:
+        return f"{self.prefix}{game_id}"
+
+    def load(self, game_id: str) -> Gomoku:
+        raw = self._redis.get(self._key(game_id))
+        return Gomoku.from_record(json.loads(raw)) if raw else Gomoku()
+
+    def update(self, game_id: str, fn: Callable[[Gomoku], T]) -> T:
+        key = self._key(game_id)
+        result = None
+
+        def transaction(pipe):
+            # WATCH 중인 키가 바뀌면 redis-py 가 이 함수를 다시 실행함
+            nonlocal result
+            raw = pipe.get(key)
+            game = Gomoku.from_record(json.loads(raw)) if raw else Gomoku()
+            result = fn(game)
+            pipe.multi()
+            pipe.set(key, json.dumps(game.to_record()))
+
+        self._redis.transaction(transaction, key)
+        return result
+
+    def delete(self, game_id: str) -> None:
+        self._redis.delete(self._key(game_id))
+
+    def list_games(self) -> list[str]:
+        keys = self._redis.scan_iter(match=f"{self.prefix}*")
+        return [key.decode().removeprefix(self.prefix) for key in keys]
+
+
+class WALGameStore(MemoryGameStore):
+    """메모리 저장소 + append-only 착수 로그 (크래시 후 재시작 시 로그 재생으로 복원)
+
+    착수마다 레코드를 로그 큐에 넣기만 하고 fsync 는 백그라운드 스레드가 모아서
+    (group commit) 하므로 착수 경로에는 디스크 대기가 없음. 단일 프로세스 전용.
+    """
+
+    def __init__(self, path: str, commit_interval: float = 0.05) -> None:
+        started = time.perf_counter()
+        records = replay(path)
+        # 재생한 결과만 담은 로그로 압축해서 로그가 무한히 자라지 않게 함
+        write_snapshot(path, records)
+        super().__init__(
+            {game_id: Gomoku.from_record(record) for game_id, record in records.items()}
+        )
+        self._log = MoveLog(path, commit_interval=commit_interval)
+        logger.info(
+            "♻️ 착수 로그에서 게임 %d개 복원 (%.1f ms)",
+            len(records),
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def update(self, game_id: str, fn: Callable[[Gomoku], T]) -> T:
+        with self._lock:
+            game = self.load(game_id)
+            before, meta = game.get_moves(), game.record_meta()
+            result = fn(game)
+            after, new_meta = game.get_moves(), game.record_meta()
+            if after[: len(before)] != before or new_meta != meta:
+                self._log.append(reset_record(game_id, new_meta))
+                before = []
+            for x, y in after[len(before) :]:
+                self._log.append({"g": game_id, "op": "move", "x": x, "y": y})
+            return result
+
+    def delete(self, game_id: str) -> None:
+        with self._lock:
+            super().delete(game_id)
+            self._log.append({"g": game_id, "op": "delete"})
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지의 착수가 디스크에 커밋될 때까지 대기 (쓰기에 실패했으면 OSError)"""
+        return self._log.flush(timeout)
+
+    def close(self) -> None:
+        self._log.close()
+
+
+def create_store(url: Optional[str]) -> GameStore:
+    """저장소 URL 로 GameStore 생성
+
+    - None / "memory://"       : MemoryGameStore
+    - "sqlite:///path/to/db"   : SQLiteGameStore
+    - "wal:///path/to/log"     : WALGameStore
+    - "redis://host:port/0"    : RedisGameStore
+    """
+    if not url or url == "memory://":
+        return MemoryGameStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteGameStore(url.removeprefix("sqlite:///"))
+    if url.startswith("wal:///"):
+        return WALGameStore(url.removeprefix("wal:///"))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisGameStore(url)
+    raise ValueError(f"Unsupported store URL: {url}")
@@ -0,0 +1,242 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+
+try:  # OpenTelemetry 가 설치되어 있으면 턴 단위 span 도 기록
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # pragma: no cover
+    _otel_trace = None
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(
+    labelnames: tuple[str, ...], values: tuple[str, ...], **extra
+) -> str:
+    pairs = list(zip(labelnames, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @property
+    def family(self) -> str:
+        """HELP/TYPE 줄에 쓰는 이름"""
+        return self.name
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.family} {self.documentation}",
+            f"# TYPE {self.family} {self.kind}",
+        ]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in sorted(children):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._children[key] = self._children.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._children.get(self._key(labels), 0)
+
+    @property
+    def family(self) -> str:
+        # 0.0.4 텍스트 포맷은 HELP/TYPE 과 샘플 이름이 같아야 함
+        return f"{self.name}_total"
+
+    def _render_child(self, key, value) -> list[str]:
+        labels = _format_labels(self.labelnames, key)
+        return [f"{self.family}{labels} {_format_value(value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = _HistogramChild(len(self.buckets) + 1)
+            child.counts[index] += 1
+            child.sum += value
+            child.count += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간을 초 단위로 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_child(self, key, child) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "gomoku_llm_request_seconds",
+    "OpenRouter chat completion latency (including scheduler queueing)",
+    ["model"],
+    LLM_BUCKETS,
+)
+LLM_REQUEST_ERRORS = REGISTRY.counter(
+    "gomoku_llm_request_errors", "Failed OpenRouter requests", ["model", "error"]
+)
+LLM_RETRIES = REGISTRY.counter(
+    "gomoku_llm_retries", "Retried OpenRouter requests", ["model", "status"]
+)
+MCP_TOOL_SECONDS = REGISTRY.histogram(
+    "gomoku_mcp_tool_seconds", "MCP call_tool latency", ["tool"]
+)
+MCP_TOOL_ERRORS = REGISTRY.counter(
+    "gomoku_mcp_tool_errors", "MCP call_tool failures", ["tool"]
+)
+STATE_PARSE_SECONDS = REGISTRY.histogram(
+    "gomoku_state_parse_seconds", "GomokuState JSON parse time in update_state"
+)
+WS_SEND_SECONDS = REGISTRY.histogram(
+    "gomoku_ws_send_seconds", "Websocket message serialise + send time", ["type"]
+)
+WS_COALESCED = REGISTRY.counter(
+    "gomoku_ws_coalesced",
+    "Websocket messages replaced by a newer one before being sent",
+    ["type"],
+)
+WS_DISCONNECTS = REGISTRY.counter(
+    "gomoku_ws_stalled_disconnects",
+    "Websocket clients disconnected for falling behind",
+    ["reason"],
+)
+WS_BROADCAST = REGISTRY.counter(
+    "gomoku_ws_broadcast_frames",
+    "Pre-serialised spectator frames queued (one per subscriber)",
+    ["type"],
+)
+TOOL_LOOP_ITERATIONS = REGISTRY.histogram(
+    "gomoku_tool_loop_iterations",
+    "LLM tool-loop iterations per AI turn",
+    ["model"],
+    ITERATION_BUCKETS,
+)
+AI_TURN_SECONDS = REGISTRY.histogram(
+    "gomoku_ai_turn_seconds",
+    "End-to-end AI turn latency",
+    ["model", "mode"],
+    LLM_BUCKETS,
+)
+AI_TURNS = REGISTRY.counter(
+    "gomoku_ai_turns", "AI turns by outcome", ["model", "mode", "outcome"]
+)
+STARTUP_SECONDS = REGISTRY.histogram(
+    "gomoku_startup_seconds",
+    "Process startup time by phase (module_import, imports, mcp_init)",
+    ["phase"],
+    LLM_BUCKETS,
+)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """OpenTelemetry 가 있으면 span 을 열고, 없으면 아무것도 하지 않음"""
+    if _otel_trace is None:
+        yield None
+        return
+    tracer = _otel_trace.get_tracer("gomoku")
+    with tracer.start_as_current_span(name) as current:
+        for key, value in attributes.items():
+            current.set_attribute(key, value)
+        yield current
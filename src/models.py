@@ -7,3 +7,9 @@ AVAILABLE_MODELS = [
     {"id": "moonshotai/kimi-k2-thinking", "name": "kimi-k2-thinking"},
     {"id": "moonshotai/kimi-k2-0905", "name": "kimi-k2-0905"},
 ]
+
+# LLM 대신 로컬에서 수를 두는 엔진 (GameManager 가 id 로 구분)
+ENGINE_MODELS = [
+    {"id": "engine/mcts", "name": "MCTS Engine (local)"},
+]
+ENGINE_IDS = tuple(model["id"] for model in ENGINE_MODELS)
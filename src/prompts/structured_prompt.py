@@ -0,0 +1,35 @@
+STRUCTURED_MOVE_PROMPT = """It is now {turn}'s turn. You play {turn}.
+
+Board size: {board_size}.
+Rules: {rules}
+Current board (x = column left to right, the header shows only its last digit;
+y = row top to bottom; X BLACK, O WHITE, . empty; the lowercase x / o is the
+last move):
+{board}
+
+Last move: {last_move}
+
+Threat summary:
+{threats}
+
+Choose your move. Do NOT call any tools. Answer only with JSON matching the
+schema: the empty intersection (x, y) where {turn} places a stone, and a short
+explanation of your strategic reasoning.
+"""
+
+STRUCTURED_CHOICE_PROMPT = """It is now {turn}'s turn, but the Swap2 opening is waiting for a
+color choice, and you make it.
+
+Rules: {rules}
+{opening}
+Current board (x = column left to right, the header shows only its last digit;
+y = row top to bottom; X BLACK, O WHITE, . empty; the lowercase x / o is the
+last move):
+{board}
+
+Threat summary:
+{threats}
+
+Do NOT call any tools. Answer only with JSON matching the schema: one of
+{options}, and a short explanation of your strategic reasoning.
+"""
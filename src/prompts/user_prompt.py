@@ -1,11 +1,21 @@
 USER_PROMPT = """It is now {turn}'s turn.
 
 Follow these steps:
-1. Call get_state() or visualize() to see the current board
-2. Call get_valid_moves() to see available positions
-3. Analyze the board and decide on your best move
-4. Call set_stone(x, y, "{turn}") to make your move
-5. Explain your strategic reasoning
+1. Call visualize() to see the current board
+2. Analyze the board and decide on your best move (empty intersections only)
+3. Call set_stone(x, y, "{turn}") to make your move
+4. Explain your strategic reasoning
+
+Remember: You must actually CALL the tools, not just describe what you would do.
+"""
+
+CHOICE_PROMPT = """It is now {turn}'s turn, but the Swap2 opening is waiting for a color choice.
+
+Follow these steps:
+1. Call visualize() to see the current board
+2. Decide which option is best for you: {options}
+3. Call choose_color(option) to make the choice (no stone can be placed before it)
+4. Explain your strategic reasoning
 
 Remember: You must actually CALL the tools, not just describe what you would do.
 """
@@ -0,0 +1,252 @@
+import time
+import heapq
+import random
+import asyncio
+import itertools
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel
+
+from metrics import LLM_RETRIES
+
+# 우선순위 레인 (값이 작을수록 먼저 처리)
+INTERACTIVE = 0
+BATCH = 1
+
+RETRYABLE_STATUS = (408, 429)
+
+
+class RateLimit(BaseModel):
+    rate: float  # 초당 허용 요청 수
+    burst: int  # 순간적으로 허용하는 최대 요청 수
+    concurrency: int  # 동시에 진행 중일 수 있는 최대 요청 수
+
+
+DEFAULT_MODEL_LIMIT = RateLimit(rate=1.0, burst=4, concurrency=4)
+DEFAULT_PROVIDER_LIMIT = RateLimit(rate=4.0, burst=8, concurrency=8)
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 capacity 개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """토큰 하나를 예약하고, 사용 가능해질 때까지 기다려야 하는 시간(초)을 반환"""
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """429 등을 받았을 때 seconds 동안 토큰이 생기지 않도록 비움"""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class PriorityGate:
+    """동시 실행 수를 제한하고, 대기 중인 요청은 우선순위 -> 도착 순으로 깨움"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int) -> None:
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되었다면 다음 대기자에게 양보
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.active += 1
+                future.set_result(None)
+                break
+
+
+class SchedulerMetrics(BaseModel):
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    queue_time: float = 0.0  # 게이트/토큰 대기 누적 시간(초)
+    latency: float = 0.0  # 실제 API 호출 누적 시간(초)
+
+
+def provider_of(model_id: str) -> str:
+    """'google/gemini-2.5-flash' -> 'google'"""
+    return model_id.split("/", 1)[0]
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+
+def is_retryable(error: Exception) -> bool:
+    """408 / 429 / 5xx / 타임아웃 / 연결 오류는 재시도 대상"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """응답의 Retry-After 헤더 (초) 가 있으면 반환"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """OpenRouter 호출 앞단의 공용 비동기 스케줄러
+
+    - 모델/프로바이더 별 토큰 버킷과 동시 요청 수 제한
+    - 우선순위 레인 (INTERACTIVE 요청이 BATCH 요청보다 먼저 슬롯을 받음)
+    - 429/5xx 는 지수 백오프 + full jitter 로 재시도 (Retry-After 우선)
+    - 모델별 메트릭 (metrics)
+    """
+
+    def __init__(
+        self,
+        model_limits: Optional[dict[str, RateLimit]] = None,
+        provider_limits: Optional[dict[str, RateLimit]] = None,
+        default_model_limit: RateLimit = DEFAULT_MODEL_LIMIT,
+        default_provider_limit: RateLimit = DEFAULT_PROVIDER_LIMIT,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ) -> None:
+        self.model_limits = model_limits or {}
+        self.provider_limits = provider_limits or {}
+        self.default_model_limit = default_model_limit
+        self.default_provider_limit = default_provider_limit
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics: dict[str, SchedulerMetrics] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._gates: dict[str, PriorityGate] = {}
+
+    def _limit(self, key: str) -> RateLimit:
+        if key.startswith("provider:"):
+            provider = key.removeprefix("provider:")
+            return self.provider_limits.get(provider, self.default_provider_limit)
+        return self.model_limits.get(key, self.default_model_limit)
+
+    def _bucket(self, key: str) -> TokenBucket:
+        if key not in self._buckets:
+            limit = self._limit(key)
+            self._buckets[key] = TokenBucket(limit.rate, limit.burst)
+        return self._buckets[key]
+
+    def _gate(self, key: str) -> PriorityGate:
+        if key not in self._gates:
+            self._gates[key] = PriorityGate(self._limit(key).concurrency)
+        return self._gates[key]
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        return delay
+
+    async def _call_once(self, keys: list[str], priority: int, fn, kwargs, metrics):
+        queued = time.monotonic()
+        # 토큰은 게이트 전에: 토큰을 기다리는 동안 동시 실행 슬롯을 잡고 있지 않도록
+        wait = max(self._bucket(key).reserve() for key in keys)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        acquired = []
+        try:
+            for key in keys:
+                await self._gate(key).acquire(priority)
+                acquired.append(key)
+
+            started = time.monotonic()
+            metrics.queue_time += started - queued
+            try:
+                return await asyncio.to_thread(fn, **kwargs)
+            finally:
+                metrics.latency += time.monotonic() - started
+        finally:
+            for key in reversed(acquired):
+                self._gate(key).release()
+
+    async def submit(
+        self, fn: Callable[..., Any], priority: int = BATCH, **kwargs
+    ) -> Any:
+        """fn(**kwargs) 를 제한에 맞춰 실행 (fn 은 동기 함수, 스레드에서 실행)"""
+        model = kwargs.get("model", "default")
+        keys = [model, f"provider:{provider_of(model)}"]
+        metrics = self.metrics.setdefault(model, SchedulerMetrics())
+        metrics.requests += 1
+
+        attempt = 0
+        while True:
+            try:
+                result = await self._call_once(keys, priority, fn, kwargs, metrics)
+                metrics.successes += 1
+                return result
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    metrics.failures += 1
+                    raise
+
+                delay = self._backoff(attempt, e)
+                metrics.retries += 1
+                LLM_RETRIES.inc(model=model, status=_status_code(e) or type(e).__name__)
+                attempt += 1
+                if _status_code(e) == 429:
+                    # 버킷을 비워 같은 모델/프로바이더로 가는 다른 요청들도 함께 쉬게 함
+                    # (이 요청도 다음 시도에서 버킷을 통해 기다림)
+                    metrics.rate_limited += 1
+                    for key in keys:
+                        self._bucket(key).pause(delay)
+                else:
+                    await asyncio.sleep(delay)
+
+    def snapshot(self) -> dict[str, dict]:
+        """모델별 메트릭을 dict 로 반환"""
+        return {model: m.model_dump() for model, m in self.metrics.items()}
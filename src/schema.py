@@ -8,18 +8,64 @@ TurnType = Literal[*PLAYER_TURNS]
 TurnTypeWin = Literal[*WIN_TURNS]
 TurnTypeAll = Literal[*PLAYER_TURNS, *WIN_TURNS]
 
-WIDTH, HEIGHT = 15, 15
+WIDTH, HEIGHT = 15, 15  # 기본 보드 크기
+
+# 규칙: freestyle (5목 이상 승), standard (정확히 5목), renju (흑 금수 + 흑은 정확히 5목)
+RULE_SETS = ("freestyle", "standard", "renju")
+OPENINGS = ("swap2",)
+# swap2: 3수 뒤 두 번째 플레이어의 선택, 5수 뒤 (place2 였다면) 첫 번째 플레이어의 선택
+SWAP2_OPTIONS = ("black", "white", "place2")
+SWAP_OPTIONS = ("black", "white")
+
+RuleType = Literal[*RULE_SETS]
+OpeningType = Literal[*OPENINGS]
 
 
 class Stone(BaseModel):
-    x: int = Field(..., ge=0, lt=WIDTH)
-    y: int = Field(..., ge=0, lt=HEIGHT)
+    # 범위 검사는 게임(보드 크기)마다 다르므로 Gomoku 에서 함
+    x: int
+    y: int
     type: TurnType
 
 
 class GomokuState(BaseModel):
     turn: TurnTypeAll = Field(default="BLACK")
     stones: List[Stone] = Field(default_factory=list)
-    board: List[List[Optional[TurnType]]] = Field(
+    # 큰 보드(sparse 표현)에서는 None: stones 만으로 국면을 표현
+    board: Optional[List[List[Optional[TurnType]]]] = Field(
         default_factory=lambda: [[None for _ in range(WIDTH)] for _ in range(HEIGHT)]
     )
+    # None 이면 무한(unbounded) 보드
+    width: Optional[int] = WIDTH
+    height: Optional[int] = HEIGHT
+    rule: RuleType = "freestyle"
+    opening: Optional[OpeningType] = None
+    # 오프닝에서 색 선택을 기다리는 중이면 "swap2" / "swap" (그동안 착수 불가)
+    pending_choice: Optional[Literal["swap2", "swap"]] = None
+    swap_choices: List[str] = Field(default_factory=list)
+
+
+# 필승 수순 탐색 (VCF: 연속 4, VCT: 4 와 열린 3) 결과
+class ForcedWin(BaseModel):
+    attacker: TurnType
+    kind: Literal["vcf", "vct"]
+    found: bool
+    # 공격 / 수비가 번갈아 두는 수순 (공격 수부터, 수비는 증명에서 가장 오래 버틴 수)
+    moves: List[Stone] = Field(default_factory=list)
+    nodes: int = 0
+    elapsed: float = 0.0
+    # False 면 노드 / 시간 제한에 걸려 끝까지 탐색하지 못함 (found=False 가 "없음"이 아님)
+    complete: bool = True
+
+
+# 단일 요청(structured output) 모드에서 LLM이 반환하는 착수
+class MoveDecision(BaseModel):
+    x: int
+    y: int
+    reasoning: str
+
+
+# 단일 요청 모드에서 Swap2 색 선택을 기다릴 때 LLM이 반환하는 선택
+class ChoiceDecision(BaseModel):
+    option: Literal[*SWAP2_OPTIONS]
+    reasoning: str
@@ -0,0 +1,319 @@
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import itertools
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import BaseModel, Field
+from fastmcp import Client
+from openai import OpenAI
+
+from game.gomoku import Gomoku
+from mcp_server.server import create_mcp_server
+from manager import GameManager
+from scheduler import DEFAULT_PROVIDER_LIMIT, RequestScheduler, RateLimit, BATCH
+from schema import PLAYER_TURNS, RULE_SETS
+from utils import *
+from models import AVAILABLE_MODELS, ENGINE_IDS
+from log import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+
+class GameResult(BaseModel):
+    black: str
+    white: str
+    winner: Optional[str] = None  # "BLACK" / "WHITE" / None(무승부)
+    reason: str  # "five", "forfeit", "draw"
+    moves: list[tuple[int, int]] = Field(default_factory=list)
+    # Gomoku.to_record() (보드 크기 / 규칙 포함, analysis.py 가 다시 둘 때 씀)
+    record: Optional[dict] = None
+    duration: float = 0.0
+
+
+def compute_elo(
+    results: list[GameResult], k: float = 32.0, initial: float = 1500.0
+) -> dict[str, float]:
+    """게임 결과를 순서대로 반영해 Elo 레이팅 계산"""
+    ratings: dict[str, float] = {}
+    for result in results:
+        rb = ratings.setdefault(result.black, initial)
+        rw = ratings.setdefault(result.white, initial)
+        expected_black = 1.0 / (1.0 + 10 ** ((rw - rb) / 400))
+        if result.winner == "BLACK":
+            score_black = 1.0
+        elif result.winner == "WHITE":
+            score_black = 0.0
+        else:
+            score_black = 0.5
+        delta = k * (score_black - expected_black)
+        ratings[result.black] = rb + delta
+        ratings[result.white] = rw - delta
+    return ratings
+
+
+def format_ratings(results: list[GameResult], ratings: dict[str, float]) -> str:
+    """레이팅 표 (W/L/D 포함) 문자열 생성"""
+    records = {model: [0, 0, 0] for model in ratings}
+    for result in results:
+        if result.winner is None:
+            records[result.black][2] += 1
+            records[result.white][2] += 1
+        else:
+            winner = result.black if result.winner == "BLACK" else result.white
+            loser = result.white if result.winner == "BLACK" else result.black
+            records[winner][0] += 1
+            records[loser][1] += 1
+
+    lines = [f"{'#':>2}  {'Model':<36} {'Elo':>7}  {'W':>3} {'L':>3} {'D':>3}"]
+    ranked = sorted(ratings.items(), key=lambda item: item[1], reverse=True)
+    for rank, (model, rating) in enumerate(ranked, 1):
+        w, l, d = records[model]
+        lines.append(f"{rank:>2}  {model:<36} {rating:>7.1f}  {w:>3} {l:>3} {d:>3}")
+    return "\n".join(lines)
+
+
+class Tournament:
+    """AVAILABLE_MODELS 끼리 라운드 로빈 대국을 asyncio 로 동시에 진행
+
+    - 게임마다 독립된 Gomoku 인스턴스와 MCP 서버를 사용
+    - provider 별 동시 요청 수 제한과 429 백오프는 공용 RequestScheduler 가 담당
+      (토너먼트 요청은 BATCH 레인으로 들어가 웹 UI 요청보다 뒤로 밀림)
+    - 모델이 수를 두지 못한 턴은 지수 백오프 + jitter 후 재시도
+    - board_size 로 보드 크기 지정 (0 이면 무한 보드), rule 로 규칙 지정
+    - models 에 ENGINE_IDS (예: "engine/mcts") 를 넣으면 LLM 대신 로컬 엔진이 둠
+      (engine_options 는 MCTS 생성 인자)
+    """
+
+    def __init__(
+        self,
+        openrouter_client,
+        models: Optional[list[str]] = None,
+        games_per_pair: int = 1,
+        max_concurrent_games: int = 16,
+        scheduler: Optional[RequestScheduler] = None,
+        max_retries: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        board_size: int = 15,
+        max_moves: int = 400,
+        rule: str = "freestyle",
+        engine_options: Optional[dict] = None,
+    ) -> None:
+        self.openrouter_client = openrouter_client
+        self.models = models or [model["id"] for model in AVAILABLE_MODELS]
+        self.games_per_pair = games_per_pair
+        self.scheduler = scheduler or RequestScheduler()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # 0 이면 무한 보드 (보드가 차지 않으므로 max_moves 수에서 무승부 처리)
+        self.board_size = board_size
+        self.max_moves = max_moves
+        self.rule = rule
+        self.engine_options = engine_options or {}
+        self._game_slots = asyncio.Semaphore(max_concurrent_games)
+
+    def pairings(self) -> list[tuple[str, str]]:
+        """모든 모델 쌍에 대해 흑/백을 바꿔가며 games_per_pair 판씩"""
+        pairs = list(itertools.permutations(self.models, 2))
+        return pairs * self.games_per_pair
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(0, delay)
+
+    async def _play_turn(self, manager: GameManager) -> bool:
+        """한 수를 두게 하고, 실패하면 백오프 후 재시도. 결국 못 두면 False"""
+        turn = manager.current_state.turn
+
+        for attempt in range(self.max_retries):
+            result = await manager.process_ai_turn()
+
+            await manager.update_state()
+            if manager.current_state.turn != turn:
+                return True
+
+            delay = self._backoff(attempt)
+            logger.warning(
+                "⚠️ %s 착수 실패 (%d/%d): %s",
+                manager.current_model,
+                attempt + 1,
+                self.max_retries,
+                result.get("error", "수를 두지 않음"),
+            )
+            await asyncio.sleep(delay)
+
+        return False
+
+    async def play_game(self, black: str, white: str) -> GameResult:
+        """한 판 진행"""
+        started = time.monotonic()
+        game = Gomoku(self.board_size, rule=self.rule)
+        mcp_client = Client(create_mcp_server(game))
+
+        async with self._game_slots, mcp_client:
+            tool_schemas = await load_tool_schemas(mcp_client)
+
+            players = {}
+            for turn, model in zip(PLAYER_TURNS, (black, white)):
+                manager = GameManager(
+                    mcp_client,
+                    self.openrouter_client,
+                    scheduler=self.scheduler,
+                    priority=BATCH,
+                )
+                manager.tool_schemas = tool_schemas
+                manager.current_model = model
+                manager.engine_options = self.engine_options
+                players[turn] = manager
+
+            winner, reason = None, "draw"
+            while (
+                game.get_turn() in PLAYER_TURNS
+                and game.get_valid_moves()
+                and len(game.get_moves()) < self.max_moves
+            ):
+                turn = game.get_turn()
+                manager = players[turn]
+                await manager.update_state()
+
+                if not await self._play_turn(manager):
+                    winner = "WHITE" if turn == "BLACK" else "BLACK"
+                    reason = "forfeit"
+                    break
+            else:
+                if game.get_turn() not in PLAYER_TURNS:
+                    winner = game.get_turn().removesuffix("_WIN")
+                    reason = "five"
+
+        result = GameResult(
+            black=black,
+            white=white,
+            winner=winner,
+            reason=reason,
+            moves=game.get_moves(),
+            record=game.to_record(),
+            duration=time.monotonic() - started,
+        )
+        logger.info(
+            "🏁 %s (●) vs %s (○): %s [%s, %d수]",
+            black,
+            white,
+            winner or "DRAW",
+            reason,
+            len(result.moves),
+            extra={"black": black, "white": white, "winner": winner},
+        )
+        return result
+
+    async def run(self) -> list[GameResult]:
+        """모든 대국을 동시에 실행 (동시 게임 수는 max_concurrent_games 로 제한)"""
+        tasks = [self.play_game(black, white) for black, white in self.pairings()]
+        return list(await asyncio.gather(*tasks))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="LLM 오목 라운드 로빈 토너먼트")
+    parser.add_argument("--models", nargs="*", help="참가 모델 id (기본: 전체)")
+    parser.add_argument("--games-per-pair", type=int, default=1)
+    parser.add_argument("--max-concurrent-games", type=int, default=16)
+    parser.add_argument(
+        "--provider-concurrency", type=int, default=DEFAULT_PROVIDER_CONCURRENCY
+    )
+    parser.add_argument(
+        "--provider-rate",
+        type=float,
+        default=DEFAULT_PROVIDER_LIMIT.rate,
+        help="프로바이더 별 초당 요청 수",
+    )
+    parser.add_argument(
+        "--board-size", type=int, default=15, help="보드 크기 (0 이면 무한 보드)"
+    )
+    parser.add_argument("--max-moves", type=int, default=400)
+    parser.add_argument("--rule", choices=RULE_SETS, default="freestyle")
+    parser.add_argument(
+        "--engine-time",
+        type=float,
+        default=2.0,
+        help="로컬 엔진의 수마다 탐색 시간 (초)",
+    )
+    parser.add_argument(
+        "--engine-workers",
+        type=int,
+        default=1,
+        help="로컬 엔진 탐색 프로세스 수 (모든 게임이 워커 풀을 공유)",
+    )
+    parser.add_argument(
+        "--engine-net",
+        help="로컬 엔진의 정책 / 가치망 (.npz, 모든 게임이 배치 추론 큐를 공유)",
+    )
+    parser.add_argument("--output", default="tournament_results.json")
+    args = parser.parse_args()
+
+    openrouter_client = OpenAI(
+        base_url="https://openrouter.ai/api/v1",
+        api_key=os.environ.get("OPENROUTER_API_KEY"),
+    )
+    models = args.models or [model["id"] for model in AVAILABLE_MODELS]
+    engine_options = {"time_limit": args.engine_time, "workers": args.engine_workers}
+    engine_pool = None
+    if args.engine_workers > 1 and any(model in ENGINE_IDS for model in models):
+        engine_pool = ProcessPoolExecutor(max_workers=args.engine_workers - 1)
+        engine_options["executor"] = engine_pool
+    if args.engine_net:
+        from game.network import BatchingEvaluator, NetworkEvaluator, PolicyValueNet
+
+        net = PolicyValueNet.load(args.engine_net)
+        engine_options["evaluator"] = NetworkEvaluator(net, BatchingEvaluator(net))
+    scheduler = RequestScheduler(
+        default_provider_limit=RateLimit(
+            rate=args.provider_rate,
+            burst=max(1, round(2 * args.provider_rate)),
+            concurrency=args.provider_concurrency,
+        )
+    )
+    tournament = Tournament(
+        openrouter_client,
+        models=models,
+        games_per_pair=args.games_per_pair,
+        max_concurrent_games=args.max_concurrent_games,
+        scheduler=scheduler,
+        board_size=args.board_size,
+        max_moves=args.max_moves,
+        rule=args.rule,
+        engine_options=engine_options,
+    )
+
+    try:
+        results = await tournament.run()
+    finally:
+        if engine_pool is not None:
+            engine_pool.shutdown(cancel_futures=True)
+    ratings = compute_elo(results)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "results": [result.model_dump() for result in results],
+                "ratings": ratings,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    print(format_ratings(results, ratings))
+    logger.info("📈 요청 통계: %s", scheduler.snapshot())
+    logger.info("💾 결과 저장: %s", args.output)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
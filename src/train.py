@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import random
+import argparse
+from typing import Iterable, Optional
+
+import numpy as np
+
+from game.gomoku import Gomoku
+from game.mcts import MCTS
+from game.network import PolicyValueNet, NetworkEvaluator
+from dataset import (
+    DEFAULT_SHARD_SIZE,
+    SHARD_FORMATS,
+    read_records,
+    game_examples,
+    build_shards,
+    shard_batches,
+)
+from log import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+# 자가 대국 초반 이 수만큼은 방문 수 비율로 뽑아서 둠 (대국마다 다른 국면이 나오도록)
+EXPLORE_MOVES = 6
+
+
+# --- 자가 대국 ---
+
+
+def selfplay_game(
+    engine: MCTS,
+    rng: random.Random,
+    board_size: int = 15,
+    rule: str = "freestyle",
+    explore_moves: int = EXPLORE_MOVES,
+) -> dict:
+    """엔진끼리 한 판 두고 Gomoku.to_record() 형식 (+ "winner") 으로 반환"""
+    game = Gomoku(board_size, rule=rule)
+    while "WIN" not in game.get_turn() and game.get_valid_moves():
+        result = engine.search(game)
+        move = result.move
+        if len(game.get_moves()) < explore_moves and result.stats:
+            moves = list(result.stats)
+            weights = [visits for visits, _ in result.stats.values()]
+            move = rng.choices(moves, weights)[0]
+        game.set_stone(*move)
+    turn = game.get_turn()
+    return {
+        **game.to_record(),
+        "winner": turn.removesuffix("_WIN") if "WIN" in turn else None,
+    }
+
+
+# --- 학습 ---
+
+
+def fit(
+    net: PolicyValueNet,
+    examples: Iterable[tuple[np.ndarray, int, float]],
+    epochs: int = 5,
+    batch_size: int = 64,
+    lr: float = 1e-3,
+    seed: int = 0,
+) -> list[dict[str, float]]:
+    """예제를 보드 크기별로 모아 미니배치 학습. epoch 마다 평균 손실"""
+    groups: dict[tuple, list] = {}
+    for planes, index, value in examples:
+        groups.setdefault(planes.shape, []).append((planes, index, value))
+
+    rng = np.random.default_rng(seed)
+    history = []
+    for epoch in range(epochs):
+        totals = {"policy_loss": 0.0, "value_loss": 0.0}
+        batches = 0
+        for shape, group in groups.items():
+            order = rng.permutation(len(group))
+            for start in range(0, len(order), batch_size):
+                chunk = [group[i] for i in order[start : start + batch_size]]
+                planes = np.stack([item[0] for item in chunk])
+                policy = np.zeros((len(chunk), shape[1] * shape[2]), dtype=np.float32)
+                policy[np.arange(len(chunk)), [item[1] for item in chunk]] = 1.0
+                value = np.array([item[2] for item in chunk], dtype=np.float32)
+                for key, loss in net.train_step(planes, policy, value, lr).items():
+                    totals[key] += loss
+                batches += 1
+        history.append({key: total / max(batches, 1) for key, total in totals.items()})
+        logger.info("📉 epoch %d: %s", epoch + 1, history[-1])
+    return history
+
+
+def fit_shards(
+    net: PolicyValueNet,
+    directory: str,
+    epochs: int = 5,
+    batch_size: int = 64,
+    lr: float = 1e-3,
+    seed: int = 0,
+) -> list[dict[str, float]]:
+    """샤드 디렉터리 (dataset.build_shards) 를 스트리밍하며 학습. 코퍼스 전체를 메모리에 올리지 않음"""
+    history = []
+    for epoch in range(epochs):
+        totals = {"policy_loss": 0.0, "value_loss": 0.0}
+        batches = 0
+        for planes, policy, value in shard_batches(directory, batch_size, seed + epoch):
+            for key, loss in net.train_step(planes, policy, value, lr).items():
+                totals[key] += loss
+            batches += 1
+        history.append({key: total / max(batches, 1) for key, total in totals.items()})
+        logger.info("📉 epoch %d: %s", epoch + 1, history[-1])
+    return history
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="정책 / 가치망 자가 대국 + 학습")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("selfplay", help="MCTS 자가 대국 레코드 (JSONL) 생성")
+    play.add_argument("--games", type=int, default=10)
+    play.add_argument("--board-size", type=int, default=15)
+    play.add_argument("--rule", default="freestyle")
+    play.add_argument("--engine-time", type=float, default=0.5)
+    play.add_argument("--net", help="사전 확률 / 가치에 쓸 망 (.npz)")
+    play.add_argument("--seed", type=int, default=0)
+    play.add_argument("--output", default="selfplay.jsonl")
+
+    shards = commands.add_parser(
+        "shards", help="게임 레코드를 대칭 증강한 학습 샤드로 변환"
+    )
+    shards.add_argument("--records", nargs="+", required=True)
+    shards.add_argument("--output", default="shards")
+    shards.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    shards.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    shards.add_argument("--format", choices=SHARD_FORMATS, default="npz")
+    shards.add_argument("--no-symmetries", action="store_true")
+
+    train = commands.add_parser("fit", help="게임 레코드 또는 샤드로 망 학습")
+    source = train.add_mutually_exclusive_group(required=True)
+    source.add_argument("--records", nargs="+")
+    source.add_argument("--shards", help="train.py shards 로 만든 디렉터리")
+    train.add_argument("--net", help="이어서 학습할 망 (.npz)")
+    train.add_argument("--epochs", type=int, default=5)
+    train.add_argument("--batch-size", type=int, default=64)
+    train.add_argument("--lr", type=float, default=1e-3)
+    train.add_argument("--output", default="net.npz")
+    args = parser.parse_args(argv)
+
+    if args.command == "selfplay":
+        # 망은 유한 보드만 평가함: 무한 보드 (--board-size 0) 는 기본 휴리스틱 evaluator
+        evaluator = (
+            NetworkEvaluator(PolicyValueNet.load(args.net))
+            if args.net and args.board_size
+            else None
+        )
+        rng = random.Random(args.seed)
+        with open(args.output, "a", encoding="utf-8") as f:
+            for i in range(args.games):
+                # 대국마다 새 엔진 (트리 재사용은 한 판 안에서만)
+                engine = MCTS(
+                    evaluator=evaluator, time_limit=args.engine_time, seed=rng.random()
+                )
+                record = selfplay_game(engine, rng, args.board_size, args.rule)
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                f.flush()
+                logger.info(
+                    "🤖 자가 대국 %d/%d: %s (%d수)",
+                    i + 1,
+                    args.games,
+                    record["winner"] or "DRAW",
+                    len(record["moves"]),
+                )
+        return 0
+
+    if args.command == "shards":
+        build_shards(
+            args.records,
+            args.output,
+            args.shard_size,
+            args.workers,
+            not args.no_symmetries,
+            args.format,
+        )
+        return 0
+
+    net = PolicyValueNet.load(args.net) if args.net else PolicyValueNet(seed=0)
+    if args.shards:
+        fit_shards(net, args.shards, args.epochs, args.batch_size, args.lr)
+    else:
+        examples = (
+            example
+            for record in read_records(args.records)
+            for example in game_examples(record)
+        )
+        fit(net, examples, args.epochs, args.batch_size, args.lr)
+    net.save(args.output)
+    logger.info("💾 망 저장: %s", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(main())
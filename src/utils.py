@@ -1,4 +1,30 @@
-from typing import Dict, Any
+import os
+import json
+import hashlib
+import functools
+from typing import Dict, Any, List, Optional
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 변환된 도구 스키마 디스크 캐시 (재시작 시 list_tools + 변환 생략)
+# 실행 위치와 관계없이 같은 파일을 쓰도록 저장소 루트 기준 절대 경로
+TOOL_SCHEMA_CACHE = os.path.abspath(
+    os.environ.get(
+        "GOMOKU_TOOL_CACHE",
+        os.path.join(os.path.dirname(_SRC_DIR), ".cache", "tool_schemas.json"),
+    )
+)
+# 도구 설명/기본값이 만들어지는 모든 파일 (상태 스키마, 규칙 설명, 탐색 기본값)
+_TOOL_SOURCES = tuple(
+    os.path.join(_SRC_DIR, *parts)
+    for parts in (
+        ("mcp_server", "server.py"),
+        ("schema.py",),
+        ("game", "rules.py"),
+        ("game", "solver.py"),
+        ("utils.py",),
+    )
+)
 
 
 def to_openrouter_schema(tool) -> Dict[str, Any]:
@@ -55,9 +81,12 @@ def to_openai_schema(tool) -> Dict[str, Any]:
     schema.setdefault("type", "object")
     schema.setdefault("properties", {})
     if "required" not in schema:
-        schema["required"] = list(
-            schema["properties"].keys()
-        )  # 모두 optional 로 두고 싶다면 []
+        # 기본값이 있는 인자는 LLM 이 생략할 수 있음
+        schema["required"] = [
+            name
+            for name, prop in schema["properties"].items()
+            if not isinstance(prop, dict) or "default" not in prop
+        ]
 
     # OpenAI 툴 JSON 반환
     return {
@@ -66,3 +95,126 @@ def to_openai_schema(tool) -> Dict[str, Any]:
         "description": getattr(tool, "description", ""),
         "parameters": schema,
     }
+
+
+# LLM 에게 보여주지 않는 도구 인자 (기본값으로 충분함)
+HIDDEN_PARAMS = ("game_id",)
+
+
+def _strip_titles(schema):
+    """pydantic 이 붙이는 "title" 키 제거 (재귀)"""
+    if isinstance(schema, dict):
+        return {
+            key: _strip_titles(value) for key, value in schema.items() if key != "title"
+        }
+    if isinstance(schema, list):
+        return [_strip_titles(value) for value in schema]
+    return schema
+
+
+def _hide_params(tool: Dict[str, Any], compact: bool) -> Dict[str, Any]:
+    function = dict(tool["function"])
+    parameters = dict(function.get("parameters") or {})
+    parameters["properties"] = {
+        name: prop
+        for name, prop in parameters.get("properties", {}).items()
+        if name not in HIDDEN_PARAMS
+    }
+    parameters["required"] = [
+        name for name in parameters.get("required", []) if name not in HIDDEN_PARAMS
+    ]
+    if compact:
+        # 설명은 첫 문단만, 인자 스키마의 title 제거
+        function["description"] = (function.get("description") or "").split("\n\n")[0]
+        parameters = _strip_titles(parameters)
+    function["parameters"] = parameters
+    return {**tool, "function": function}
+
+
+class ToolSchemas:
+    """변환된 OpenRouter 도구 스키마 (한 번 변환해서 재사용)
+
+    - version: 도구 정의 해시 (정의가 바뀌면 달라짐)
+    - select(names, compact): 요청별 도구 부분집합 (메모이즈되어 같은 리스트를 재사용)
+    - json(names, compact): 미리 직렬화한 JSON (디스크 캐시 / 크기 계산용)
+    """
+
+    def __init__(self, tools: List[Dict[str, Any]]) -> None:
+        self.tools = tools
+        self.names = tuple(tool["function"]["name"] for tool in tools)
+        self._by_name = {tool["function"]["name"]: tool for tool in tools}
+        self._selected: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._json: Dict[tuple, str] = {}
+        self.version = hashlib.sha256(self.json().encode()).hexdigest()[:12]
+
+    def select(
+        self, names: Optional[tuple] = None, compact: bool = False
+    ) -> List[Dict[str, Any]]:
+        key = (names or self.names, compact)
+        selected = self._selected.get(key)
+        if selected is None:
+            selected = self._selected[key] = [
+                _hide_params(self._by_name[name], compact)
+                for name in key[0]
+                if name in self._by_name
+            ]
+        return selected
+
+    def json(self, names: Optional[tuple] = None, compact: bool = False) -> str:
+        key = (names or self.names, compact)
+        if key not in self._json:
+            if key == (self.names, False):
+                tools = self.tools
+            else:
+                tools = self.select(names, compact)
+            self._json[key] = json.dumps(tools, ensure_ascii=False)
+        return self._json[key]
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+
+# 프로세스 안 메모 (fingerprint -> ToolSchemas): 게임마다 디스크를 다시 읽지 않음
+_loaded: Dict[str, ToolSchemas] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def tool_schema_fingerprint() -> str:
+    """도구 정의(서버, 스키마, 규칙 설명)나 변환 코드가 바뀌면 달라지는 캐시 키"""
+    digest = hashlib.sha256()
+    for path in _TOOL_SOURCES:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+async def load_tool_schemas(mcp_client, path: str = TOOL_SCHEMA_CACHE) -> ToolSchemas:
+    """OpenRouter 형식 도구 스키마
+
+    프로세스 메모 -> 디스크 캐시 -> list_tools + 변환 순으로 찾음
+    """
+    fingerprint = tool_schema_fingerprint()
+    key = f"{fingerprint}:{path}"
+    if key in _loaded:
+        return _loaded[key]
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["fingerprint"] == fingerprint:
+            schemas = _loaded[key] = ToolSchemas(cached["tools"])
+            return schemas
+    except (OSError, ValueError, KeyError):
+        pass
+
+    tools = [to_openrouter_schema(tool) for tool in await mcp_client.list_tools()]
+    schemas = _loaded[key] = ToolSchemas(tools)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # 여러 프로세스가 동시에 써도 안전
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f'{{"fingerprint": "{fingerprint}", "tools": {schemas.json()}}}')
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # 캐시는 최적화일 뿐이므로 쓰기 실패는 무시
+    return schemas
@@ -0,0 +1,115 @@
+import json
+
+from game.gomoku import Gomoku
+from analysis import (
+    Analyser,
+    PositionCache,
+    analyse_games,
+    load_games,
+    render_html,
+    summarize,
+)
+
+# 흑이 열린 3 (7~9) 으로 이길 수 있었는데 (14, 14) 에 둠, 백도 막지 않음
+MISSED_WIN = [(7, 7), (0, 0), (8, 7), (0, 2), (9, 7), (0, 4), (14, 14), (1, 1)]
+MISSED_WIN += [(10, 7), (6, 7), (11, 7)]
+# 흑의 막힌 4 (7~10) 를 백이 막지 않음
+MISSED_BLOCK = [(7, 7), (6, 7), (8, 7), (0, 0), (9, 7), (0, 2), (10, 7), (0, 4)]
+MISSED_BLOCK += [(11, 7)]
+# 흑이 백의 대각선 3 을 내버려 둬 백이 우세해짐
+FLIP = [(7, 7), (3, 3), (8, 7), (4, 4), (14, 0), (5, 5), (14, 2), (6, 6)]
+
+
+def record(moves, **kwargs):
+    game = Gomoku(**kwargs)
+    for move in moves:
+        game.set_stone(*move)
+    return game.to_record()
+
+
+def kinds(report):
+    return {(a.ply, a.color, a.kind): a.best for a in report.annotations}
+
+
+def test_annotates_missed_wins_blocks_and_flips():
+    analyser = Analyser()
+    report = analyser.analyse({"id": "a", "record": record(MISSED_WIN)})
+    notes = kinds(report)
+    assert notes[(7, "BLACK", "missed_win")] in {(6, 7), (10, 7)}
+    assert (8, "WHITE", "blunder") in notes
+    assert report.winner == "BLACK" and report.values[-1] == 1.0
+    assert len(report.values) == report.plies + 1
+
+    report = analyser.analyse({"id": "b", "record": record(MISSED_BLOCK)})
+    assert kinds(report) == {(8, "WHITE", "missed_block"): (11, 7)}
+
+    report = analyser.analyse({"id": "c", "record": record(FLIP)})
+    assert (7, "BLACK", "blunder") in kinds(report)
+    # 백의 (6, 6) 은 한쪽이 막힌 4: (2, 2) 에 둬야 열린 4
+    assert kinds(report)[(8, "WHITE", "missed_win")] == (2, 2)
+    assert report.flips == [{"ply": 6, "to": "WHITE"}, {"ply": 8, "to": "BLACK"}]
+    assert report.winner is None
+
+
+def test_renju_forced_block_on_forbidden_point_loses():
+    # 백의 4 (7, 8)~(7, 11) 를 막을 자리 (7, 7) 가 흑에게는 4-4 금수
+    stones = {(x, 7): "BLACK" for x in (4, 5, 6)}
+    stones.update({(7, y): "BLACK" for y in (4, 5, 6, 12)})
+    stones.update({(7, y): "WHITE" for y in (8, 9, 10, 11)})
+    stones.update({(0, y): "WHITE" for y in (0, 2, 4)})
+    analyser = Analyser()
+    assert analyser.evaluate(stones, 15, 15, "renju", "BLACK") == (
+        -1.0,
+        "forbidden",
+        None,
+    )
+    # 자유룰이면 막으면서 4-4 를 만들어 이김
+    # (강제 수순을 끊은 depth 0 평가가 캐시에 먼저 들어가도 결과가 같아야 함)
+    cut = analyser.evaluate(stones, 15, 15, "freestyle", "BLACK", depth=0)
+    assert cut[1] != "forced"
+    assert analyser.evaluate(stones, 15, 15, "freestyle", "BLACK") == (
+        1.0,
+        "forced",
+        (7, 7),
+    )
+
+
+def test_pool_shares_position_cache(tmp_path):
+    results = {
+        "results": [
+            {"black": "a", "white": "b", "winner": "BLACK", "moves": MISSED_BLOCK},
+            {
+                "black": "b",
+                "white": "a",
+                "winner": None,
+                "moves": FLIP,
+                "record": record(FLIP),
+            },
+        ]
+    }
+    (tmp_path / "tournament.json").write_text(json.dumps(results))
+    (tmp_path / "selfplay.jsonl").write_text(
+        json.dumps({**record(MISSED_WIN), "winner": "BLACK"}) + "\n"
+    )
+    paths = [str(tmp_path / "tournament.json"), str(tmp_path / "selfplay.jsonl")]
+    games = list(load_games(paths))
+    assert [game["id"] for game in games] == [
+        "tournament.json:0",
+        "tournament.json:1",
+        "selfplay.jsonl:0",
+    ]
+
+    cache_path = str(tmp_path / "cache.sqlite3")
+    reports = list(analyse_games(games, workers=2, cache_path=cache_path))
+    assert [report.id for report in reports] == [game["id"] for game in games]
+    assert summarize(reports)["b"] == {"missed_win": 0, "missed_block": 1, "blunder": 1}
+
+    # 두 번째 실행은 워커들이 채운 캐시에서 모두 읽음
+    cache = PositionCache(cache_path)
+    analyser = Analyser(cache)
+    again = [analyser.analyse(game) for game in games]
+    assert cache.misses == 0 and cache.hits > 0
+    assert again == reports
+
+    page = render_html(reports)
+    assert "tournament.json:1" in page and "<svg" in page
@@ -0,0 +1,71 @@
+import pytest
+
+from cache import canonical_position
+from game.gomoku import Gomoku
+from game.heuristic import best_move, winning_moves, Position
+from game.state import BoardState, SparseBoardState
+
+
+def test_19x19_board_win_and_bounds():
+    game = Gomoku(19)
+    assert isinstance(game._board, BoardState)
+    state = game.get_state()
+    assert (state.width, state.height) == (19, 19)
+    assert len(state.board) == 19 and len(state.board[0]) == 19
+
+    for i in range(4):
+        game.set_stone(14 + i, 18)  # BLACK: 가장자리 행
+        game.set_stone(14 + i, 0)  # WHITE
+    assert game.set_stone(18, 18).turn == "BLACK_WIN"
+
+    with pytest.raises(ValueError):
+        Gomoku(19).set_stone(19, 0)
+
+
+def test_unbounded_board_allows_negative_coordinates():
+    game = Gomoku(None)
+    assert isinstance(game._board, SparseBoardState)
+    for i in range(4):
+        game.set_stone(-1000 + i, -5)
+        game.set_stone(500, 500 + i)
+    state = game.set_stone(-996, -5)
+    assert state.turn == "BLACK_WIN"
+    assert state.board is None and state.width is None
+
+    text = game.visualize_board("compact", highlight_last=True)
+    assert "x" in text and "-5 " in text
+
+
+def test_sparse_valid_moves_scale_with_stones():
+    game = Gomoku(1000)
+    assert isinstance(game._board, SparseBoardState)
+    assert game.get_valid_moves() == [(500, 500)]
+
+    game.set_stone(500, 500)
+    moves = game.get_valid_moves()
+    assert len(moves) == 24  # 5x5 이웃 - 돌 1개
+    assert (500, 500) not in moves
+
+
+def test_record_round_trip_keeps_size():
+    game = Gomoku(19)
+    game.set_stone(18, 18)
+    restored = Gomoku.from_record(game.to_record())
+    assert (restored.width, restored.height) == (19, 19)
+    assert restored.get_moves() == [(18, 18)]
+
+    legacy = Gomoku.from_record([(7, 7)])
+    assert (legacy.width, legacy.height) == (15, 15)
+
+
+def test_heuristic_and_cache_on_sparse_board():
+    game = Gomoku(0)
+    for i in range(4):
+        game.set_stone(100 + i, 100)
+        game.set_stone(-3, i)
+    state = game.get_state()
+
+    position = Position.from_state(state)
+    assert set(winning_moves(position, "BLACK")) == {(99, 100), (104, 100)}
+    assert best_move(state) in {(99, 100), (104, 100)}
+    assert canonical_position(state).startswith("BLACK:NonexNone:")
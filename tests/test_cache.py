@@ -0,0 +1,72 @@
+from cache import MoveCache, CachedMove, canonical_position
+from game.gomoku import Gomoku
+
+
+def test_put_and_get(tmp_path):
+    cache = MoveCache(str(tmp_path / "cache.sqlite3"))
+    state = Gomoku().get_state()
+    key = MoveCache.make_key("model-a", state, "v1")
+    assert cache.get(key) is None
+
+    cache.put(key, CachedMove(x=7, y=7, response="center"))
+    cached = cache.get(key)
+    assert cached == CachedMove(x=7, y=7, response="center")
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_key_depends_on_model_and_version():
+    state = Gomoku().get_state()
+    key = MoveCache.make_key("model-a", state, "v1")
+    assert key != MoveCache.make_key("model-b", state, "v1")
+    assert key != MoveCache.make_key("model-a", state, "v2")
+
+
+def test_canonical_position_ignores_move_order():
+    a = Gomoku()
+    a.set_stone(7, 7, "BLACK")
+    a.set_stone(0, 0, "WHITE")
+    a.set_stone(8, 8, "BLACK")
+    a.set_stone(1, 1, "WHITE")
+
+    b = Gomoku()
+    b.set_stone(8, 8, "BLACK")
+    b.set_stone(1, 1, "WHITE")
+    b.set_stone(7, 7, "BLACK")
+    b.set_stone(0, 0, "WHITE")
+
+    assert canonical_position(a.get_state()) == canonical_position(b.get_state())
+
+
+def test_key_depends_on_rule_and_opening_state():
+    moves = [(7, 7), (8, 8), (7, 8)]
+    keys = set()
+    for rule, opening in [("freestyle", None), ("renju", None), ("freestyle", "swap2")]:
+        game = Gomoku(rule=rule, opening=opening)
+        for move in moves:
+            game.set_stone(*move)
+        keys.add(MoveCache.make_key("model-a", game.get_state(), "v1"))
+    assert len(keys) == 3
+
+    # 같은 돌이어도 Swap2 선택 전후는 다른 국면
+    game.choose("place2")
+    assert MoveCache.make_key("model-a", game.get_state(), "v1") not in keys
+
+
+def test_ttl_expiry(tmp_path):
+    cache = MoveCache(str(tmp_path / "cache.sqlite3"), ttl=-1)
+    key = MoveCache.make_key("model-a", Gomoku().get_state(), "v1")
+    cache.put(key, CachedMove(x=7, y=7))
+    assert cache.get(key) is None
+
+
+def test_size_eviction(tmp_path):
+    cache = MoveCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put("a", CachedMove(x=0, y=0))
+    cache.put("b", CachedMove(x=1, y=1))
+    cache.get("a")
+    cache.put("c", CachedMove(x=2, y=2))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
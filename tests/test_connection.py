@@ -0,0 +1,341 @@
+import json
+import asyncio
+
+from connection import (
+    IDLE_CLOSE_CODE,
+    STALLED_CLOSE_CODE,
+    Broadcast,
+    Frame,
+    Outbox,
+    Session,
+    broadcast,
+    decode_board,
+    encode_board,
+    game_lock,
+)
+from game.gomoku import Gomoku
+
+
+class SlowSocket:
+    """release 될 때까지 전송이 멈춰 있는 클라이언트"""
+
+    def __init__(self):
+        self.frames = []
+        self.release = asyncio.Event()
+        self.close_code = None
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.frames.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        await self.release.wait()
+        self.frames.append(data)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+def test_outbox_coalesces_state_while_client_is_slow():
+    async def run():
+        socket = SlowSocket()
+        outbox = Outbox(socket, max_pending=8)
+        sender = asyncio.create_task(outbox.run())
+        outbox.send({"type": "chat", "n": 0})
+        await asyncio.sleep(0)  # 첫 메시지는 전송 중 (멈춤)
+        for n in range(50):
+            assert outbox.send({"type": "state", "n": n}, key="state")
+        outbox.send({"type": "chat", "n": 1})
+        assert len(outbox) == 2 and outbox.coalesced == 49
+
+        socket.release.set()
+        outbox.close()
+        await sender
+        return socket, outbox
+
+    socket, outbox = asyncio.run(run())
+    assert socket.frames == [
+        {"type": "chat", "n": 0},
+        {"type": "state", "n": 49},
+        {"type": "chat", "n": 1},
+    ]
+    assert outbox.sent == 3 and not outbox.send({"type": "chat"})
+
+
+def test_outbox_disconnects_stalled_clients():
+    async def overflow():
+        socket = SlowSocket()
+        outbox = Outbox(socket, max_pending=4)
+        sender = asyncio.create_task(outbox.run())
+        results = [outbox.send({"type": "chat", "n": n}) for n in range(6)]
+        await sender
+        await asyncio.sleep(0)
+        return socket, outbox, results
+
+    socket, outbox, results = asyncio.run(overflow())
+    assert results == [True] * 4 + [False] * 2
+    assert outbox.closed and socket.close_code == STALLED_CLOSE_CODE
+
+    async def timeout():
+        socket = SlowSocket()
+        outbox = Outbox(socket, send_timeout=0.05)
+        outbox.send({"type": "chat"})
+        await outbox.run()
+        await asyncio.sleep(0)
+        return socket, outbox
+
+    socket, outbox = asyncio.run(timeout())
+    assert outbox.closed and socket.close_code == STALLED_CLOSE_CODE
+
+
+def test_binary_board_frames():
+    game = Gomoku(None)
+    for move in [(0, 0), (-3, 5), (200, -7)]:
+        game.set_stone(*move)
+    state = game.get_state().model_dump()
+    frame = encode_board("stone_placed", state)
+    message_type, decoded = decode_board(frame)
+    assert message_type == "stone_placed" and decoded["turn"] == "WHITE"
+    assert decoded["width"] is None and decoded["stones"] == state["stones"]
+
+    full = Gomoku(15).get_state().model_dump()
+    full_frame = encode_board("state", full)
+    assert len(full_frame) < len(json.dumps(full)) // 10
+
+    async def run():
+        socket = SlowSocket()
+        socket.release.set()
+        outbox = Outbox(socket, binary=True)
+        outbox.send({"type": "state", "state": state})
+        outbox.send({"type": "ai_response", "response": "hi", "state": state})
+        outbox.send({"type": "ai_response", "error": "boom"})
+        outbox.close()
+        await outbox.run()
+        return socket.frames
+
+    frames = asyncio.run(run())
+    assert frames[0] == encode_board("state", state)
+    assert decode_board(frames[1])[0] == "ai_response"
+    assert frames[2:] == [
+        {"type": "ai_response", "response": "hi"},
+        {"type": "ai_response", "error": "boom"},
+    ]
+
+
+def test_out_of_range_boards_fall_back_to_json():
+    game = Gomoku(None)
+    for move in [(0, 0), (40_000, -40_000)]:
+        game.set_stone(*move)
+    state = game.get_state().model_dump()
+    assert encode_board("state", state) is None
+
+    async def run():
+        socket = SlowSocket()
+        socket.release.set()
+        outbox = Outbox(socket, binary=True)
+        outbox.send({"type": "state", "state": state})
+        outbox.send(Frame({"type": "move", "delta": state}))
+        outbox.close()
+        await outbox.run()
+        return outbox, socket.frames
+
+    outbox, frames = asyncio.run(run())
+    assert outbox.sent == 2
+    assert frames == [
+        {"type": "state", "state": state},
+        {"type": "move", "delta": state},
+    ]
+
+
+class ClientSocket(SlowSocket):
+    """받을 메시지를 큐로 넣어 주는 클라이언트 (None 이면 연결 끊김, str 은 그대로 보냄)"""
+
+    def __init__(self):
+        super().__init__()
+        self.release.set()
+        self.incoming = asyncio.Queue()
+
+    async def receive_text(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise ConnectionError("disconnected")
+        return message if isinstance(message, str) else json.dumps(message)
+
+    async def close(self, code=1000):
+        await super().close(code)
+        self.incoming.put_nowait(None)
+
+    async def wait_for(self, message_type):
+        while not any(frame.get("type") == message_type for frame in self.frames):
+            await asyncio.sleep(0.005)
+
+
+def start_session(handlers, lock, **kwargs):
+    socket = ClientSocket()
+    outbox = Outbox(socket)
+    sender = asyncio.create_task(outbox.run())
+
+    async def snapshot():
+        return {"state": {"turn": "BLACK"}}
+
+    session = Session(socket, outbox, handlers, lock, snapshot=snapshot, **kwargs)
+    return socket, session, asyncio.create_task(session.run()), sender
+
+
+def test_session_answers_ping_and_cancels_while_a_turn_runs():
+    async def run():
+        started = asyncio.Event()
+
+        async def think(message):
+            started.set()
+            await asyncio.sleep(60)
+
+        lock = asyncio.Lock()
+        socket, session, receiver, _ = start_session(
+            {"place_stone": think}, lock, max_actions=1
+        )
+        socket.incoming.put_nowait({"action": "place_stone"})
+        await started.wait()
+        assert lock.locked() and session.busy
+
+        socket.incoming.put_nowait({"action": "ping", "t": 1})
+        socket.incoming.put_nowait({"action": "place_stone"})
+        await socket.wait_for("busy")
+        socket.incoming.put_nowait({"action": "cancel"})
+        await socket.wait_for("cancelled")
+        assert not lock.locked() and not session.busy
+
+        socket.incoming.put_nowait({"action": "nope"})
+        socket.incoming.put_nowait(None)
+        try:
+            await receiver
+        except ConnectionError:
+            pass
+        return socket.frames
+
+    frames = asyncio.run(run())
+    assert frames == [
+        {"type": "pong", "t": 1},
+        {"type": "busy", "action": "place_stone"},
+        {"type": "cancelled", "action": "place_stone", "state": {"turn": "BLACK"}},
+        {"type": "error", "error": "Unknown action: nope"},
+    ]
+
+
+def test_session_survives_malformed_frames():
+    async def run():
+        handled = []
+
+        async def move(message):
+            handled.append(message["n"])
+
+        socket, _, receiver, _ = start_session({"place_stone": move}, asyncio.Lock())
+        for frame in ("{not json", "[1, 2]", '"text"'):
+            socket.incoming.put_nowait(frame)
+        socket.incoming.put_nowait({"action": "place_stone", "n": 1})
+        for _ in range(200):
+            if handled or receiver.done():
+                break
+            await asyncio.sleep(0.005)
+        assert not receiver.done()
+        socket.incoming.put_nowait(None)
+        await asyncio.gather(receiver, return_exceptions=True)
+        return socket.frames, handled
+
+    frames, handled = asyncio.run(run())
+    assert handled == [1]
+    assert [frame["type"] for frame in frames] == ["error"] * 3
+    assert frames[0]["error"].startswith("Invalid JSON")
+    assert frames[1]["error"] == frames[2]["error"] == "Message must be a JSON object"
+
+
+def test_game_lock_serialises_sessions_and_heartbeat_drops_idle_clients():
+    async def run():
+        order = []
+
+        async def move(message):
+            order.append(("start", message["n"]))
+            await asyncio.sleep(0.01)
+            order.append(("end", message["n"]))
+
+        lock = game_lock("test-game")
+        assert game_lock("test-game") is lock
+        first, _, _, _ = start_session({"place_stone": move}, lock)
+        second, _, _, _ = start_session({"place_stone": move}, lock)
+        first.incoming.put_nowait({"action": "place_stone", "n": 1})
+        second.incoming.put_nowait({"action": "place_stone", "n": 2})
+        while len(order) < 4:
+            await asyncio.sleep(0.005)
+
+        idle, _, receiver, _ = start_session(
+            {}, asyncio.Lock(), heartbeat_interval=0.01, heartbeat_timeout=0.05
+        )
+        await asyncio.wait_for(asyncio.gather(receiver, return_exceptions=True), 1)
+        return order, idle
+
+    order, idle = asyncio.run(run())
+    assert order == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert idle.close_code == IDLE_CLOSE_CODE
+    assert any(frame["type"] == "ping" for frame in idle.frames)
+
+
+def test_broadcast_serialises_once_and_catches_up_late_joiners():
+    game = Gomoku(9)
+
+    def play(*move):
+        game.set_stone(*move)
+        return game.get_state().model_dump()
+
+    async def run():
+        hub = Broadcast(backlog=2)
+        assert broadcast("test-hub") is broadcast("test-hub")
+        hub.publish(play(4, 4))
+        sockets = [ClientSocket() for _ in range(3)]
+        outboxes = [Outbox(socket) for socket in sockets[:2]]
+        outboxes.append(Outbox(sockets[2], binary=True))
+        for outbox in outboxes:
+            hub.subscribe(outbox)
+
+        assert hub.publish(play(5, 5)) == 3
+        assert hub.publish(game.get_state().model_dump()) == 0
+        # 모든 구독자가 같은 Frame (직렬화 한 번)
+        frames = [outbox._pending[-1][1] for outbox in outboxes]
+        assert frames[0] is frames[1] is frames[2]
+        assert frames[0].text() is frames[1].text()
+
+        for outbox in outboxes:
+            outbox.close()
+            await outbox.run()
+        return hub, sockets
+
+    hub, sockets = asyncio.run(run())
+    snapshot, move = sockets[0].frames
+    assert snapshot["type"] == "state" and snapshot["seq"] == 1
+    assert len(snapshot["state"]["stones"]) == 1
+    assert move == {
+        "type": "move",
+        "seq": 2,
+        "delta": {
+            "turn": "BLACK",
+            "width": 9,
+            "height": 9,
+            "stones": [{"x": 5, "y": 5, "type": "WHITE"}],
+        },
+    }
+    assert sockets[1].frames == sockets[0].frames
+    assert decode_board(sockets[2].frames[1]) == ("move", move["delta"])
+
+    # 다시 붙는 관전자: backlog 안이면 빠진 이벤트만, 아니면 스냅샷부터
+    hub.publish(play(3, 3))
+    late = Outbox(ClientSocket())
+    hub.subscribe(late, since=1)
+    assert [entry[1].payload["seq"] for entry in late._pending] == [2, 3]
+    stale = Outbox(ClientSocket())
+    hub.subscribe(stale, since=0)
+    assert [entry[1].type for entry in stale._pending] == ["state"]
+    assert stale._pending[0][1].payload["seq"] == 3
+
+    # 돌이 줄면 (새 게임) 전체 상태, 닫힌 구독자는 빠짐
+    late.close()
+    assert hub.publish(Gomoku(9).get_state().model_dump()) == 1
+    assert stale._pending[-1][1].type == "state" and hub.subscribers == {stale}
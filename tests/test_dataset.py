@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game.gomoku import Gomoku
+from game.network import PolicyValueNet
+from dataset import (
+    MANIFEST,
+    augment,
+    build_shards,
+    game_examples,
+    load_shard,
+    read_records,
+    shard_batches,
+)
+from train import fit_shards
+
+
+def record(moves, size=9, **kwargs):
+    game = Gomoku(size, **kwargs)
+    for move in moves:
+        game.set_stone(*move)
+    return game.to_record()
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in records:
+            f.write(json.dumps(item) + "\n")
+    return str(path)
+
+
+def test_augment_moves_policy_with_the_board():
+    example = list(game_examples(record([(1, 2), (3, 0), (5, 1)])))[2]
+    variants = list(augment(example))
+    assert len(variants) == 8
+    assert len({planes.tobytes() for planes, _, _ in variants}) == 8
+
+    for planes, index, value in variants:
+        # 둔 칸은 빈 칸이고, 돌 수와 결과는 그대로
+        assert planes[:2].reshape(2, -1)[:, index].sum() == 0
+        assert planes[:2].sum() == 2 and value == example[2]
+
+    # 90도 회전: (x, y) → (y, 8 - x)
+    planes, index, _ = variants[1]
+    assert index == (8 - 5) * 9 + 1
+    assert planes[0, 8 - 1, 2] == 1 and planes[1, 8 - 3, 0] == 1
+
+    # 정사각형이 아니면 크기가 유지되는 4 가지만
+    wide = next(game_examples({"width": 9, "height": 7, "moves": [(0, 0), (1, 1)]}))
+    assert [planes.shape for planes, _, _ in augment(wide)] == [(3, 7, 9)] * 4
+
+
+def test_shards_stream_all_examples(tmp_path):
+    games = [record([(i, 0), (i, 1), (i + 1, 0)]) for i in range(5)]
+    games.append(record([(0, 0), (1, 1)], size=7))
+    games.append({"width": None, "height": None, "moves": [(0, 0)]})
+    path = write_records(tmp_path / "games.jsonl", games)
+    assert [item["width"] for item in read_records([path], 1, 3)] == [9, 9]
+
+    directory = str(tmp_path / "shards")
+    shards = build_shards([path], directory, shard_size=16, workers=2, fmt="npy")
+    # 9x9: 5판 x 3수 x 8 대칭 = 120, 7x7: 2수 x 8 = 16 (무한 보드는 건너뜀)
+    sizes = {(9, 9): 0, (7, 7): 0}
+    for shard in shards:
+        assert shard["size"] <= 16
+        sizes[(shard["width"], shard["height"])] += shard["size"]
+    assert sizes == {(9, 9): 120, (7, 7): 16}
+
+    with open(f"{directory}/{MANIFEST}") as f:
+        assert json.load(f)["shards"] == shards
+    data = load_shard(directory, shards[0])
+    assert isinstance(data["planes"], np.memmap) and data["planes"].dtype == np.uint8
+
+    batches = list(shard_batches(directory, batch_size=10, seed=1))
+    assert sum(len(value) for _, _, value in batches) == 136
+    for planes, policy, value in batches:
+        assert planes.dtype == np.float32 and (policy.sum(axis=1) == 1).all()
+        assert planes.shape[0] == policy.shape[0] == value.shape[0]
+
+    history = fit_shards(PolicyValueNet(channels=4, layers=1), directory, epochs=1)
+    assert len(history) == 1 and history[0]["policy_loss"] > 0
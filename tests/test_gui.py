@@ -0,0 +1,19 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from connection import REJECTED_CLOSE_CODE, find_broadcast
+from gui import app
+
+
+@pytest.mark.parametrize(
+    "query", ["game=nobody", "since=abc", "since=-1", "game=nobody&since=3"]
+)
+def test_watch_rejects_unknown_games_and_bad_since(query):
+    # startup (MCP / OpenRouter 초기화) 없이: 거절은 연결 수락 전에 끝남
+    client = TestClient(app)
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect(f"/watch?{query}"):
+            pass
+    assert error.value.code == REJECTED_CLOSE_CODE
+    assert find_broadcast("nobody") is None
@@ -0,0 +1,44 @@
+from game.gomoku import Gomoku
+from game.heuristic import best_move, strong_moves, threat_summary, winning_moves
+
+
+def test_empty_board_plays_center():
+    assert best_move(Gomoku().get_state()) == (7, 7)
+
+
+def test_takes_own_win():
+    gomoku = Gomoku()
+    for i in range(4):
+        gomoku.set_stone(i + 3, 5, "BLACK")
+        gomoku.set_stone(i + 3, 9, "WHITE")
+    state = gomoku.get_state()
+    assert set(winning_moves(state.board, "BLACK")) == {(2, 5), (7, 5)}
+    assert best_move(state) in {(2, 5), (7, 5)}
+
+
+def test_blocks_opponent_four():
+    gomoku = Gomoku()
+    moves = [(3, 3), (7, 0), (4, 3), (12, 0), (5, 3), (12, 14), (6, 3)]
+    for x, y in moves:
+        gomoku.set_stone(x, y, gomoku.get_turn())
+    assert best_move(gomoku.get_state()) in {(2, 3), (7, 3)}
+
+
+def test_threat_summary_lists_wins_blocks_and_strong_points():
+    gomoku = Gomoku()
+    # 흑 열린 3 (6~8, 7) + 백 4 (0, 0~3)
+    for move in [(6, 7), (0, 0), (7, 7), (0, 1), (8, 7), (0, 2), (14, 14), (0, 3)]:
+        gomoku.set_stone(*move)
+    state = gomoku.get_state()
+    assert set(strong_moves(state.board, "BLACK")) >= {(5, 7), (9, 7)}
+    assert strong_moves(state.board, "BLACK", limit=1) in ([(5, 7)], [(9, 7)])
+
+    lines = threat_summary(state).splitlines()
+    assert lines[0] == "- BLACK wins immediately at: none"
+    assert lines[1] == "- WHITE threatens five at (must block): (0, 4)"
+    assert "(5, 7)" in lines[2] and "(9, 7)" in lines[2]
+    assert lines[3].startswith("- WHITE strong points to deny:")
+
+    gomoku.set_stone(13, 13)
+    gomoku.set_stone(0, 4)
+    assert threat_summary(gomoku.get_state()) == "Game over: WHITE_WIN."
@@ -0,0 +1,58 @@
+import io
+import json
+import logging
+
+import pytest
+
+import log
+from log import ensure_logging, get_logger, setup_logging, shutdown_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_json_logging_through_queue():
+    stream = io.StringIO()
+    setup_logging(level="INFO", fmt="json", stream=stream)
+    logger = get_logger("test")
+    logger.debug("hidden %s", "debug")
+    logger.info("move %d,%d", 7, 7, extra={"game_id": "g1"})
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["msg"] == "move 7,7"
+    assert lines[0]["level"] == "INFO"
+    assert lines[0]["game_id"] == "g1"
+
+
+def test_sampling_drops_info_but_keeps_warnings():
+    stream = io.StringIO()
+    setup_logging(level="INFO", fmt="text", sample_rate=0.0, stream=stream)
+    logger = get_logger("test")
+    logger.info("sampled out")
+    logger.warning("kept")
+    shutdown_logging()
+
+    output = stream.getvalue()
+    assert "sampled out" not in output
+    assert "kept" in output
+
+
+def test_ensure_logging_keeps_existing_setup():
+    stream = io.StringIO()
+    setup_logging(level="INFO", stream=stream)
+    listener = log._listener
+    ensure_logging()
+    assert log._listener is listener
+
+    shutdown_logging()
+    ensure_logging()
+    assert log._listener is not None
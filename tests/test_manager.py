@@ -0,0 +1,331 @@
+import re
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastmcp import Client
+
+from game.gomoku import Gomoku
+from game.heuristic import best_move
+from manager import CHOICE_TOOLS, GameManager
+from mcp_server.server import create_mcp_server
+from prompts.system_prompt import SYSTEM_PROMPT
+from prompts.user_prompt import USER_PROMPT
+
+
+def engine_manager(client, **options):
+    manager = GameManager(mcp_client=client, openrouter_client=None)
+    manager.current_model = "engine/mcts"
+    manager.engine_options = {"time_limit": None, "seed": 0, **options}
+    return manager
+
+
+def completion(content=None, tool_calls=None):
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def llm_manager(client, replies):
+    """OpenRouter 호출을 모델별 (지연, 응답) 목록으로 바꾼 GameManager"""
+    manager = GameManager(mcp_client=client, openrouter_client=None)
+    # 요청에 실린 도구는 이름만 기록
+    manager._tools = lambda names=None, compact=False: list(names or ())
+    calls, cancelled = [], []
+
+    async def create(**kwargs):
+        model = kwargs["model"]
+        calls.append({**kwargs, "messages": list(kwargs["messages"])})
+        delay, reply = replies[model].pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return reply
+
+    manager._create_completion = create
+    return manager, calls, cancelled
+
+
+def test_structured_move_parses_json_retries_and_falls_back():
+    occupied = completion('{"x": 7, "y": 7, "reasoning": "center"}')
+    replies = {
+        "m": [
+            (0, completion("not json")),
+            (0, completion('{"x": 8, "y": 8, "reasoning": "diagonal"}')),
+            (0, occupied),
+            (0, occupied),
+        ]
+    }
+
+    async def run():
+        game = Gomoku()
+        async with Client(create_mcp_server(game)) as client:
+            manager, calls, _ = llm_manager(client, replies)
+            manager.current_model = "m"
+            manager.move_mode = "structured"
+            await manager.update_state()
+
+            await manager.place_human_stone(7, 7)
+            result = await manager.process_ai_turn()
+            assert result["response"] == "diagonal"
+            # 차례 프롬프트 → 응답 (도구 루프와 같은 대화 기록 모양)
+            assert [m["role"] for m in manager.messages] == [
+                "system",
+                "user",
+                "assistant",
+            ]
+            assert manager.messages[1]["content"] == USER_PROMPT.format(turn="WHITE")
+            assert manager.messages[2]["content"] == "(8, 8): diagonal"
+
+            # 보드 + 위협 요약을 담은 한 번의 요청, 잘못된 응답이면 오류를 알려주고 다시 물음
+            assert "wins immediately at" in calls[0]["messages"][1]["content"]
+            assert "response_format" in calls[0]
+            retry = calls[1]["messages"]
+            assert retry[-2] == {"role": "assistant", "content": "not json"}
+            assert retry[-1]["content"].startswith("Invalid move:")
+
+            # 두 번 모두 이미 둔 자리면 휴리스틱 엔진의 수
+            await manager.place_human_stone(0, 0)
+            fallback = best_move(manager.current_state)
+            result = await manager.process_ai_turn()
+            assert result["response"].startswith("⚠️")
+            assert len(manager.messages) == 5
+        return game, fallback
+
+    game, fallback = asyncio.run(run())
+    assert game.get_moves()[1] == (8, 8) and game.get_moves()[-1] == fallback
+
+
+def set_stone_call(x, y, turn):
+    arguments = json.dumps({"x": x, "y": y, "turn": turn})
+    function = SimpleNamespace(name="set_stone", arguments=arguments)
+    return SimpleNamespace(id=f"call-{x}-{y}", function=function)
+
+
+def test_speculative_takes_first_legal_move_and_cancels_the_rest():
+    replies = {
+        # 가장 빠르지만 이미 둔 자리 → 탈락
+        "fast": [
+            (0, completion(tool_calls=[set_stone_call(7, 7, "WHITE")])),
+            (0, completion("giving up")),
+        ],
+        "good": [(0.05, completion("here", [set_stone_call(8, 8, "WHITE")]))],
+        "slow": [(5, completion(tool_calls=[set_stone_call(9, 9, "WHITE")]))],
+    }
+
+    async def run():
+        game = Gomoku()
+        async with Client(create_mcp_server(game)) as client:
+            manager, calls, cancelled = llm_manager(client, replies)
+            manager.speculative_models = ["fast", "good", "slow"]
+            await manager.update_state()
+            await manager.place_human_stone(7, 7)
+            result = await manager.process_ai_turn()
+        return game, manager, result, calls, cancelled
+
+    game, manager, result, calls, cancelled = asyncio.run(run())
+    assert result["model"] == "good" and result["response"] == "here"
+    assert game.get_moves() == [(7, 7), (8, 8)]
+    assert cancelled == ["slow"]
+    # 후보들은 같은 대화 + 차례 프롬프트로 시작하고, 채택된 수만 기록에 남음
+    assert {call["model"] for call in calls} == {"fast", "good", "slow"}
+    assert [m["role"] for m in manager.messages] == ["system", "user", "assistant"]
+
+
+def test_speculative_falls_back_to_heuristic_after_deadline():
+    replies = {"slow": [(5, completion(tool_calls=[set_stone_call(0, 0, "WHITE")]))]}
+
+    async def run():
+        game = Gomoku()
+        async with Client(create_mcp_server(game)) as client:
+            manager, _, cancelled = llm_manager(client, replies)
+            manager.speculative_models = ["slow"]
+            manager.speculative_deadline = 0.05
+            await manager.update_state()
+            await manager.place_human_stone(7, 7)
+            fallback = best_move(manager.current_state)
+            result = await manager.process_ai_turn()
+        return game, result, cancelled, fallback
+
+    game, result, cancelled, fallback = asyncio.run(run())
+    assert result["model"] == "engine" and result["response"].startswith("⏱️")
+    assert game.get_moves()[-1] == fallback and cancelled == ["slow"]
+
+
+def test_cancelled_ai_turn_stays_pending_until_resumed():
+    async def run():
+        game = Gomoku()
+        async with Client(create_mcp_server(game)) as client:
+            manager = engine_manager(client, playouts=10**9, time_limit=5.0)
+            await manager.update_state()
+            await manager.place_human_stone(7, 7)
+            turn = asyncio.create_task(manager.process_ai_turn())
+            await asyncio.sleep(0.2)
+            turn.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await turn
+            await manager.update_state()
+            assert manager.ai_turn_pending
+
+            # 사람이 AI 의 돌 (백) 을 대신 놓지 못함
+            with pytest.raises(ValueError):
+                await manager.place_human_stone(0, 0)
+            assert len(game.get_moves()) == 1
+
+            manager.engine_options = {"playouts": 30, "time_limit": None}
+            result = await manager.process_ai_turn()
+            assert "error" not in result and not manager.ai_turn_pending
+            await manager.place_human_stone(0, 0)
+        return game
+
+    game = asyncio.run(run())
+    assert [stone.type for stone in game.get_state().stones] == [
+        "BLACK",
+        "WHITE",
+        "BLACK",
+    ]
+
+
+def test_close_stops_pondering():
+    async def run():
+        async with Client(create_mcp_server(Gomoku())) as client:
+            manager = engine_manager(client, playouts=30, ponder_limit=60.0)
+            manager.engine_ponder = True
+            await manager.update_state()
+            await manager.place_human_stone(7, 7)
+            assert "error" not in await manager.process_ai_turn()
+            engine = manager.engine()
+            assert engine.pondering
+            manager.close()
+            return manager, engine
+
+    manager, engine = asyncio.run(run())
+    assert not engine.pondering and manager._engine is None
+
+
+def test_structured_retries_a_forbidden_move():
+    game = Gomoku(rule="renju")
+    for move in [(5, 7), (0, 0), (6, 7), (0, 2), (7, 5), (0, 4), (7, 6), (0, 6)]:
+        game.set_stone(*move)
+    replies = {
+        "m": [
+            (0, completion('{"x": 7, "y": 7, "reasoning": "double three"}')),
+            (0, completion('{"x": 9, "y": 9, "reasoning": "legal"}')),
+        ]
+    }
+
+    async def run():
+        async with Client(create_mcp_server(game)) as client:
+            manager, calls, _ = llm_manager(client, replies)
+            manager.current_model = "m"
+            manager.move_mode = "structured"
+            await manager.update_state()
+            result = await manager.process_ai_turn()
+        return result, calls
+
+    result, calls = asyncio.run(run())
+    assert result["response"] == "legal" and len(calls) == 2
+    assert "double-three" in calls[1]["messages"][-1]["content"]
+    assert game.get_moves()[-1] == (9, 9)
+
+
+def test_speculative_falls_back_when_the_server_rejects_the_move():
+    replies = {"m": [(0, completion(tool_calls=[set_stone_call(7, 7, "WHITE")]))]}
+
+    async def run():
+        game = Gomoku()
+        async with Client(create_mcp_server(game)) as client:
+            manager, _, _ = llm_manager(client, replies)
+            manager.speculative_models = ["m"]
+            await manager.update_state()
+            await manager.place_human_stone(7, 7)
+            # 로컬 검증을 건너뛰어 서버 (ToolError) 가 거절하게 함
+            manager._check_move = lambda args, turn: (args["x"], args["y"])
+            fallback = best_move(manager.current_state)
+            result = await manager.process_ai_turn()
+        return game, result, fallback
+
+    game, result, fallback = asyncio.run(run())
+    assert result["model"] == "engine"
+    assert game.get_moves() == [(7, 7), fallback]
+
+
+def choose_color_call(option):
+    arguments = json.dumps({"option": option})
+    function = SimpleNamespace(name="choose_color", arguments=arguments)
+    return SimpleNamespace(id=f"call-{option}", function=function)
+
+
+def test_swap2_opening_through_process_ai_turn():
+    replies = {
+        "m": [
+            # 구조화: 잘못된 선택 → 다시 물음 → place2
+            (0, completion('{"option": "swap", "reasoning": "?"}')),
+            (0, completion('{"option": "place2", "reasoning": "keep it open"}')),
+            # 도구 루프: 4, 5 번째 돌
+            (0, completion(tool_calls=[set_stone_call(8, 7, "WHITE")])),
+            (0, completion("white placed")),
+            (0, completion(tool_calls=[set_stone_call(6, 6, "BLACK")])),
+            (0, completion("black placed")),
+            # 도구 루프: 첫 플레이어의 선택
+            (0, completion(tool_calls=[choose_color_call("black")])),
+            (0, completion("I take black")),
+        ]
+    }
+
+    async def run():
+        game = Gomoku(opening="swap2")
+        for move in [(7, 7), (8, 8), (7, 8)]:
+            game.set_stone(*move)
+        async with Client(create_mcp_server(game)) as client:
+            manager, calls, _ = llm_manager(client, replies)
+            manager.current_model = "m"
+            manager.move_mode = "structured"
+            await manager.update_state()
+            result = await manager.process_ai_turn()
+            assert result["response"] == "keep it open"
+            assert "response_format" in calls[0]
+            assert calls[0]["response_format"]["json_schema"]["name"] == "gomoku_choice"
+            assert manager.messages[-1]["content"].startswith("Swap2 choice: place2")
+
+            manager.move_mode = "tools"
+            for _ in range(3):
+                assert "error" not in await manager.process_ai_turn()
+        return game, calls
+
+    game, calls = asyncio.run(run())
+    assert game.get_moves() == [(7, 7), (8, 8), (7, 8), (8, 7), (6, 6)]
+    assert game.get_state().swap_choices == ["place2", "black"]
+    assert game.pending_choice() is None
+    # choose_color 는 선택을 기다릴 때만 실림
+    assert "choose_color" not in calls[2]["tools"]
+    assert "choose_color" in calls[6]["tools"]
+    assert "choose_color" in calls[6]["messages"][-1]["content"]
+
+
+def test_speculative_choice_falls_back_to_heuristic_option():
+    replies = {"slow": [(5, completion(tool_calls=[choose_color_call("white")]))]}
+
+    async def run():
+        game = Gomoku(opening="swap2")
+        for move in [(7, 7), (8, 8), (7, 8)]:
+            game.set_stone(*move)
+        async with Client(create_mcp_server(game)) as client:
+            manager, calls, _ = llm_manager(client, replies)
+            manager.speculative_models = ["slow"]
+            manager.speculative_deadline = 0.05
+            await manager.update_state()
+            result = await manager.process_ai_turn()
+        return game, result, calls
+
+    game, result, calls = asyncio.run(run())
+    assert result["model"] == "engine" and "Swap2 choice" in result["response"]
+    assert len(game.get_state().swap_choices) == 1
+    assert calls[0]["tools"] == ["visualize", "set_stone", "choose_color"]
+
+
+def test_prompts_only_name_offered_tools():
+    named = set(re.findall(r"(\w+)\(", SYSTEM_PROMPT + USER_PROMPT))
+    assert named and named <= set(CHOICE_TOOLS)
@@ -0,0 +1,146 @@
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+
+from fastmcp import Client
+
+from game.gomoku import Gomoku
+from game.mcts import MCTS
+from manager import GameManager
+from mcp_server.server import create_mcp_server
+
+
+def play(moves, **kwargs):
+    game = Gomoku(**kwargs)
+    for move in moves:
+        game.set_stone(*move)
+    return game
+
+
+def test_takes_win_and_blocks_four():
+    # 흑 4 (양 끝 열림) + 백 3: 흑 차례면 5목, 백 차례면 막아야 함
+    fours = [(7, 7), (0, 0), (8, 7), (0, 2), (9, 7), (0, 4), (10, 7)]
+    result = MCTS(seed=0).search(play(fours + [(0, 6)]), playouts=300)
+    assert result.move in {(6, 7), (11, 7)}
+    assert result.value == 1.0
+
+    # 한쪽이 막힌 흑 4 (6~9): 백은 남은 한 곳을 막음
+    blocked = [(7, 7), (5, 7), (8, 7), (0, 0), (9, 7), (0, 2), (6, 7)]
+    result = MCTS(selection="uct", seed=0).search(play(blocked), playouts=2000)
+    assert result.move == (10, 7)
+
+
+def test_tree_is_reused_between_moves():
+    engine = MCTS(seed=1, max_children=4)
+    game = play([(7, 7), (8, 8)])
+    first = engine.search(game, playouts=400)
+    game.set_stone(*first.move)
+    played = next(child for child in engine.root.children if child.move == first.move)
+    reply = max(played.children, key=lambda child: child.visits)
+    game.set_stone(*reply.move)
+
+    engine.sync(game)
+    assert engine.root is reply and engine.root.visits > 0
+
+    # 다른 게임으로 바뀌면 새 트리
+    engine.sync(play([(0, 0)]))
+    assert engine.root.visits == 0
+
+
+def test_custom_evaluator_and_parallel_workers():
+    calls = []
+
+    def center_evaluator(position, color, moves):
+        calls.append(color)
+        priors = [1.0 / (1 + abs(x - 7) + abs(y - 7)) for x, y in moves]
+        return [prior / sum(priors) for prior in priors], 0.0
+
+    result = MCTS(evaluator=center_evaluator, seed=2).search(Gomoku(), playouts=50)
+    assert result.move == (7, 7) and calls
+
+    engine = MCTS(seed=3, workers=2)
+    try:
+        result = engine.search(play([(7, 7)]), playouts=100)
+    finally:
+        engine.close()
+    # 두 프로세스의 루트 통계를 합침 (루트를 처음 확장하는 시뮬레이션은 자식 방문이 없음)
+    assert result.playouts == 200
+    assert 190 <= sum(visits for visits, _ in result.stats.values()) <= 200
+    assert result.move not in {(7, 7)}
+
+    # 작업 둘이 같은 워커 프로세스에서 돌아도 방문을 두 번 세지 않음
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        engine = MCTS(seed=3, workers=3, executor=pool)
+        result = engine.search(play([(7, 7)]), playouts=100)
+    assert result.playouts == 300
+    assert 285 <= sum(visits for visits, _ in result.stats.values()) <= 300
+
+
+def test_renju_engine_skips_forbidden_points():
+    # (7, 7) 은 흑의 4-4 금수
+    blacks = [(4, 7), (5, 7), (6, 7), (7, 4), (7, 5), (7, 6)]
+    whites = [(3, 7), (7, 3), (0, 0), (0, 2), (0, 4), (0, 6)]
+    moves = [move for pair in zip(blacks, whites) for move in pair]
+    engine = MCTS(seed=4)
+    result = engine.search(play(moves, rule="renju"), playouts=200)
+    assert result.move is not None and (7, 7) not in result.stats
+
+
+def test_manager_plays_engine_moves():
+    async def run():
+        game = Gomoku()
+        async with Client(create_mcp_server(game)) as client:
+            manager = GameManager(mcp_client=client, openrouter_client=None)
+            manager.current_model = "engine/mcts"
+            manager.engine_options = {"playouts": 50, "time_limit": None, "seed": 5}
+            await manager.update_state()
+            await manager.set_stone(7, 7)
+            result = await manager.process_ai_turn()
+            chat = await manager.process_message("hi", "engine/mcts")
+        return game, result, chat
+
+    game, result, chat = asyncio.run(run())
+    assert "error" not in result and len(game.get_moves()) == 2
+    assert result["state"]["turn"] == "BLACK"
+    assert "error" in chat
+
+
+def test_ponder_answers_predicted_move_immediately():
+    engine = MCTS(seed=6, playouts=100, time_limit=None, max_children=3)
+    game = play([(7, 7)])
+    game.set_stone(*engine.search(game).move)
+
+    engine.ponder(game)
+    assert engine.pondering
+    while engine.root.visits < 2000:
+        time.sleep(0.01)
+    engine.stop_pondering()
+    assert not engine.pondering
+
+    # 사람이 가장 많이 생각해 둔 수를 둠: 물려받은 방문으로 예산이 다 차서 바로 둠
+    predicted = max(engine.root.children, key=lambda child: child.visits)
+    game.set_stone(*predicted.move)
+    result = engine.search(game)
+    assert result.reused >= 100 and result.playouts == 0
+    assert result.move is not None
+
+    # 예측하지 못한 수면 새로 탐색
+    game = play([(7, 7), (0, 0), (14, 14)])
+    result = engine.search(game)
+    assert result.reused == 0 and result.playouts == 100
+
+
+def test_stop_ends_a_search_running_in_another_thread():
+    engine = MCTS(seed=7, playouts=10**9, time_limit=3.0, workers=2)
+    started = time.perf_counter()
+    timer = threading.Timer(0.2, engine.stop)
+    timer.start()
+    try:
+        result = engine.search(play([(7, 7)]))
+    finally:
+        engine.close()
+    assert time.perf_counter() - started < 2
+    assert result.playouts > 0
+    engine.ponder(play([(7, 7), (8, 8)]))
+    assert not engine.pondering
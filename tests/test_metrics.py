@@ -0,0 +1,30 @@
+from metrics import MetricsRegistry
+
+
+def test_counter_render():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests", "Requests", ["model"])
+    counter.inc(model="a")
+    counter.inc(2, model="a")
+    counter.inc(model='b"c')
+
+    text = registry.render()
+    assert "# HELP requests_total " in text
+    assert "# TYPE requests_total counter" in text
+    assert "# TYPE requests counter" not in text
+    assert 'requests_total{model="a"} 3' in text
+    assert 'requests_total{model="b\\"c"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    text = registry.render()
+    assert 'latency_bucket{le="0.1"} 2' in text
+    assert 'latency_bucket{le="1.0"} 3' in text
+    assert 'latency_bucket{le="+Inf"} 4' in text
+    assert "latency_count 4" in text
+    assert "latency_sum 2.65" in text
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from mcp_server.movelog import MoveLog, replay
+from mcp_server.store import WALGameStore
+
+
+def test_wal_store_recovers_games_after_restart(tmp_path):
+    path = str(tmp_path / "moves.log")
+    store = WALGameStore(path)
+    for x, y in [(7, 7), (8, 8), (7, 8)]:
+        store.update("a", lambda game: game.set_stone(x, y))
+    store.update("b", lambda game: game.set_stone(0, 0))
+    store.update("b", lambda game: game.restart())
+    store.update("b", lambda game: game.set_stone(1, 1))
+    store.update("c", lambda game: game.set_stone(2, 2))
+    store.delete("c")
+    store.close()
+
+    recovered = WALGameStore(path)
+    assert recovered.load("a").get_moves() == [(7, 7), (8, 8), (7, 8)]
+    assert recovered.load("b").get_moves() == [(1, 1)]
+    assert "c" not in recovered.list_games()
+    recovered.close()
+
+
+def test_replay_drops_torn_tail(tmp_path):
+    path = tmp_path / "moves.log"
+    good = json.dumps({"g": "a", "op": "move", "x": 7, "y": 7}) + "\n"
+    path.write_text(good + '{"g": "a", "op": "mo')
+
+    assert replay(str(path)) == {"a": {"width": 15, "height": 15, "moves": [(7, 7)]}}
+    assert path.read_text() == good
+
+
+def test_group_commit_batches_appends(tmp_path):
+    path = str(tmp_path / "moves.log")
+    log = MoveLog(path, commit_interval=0.05)
+    for i in range(100):
+        log.append({"g": "a", "op": "move", "x": i % 15, "y": i // 15})
+    assert log.flush(timeout=5)
+    log.close()
+
+    assert len(replay(path)["a"]["moves"]) == 100
+
+
+class FailingFile:
+    """앞부분만 쓰고 OSError 를 내는 파일 (디스크 가득 참 흉내)"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data[:5])
+        self.file.flush()
+        raise OSError(28, "No space left on device")
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_failed_commit_is_reported_and_rolled_back(tmp_path):
+    path = str(tmp_path / "moves.log")
+    log = MoveLog(path, commit_interval=0.01)
+    log.append({"g": "a", "op": "move", "x": 7, "y": 7})
+    assert log.flush(timeout=5)
+
+    log._file = FailingFile(log._file)
+    log.append({"g": "a", "op": "move", "x": 8, "y": 8})
+    with pytest.raises(OSError):
+        log.flush(timeout=5)
+
+    # 다음 커밋은 잘린 레코드 뒤가 아니라 마지막 커밋 위치에서 이어짐
+    log.append({"g": "a", "op": "move", "x": 9, "y": 9})
+    assert log.flush(timeout=5)
+    log.close()
+    assert replay(path)["a"]["moves"] == [(7, 7), (9, 9)]
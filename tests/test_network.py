@@ -0,0 +1,129 @@
+import pickle
+import random
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game.gomoku import Gomoku
+from game.mcts import MCTS
+from game.network import (
+    BatchingEvaluator,
+    NetworkEvaluator,
+    PolicyValueNet,
+    board_planes,
+)
+from dataset import game_examples
+from manager import GameManager
+from train import fit, selfplay_game
+
+
+def test_board_planes_and_predict():
+    game = Gomoku(9)
+    game.set_stone(4, 4)
+    game.set_stone(5, 5)
+    game.set_stone(3, 4)
+    planes = board_planes(game.get_state())
+    # WHITE 차례: 0 번 평면이 백 돌
+    assert planes.shape == (3, 9, 9)
+    assert planes[0, 5, 5] == 1 and planes[1, 4, 4] == 1 and planes[1, 4, 3] == 1
+
+    probs, values = PolicyValueNet(seed=0).predict(planes[None])
+    assert probs.shape == (1, 9, 9) and values.shape == (1,)
+    assert probs[0, 4, 4] == 0 and probs[0].sum() == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        board_planes(Gomoku(None).get_state())
+
+
+def test_training_fits_a_position(tmp_path):
+    net = PolicyValueNet(channels=8, layers=2, seed=1)
+    planes = board_planes(Gomoku(7).set_stone(3, 3))[None]
+    policy = np.zeros((1, 49), dtype=np.float32)
+    policy[0, 2 * 7 + 2] = 1.0
+    value = np.array([-1.0], dtype=np.float32)
+
+    first = net.train_step(planes, policy, value, lr=0.01)
+    for _ in range(100):
+        last = net.train_step(planes, policy, value, lr=0.01)
+    assert last["policy_loss"] < first["policy_loss"] / 2
+    assert last["value_loss"] < first["value_loss"] / 2
+
+    path = str(tmp_path / "net.npz")
+    net.save(path)
+    restored = PolicyValueNet.load(path)
+    assert np.allclose(restored.predict(planes)[0], net.predict(planes)[0])
+
+
+def test_batching_queue_groups_concurrent_requests():
+    net = PolicyValueNet(channels=8, layers=2, seed=2)
+    batcher = BatchingEvaluator(net, max_wait=0.05)
+    states = []
+    for i in range(8):
+        game = Gomoku(9)
+        game.set_stone(i, 0)
+        states.append(board_planes(game.get_state()))
+
+    results = [None] * len(states)
+
+    def evaluate(i):
+        results[i] = batcher.evaluate(states[i])
+
+    threads = [threading.Thread(target=evaluate, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert batcher.evaluations == 8 and batcher.batches < 8
+    probs, values = net.predict(np.stack(states))
+    for i, (prob, value) in enumerate(results):
+        assert np.allclose(prob, probs[i]) and value == pytest.approx(values[i])
+
+
+def test_selfplay_records_train_an_mcts_evaluator():
+    engine = MCTS(playouts=30, time_limit=None, seed=3)
+    record = selfplay_game(engine, random.Random(0), board_size=9)
+    assert record["width"] == 9 and record["moves"]
+
+    examples = list(game_examples(record))
+    assert len(examples) == len(record["moves"])
+    planes, index, value = examples[0]
+    assert (
+        planes[:2].sum() == 0
+        and index == record["moves"][0][1] * 9 + record["moves"][0][0]
+    )
+    if record["winner"] == "BLACK":
+        assert value == 1.0
+
+    net = PolicyValueNet(channels=8, layers=2, seed=4)
+    history = fit(net, examples, epochs=2, batch_size=8)
+    assert len(history) == 2
+
+    evaluator = NetworkEvaluator(net, BatchingEvaluator(net))
+    result = MCTS(evaluator=evaluator, playouts=20, time_limit=None).search(Gomoku(9))
+    assert result.move is not None
+    # 워커 프로세스로 보낼 때는 망만 (배치 큐 스레드는 빠짐)
+    assert pickle.loads(pickle.dumps(evaluator)).batcher is None
+
+
+def test_engine_drops_the_network_on_unbounded_boards():
+    net = PolicyValueNet(channels=8, layers=2, seed=5)
+    evaluator = NetworkEvaluator(net)
+    manager = GameManager(mcp_client=None, openrouter_client=None)
+    manager.engine_options = {
+        "evaluator": evaluator,
+        "playouts": 20,
+        "time_limit": None,
+    }
+
+    assert manager.engine().evaluator is evaluator
+    manager.current_state = Gomoku(None).set_stone(0, 0)
+    engine = manager.engine()
+    assert engine.evaluator is not evaluator
+    result = engine.search(manager.current_state)
+    assert result.move is not None
+
+    manager.current_state = Gomoku(9).get_state()
+    assert manager.engine().evaluator is evaluator
@@ -0,0 +1,55 @@
+import pytest
+
+from game.gomoku import Gomoku
+from schema import WIDTH, HEIGHT
+
+MOVES = [(7, 7), (8, 8), (0, 14), (14, 0), (3, 4)]
+
+
+def legacy_render(game: Gomoku) -> str:
+    """이전 visualize_board 구현 (출력 형식 비교용)"""
+    symbols = {"BLACK": "●", "WHITE": "○", None: "+"}
+    board = game.get_state().board
+    lines = ["   " + " ".join(f"{i:<2}" for i in range(WIDTH))]
+    for y in range(HEIGHT):
+        lines.append(
+            f"{y:>2} " + "".join(symbols[board[y][x]] + "  " for x in range(WIDTH))
+        )
+    return "\n".join(lines)
+
+
+def test_incremental_render_matches_full_render():
+    game = Gomoku()
+    assert game.visualize_board() == legacy_render(game)
+    for x, y in MOVES:
+        game.set_stone(x, y)
+        # 렌더러를 유지한 채 한 칸씩 갱신한 결과 == 새로 그린 결과
+        assert game.visualize_board() == legacy_render(game)
+        fresh = Gomoku.from_moves(game.get_moves())
+        assert game.visualize_board("compact") == fresh.visualize_board("compact")
+
+
+def test_compact_style_and_last_move_highlight():
+    game = Gomoku.from_moves(MOVES[:2])
+    lines = game.visualize_board("compact", highlight_last=True).split("\n")
+    assert lines[0] == "   012345678901234"
+    assert lines[1 + 7] == " 7 .......X......."
+    assert lines[1 + 8] == " 8 ........o......"
+
+    default = game.visualize_board(highlight_last=True).split("\n")
+    assert "○* " in default[1 + 8]
+    # 강조는 캐시된 기본 렌더링에 영향을 주지 않음
+    assert "*" not in game.visualize_board()
+
+
+def test_render_cache_is_reused_until_next_move():
+    game = Gomoku.from_moves(MOVES[:1])
+    first = game.visualize_board()
+    assert game.visualize_board() is first
+    game.set_stone(8, 8)
+    assert game.visualize_board() is not first
+
+
+def test_unknown_style():
+    with pytest.raises(ValueError):
+        Gomoku().visualize_board("fancy")
@@ -0,0 +1,93 @@
+import pytest
+
+from game.gomoku import Gomoku
+from game.rules import analyze_line
+from mcp_server.store import WALGameStore
+
+# 흑 착수 사이사이 백은 판 가장자리에 둠
+FAR = [(0, 0), (0, 2), (0, 4), (0, 6), (0, 8), (0, 10), (0, 12)]
+
+
+def play(rule, blacks, whites=FAR, **kwargs):
+    game = Gomoku(rule=rule, **kwargs)
+    for black, white in zip(blacks, whites):
+        game.set_stone(*black)
+        game.set_stone(*white)
+    return game
+
+
+def test_renju_fouls():
+    double_three = play("renju", [(5, 7), (6, 7), (7, 5), (7, 6)])
+    double_four = play("renju", [(4, 7), (5, 7), (6, 7), (7, 4), (7, 5), (7, 6)])
+    overline = play("renju", [(1, 7), (2, 7), (3, 7), (5, 7), (6, 7)])
+
+    assert double_three.get_forbidden_moves()[(7, 7)] == "double-three"
+    assert double_four.get_forbidden_moves()[(7, 7)] == "double-four"
+    assert overline.get_forbidden_moves()[(4, 7)] == "overline"
+    assert (7, 7) not in double_three.get_valid_moves()
+    with pytest.raises(ValueError, match="double-three"):
+        double_three.set_stone(7, 7)
+
+
+def test_renju_blocked_three_is_not_a_foul():
+    # (4, 7) 의 백이 가로 3을 막으므로 열린 3이 하나뿐
+    game = play("renju", [(5, 7), (6, 7), (7, 5), (7, 6)], [(4, 7)] + FAR)
+    assert game.get_forbidden_moves() == {}
+
+
+def test_line_patterns():
+    # 중심(5번째 칸)에 둔다고 가정한 11칸 줄
+    open_four = analyze_line("00011110000")
+    assert (open_four.fours, open_four.straight_four) == (1, True)
+    # B.BBB.B: 한 줄 안에 4가 둘
+    assert analyze_line("00101110100").fours == 2
+    # 열린 3은 양 끝이 열린 4가 되는 자리, 한쪽이 막히면 3이 아님
+    assert analyze_line("00011100000").three_points == (-3, 1)
+    assert analyze_line("00x11100000").three_points == ()
+
+
+def test_overline_wins_only_in_freestyle():
+    blacks = [(1, 7), (2, 7), (3, 7), (5, 7), (6, 7)]
+    assert play("freestyle", blacks).set_stone(4, 7).turn == "BLACK_WIN"
+    assert play("standard", blacks).set_stone(4, 7).turn == "WHITE"
+
+
+def test_swap2_opening_and_replay(tmp_path):
+    game = Gomoku(opening="swap2")
+    for move in [(7, 7), (8, 8), (7, 8)]:
+        game.set_stone(*move)
+    assert game.get_state().pending_choice == "swap2"
+    assert game.get_valid_moves() == []
+    with pytest.raises(ValueError):
+        game.set_stone(9, 9)
+
+    game.choose("place2")
+    game.set_stone(9, 9)
+    game.set_stone(6, 6)
+    assert game.get_state().pending_choice == "swap"
+    state = game.choose("white")
+    assert state.pending_choice is None and state.swap_choices == ["place2", "white"]
+    game.set_stone(10, 10)
+
+    restored = Gomoku.from_record(game.to_record())
+    assert restored.get_state().swap_choices == ["place2", "white"]
+    assert restored.get_moves() == game.get_moves()
+    assert len(game.get_history()) == 7
+
+    store = WALGameStore(str(tmp_path / "moves.log"))
+    store.update("g", lambda g: g.set_rule("renju", "swap2"))
+    for move in [(7, 7), (8, 8), (7, 8)]:
+        store.update("g", lambda g: g.set_stone(*move))
+    store.update("g", lambda g: g.choose("black"))
+    store.update("g", lambda g: g.set_stone(9, 9))
+    store.close()
+
+    recovered = WALGameStore(str(tmp_path / "moves.log"))
+    state = recovered.load("g").get_state()
+    assert (state.rule, state.opening, state.swap_choices) == (
+        "renju",
+        "swap2",
+        ["black"],
+    )
+    assert len(state.stones) == 4
+    recovered.close()
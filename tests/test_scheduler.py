@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from scheduler import (
+    BATCH,
+    INTERACTIVE,
+    PriorityGate,
+    RateLimit,
+    RequestScheduler,
+    TokenBucket,
+)
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_token_bucket_waits_when_empty():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_priority_gate_prefers_interactive():
+    async def run():
+        gate = PriorityGate(limit=1)
+        order = []
+        await gate.acquire(BATCH)
+
+        async def worker(priority, name):
+            await gate.acquire(priority)
+            order.append(name)
+            gate.release()
+
+        tasks = [
+            asyncio.create_task(worker(BATCH, "batch")),
+            asyncio.create_task(worker(INTERACTIVE, "interactive")),
+        ]
+        await asyncio.sleep(0)
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "batch"]
+
+
+def test_retry_on_rate_limit():
+    calls = []
+
+    def flaky(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise FakeStatusError(429 if len(calls) == 1 else 503)
+        return "ok"
+
+    scheduler = RequestScheduler(
+        default_model_limit=RateLimit(rate=100.0, burst=1, concurrency=1),
+        base_delay=0.01,
+    )
+    result = asyncio.run(scheduler.submit(flaky, model="google/test"))
+
+    assert result == "ok"
+    assert len(calls) == 3
+    metrics = scheduler.metrics["google/test"]
+    assert metrics.retries == 2
+    assert metrics.rate_limited == 1
+    assert metrics.successes == 1
+
+
+def test_non_retryable_error_is_raised():
+    def bad_request(**kwargs):
+        raise FakeStatusError(400)
+
+    scheduler = RequestScheduler(base_delay=0.01)
+    with pytest.raises(FakeStatusError):
+        asyncio.run(scheduler.submit(bad_request, model="google/test"))
+    assert scheduler.metrics["google/test"].failures == 1
+
+
+def test_conflict_is_not_retried():
+    def conflict(**kwargs):
+        raise FakeStatusError(409)
+
+    scheduler = RequestScheduler(base_delay=0.01)
+    with pytest.raises(FakeStatusError):
+        asyncio.run(scheduler.submit(conflict, model="google/test"))
+    assert scheduler.metrics["google/test"].retries == 0
+
+
+def test_waiting_for_tokens_does_not_hold_a_slot():
+    async def run():
+        # 두 번째 요청은 토큰을 0.2초 기다림, 그동안 다른 모델 요청이 슬롯을 씀
+        scheduler = RequestScheduler(
+            model_limits={"p/a": RateLimit(rate=5.0, burst=1, concurrency=4)},
+            default_provider_limit=RateLimit(rate=100.0, burst=10, concurrency=1),
+        )
+        order = []
+
+        def call(**kwargs):
+            order.append(kwargs["model"])
+
+        await scheduler.submit(call, model="p/a")
+        waiting = asyncio.create_task(scheduler.submit(call, model="p/a"))
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(scheduler.submit(call, model="p/b"), timeout=0.1)
+        await waiting
+        return order
+
+    assert asyncio.run(run()) == ["p/a", "p/b", "p/a"]
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+from fastmcp import Client
+
+from game import solver
+from game.gomoku import Gomoku
+from game.solver import DEFAULT_TIME_LIMIT, MAX_TIME_LIMIT, find_forced_win
+from mcp_server.server import create_mcp_server
+
+# 흑 착수 사이사이 백은 판 가장자리에 둠
+FAR = [(0, 0), (0, 2), (0, 4), (0, 6), (0, 8), (0, 10), (0, 12)]
+# 서로 떨어져 있어 백의 역 4 가 생기지 않는 배치
+CORNERS = [(0, 0), (14, 0), (0, 14), (14, 14), (0, 7), (14, 7), (7, 0)]
+
+
+def play(blacks, whites, **kwargs):
+    game = Gomoku(**kwargs)
+    for black, white in zip(blacks, whites):
+        game.set_stone(*black)
+        game.set_stone(*white)
+    return game
+
+
+def replay_wins(game, result):
+    for stone in result.moves:
+        game.set_stone(stone.x, stone.y, stone.type)
+    return game.get_turn() == f"{result.attacker}_WIN"
+
+
+def test_vcf_finds_four_three():
+    # 가로 3 (한쪽 막힘) + 세로 3: (10, 7) 에 두면 4 두 개
+    blacks = [(7, 7), (8, 7), (9, 7), (10, 8), (10, 9), (10, 10)]
+    whites = [(6, 7), (10, 11)] + FAR
+    game = play(blacks, whites)
+
+    result = find_forced_win(game)
+    assert result.found and result.complete
+    assert result.attacker == "BLACK"
+    assert [(s.x, s.y, s.type) for s in result.moves] == [
+        (10, 7, "BLACK"),
+        (10, 6, "WHITE"),
+        (11, 7, "BLACK"),
+    ]
+    assert replay_wins(game, result)
+
+
+def test_vct_uses_open_threes():
+    # 열린 2 두 개: 4 만으로는 이길 수 없지만 (9, 7) 의 3-3 으로 이김
+    game = play([(7, 7), (8, 7), (9, 9), (9, 10)], CORNERS)
+    assert not find_forced_win(game, kind="vcf").found
+
+    result = find_forced_win(game, kind="vct", time_limit=None)
+    assert result.found and result.complete
+    assert (result.moves[0].x, result.moves[0].y) == (9, 7)
+    assert replay_wins(game, result)
+
+
+def test_renju_forbidden_points_are_skipped():
+    # 양 끝이 막힌 가로 / 세로 3: 이기는 자리 (7, 7) 이 렌주에서는 4-4 금수
+    blacks = [(4, 7), (5, 7), (6, 7), (7, 4), (7, 5), (7, 6)]
+    whites = [(3, 7), (7, 3)] + FAR
+    assert find_forced_win(play(blacks, whites)).found
+    result = find_forced_win(play(blacks, whites, rule="renju"))
+    assert not result.found and result.complete
+
+
+def test_limits_and_errors():
+    game = play([(7, 7), (8, 7), (9, 9), (9, 10)], CORNERS)
+    limited = find_forced_win(game, kind="vct", max_nodes=5)
+    assert not limited.found and not limited.complete
+    assert limited.nodes <= 6
+
+    with pytest.raises(ValueError):
+        find_forced_win(game, kind="vcx")
+    with pytest.raises(ValueError):
+        find_forced_win(game, color="RED")
+
+
+def test_zero_time_limit_is_bounded():
+    game = play([(7, 7), (8, 7), (9, 9), (9, 10)], CORNERS)
+    # 0 은 "제한 없음" 이 아니라 바로 멈춤
+    result = find_forced_win(game, kind="vct", time_limit=0)
+    assert not result.complete and result.nodes <= 1
+
+
+def test_tool_clamps_time_limit_and_searches_off_the_loop(monkeypatch):
+    calls = []
+    search = solver.find_forced_win
+
+    def recording(*args, **kwargs):
+        calls.append((kwargs["time_limit"], threading.current_thread()))
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(solver, "find_forced_win", recording)
+
+    async def run():
+        async with Client(create_mcp_server(Gomoku())) as client:
+            for limit in (0, None, -1, 1e9, 0.5):
+                await client.call_tool("find_forced_win", {"time_limit": limit})
+
+    asyncio.run(run())
+    assert [limit for limit, _ in calls] == [
+        DEFAULT_TIME_LIMIT,
+        DEFAULT_TIME_LIMIT,
+        DEFAULT_TIME_LIMIT,
+        MAX_TIME_LIMIT,
+        0.5,
+    ]
+    assert all(thread is not threading.main_thread() for _, thread in calls)
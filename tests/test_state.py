@@ -0,0 +1,70 @@
+from game.gomoku import Gomoku
+from schema import GomokuState
+
+MOVES = [(7, 7), (8, 8), (7, 8), (8, 7), (7, 9)]
+
+
+def test_state_matches_validated_wire_format():
+    game = Gomoku.from_moves(MOVES)
+    state = game.get_state()
+    validated = GomokuState.model_validate_json(game.get_state_json())
+
+    assert state == validated
+    assert state.model_dump() == validated.model_dump()
+    assert validated.board[7][7] == "BLACK"
+    assert validated.stones[1].type == "WHITE"
+
+
+def test_cached_views_are_invalidated_by_moves():
+    game = Gomoku()
+    game.set_stone(7, 7)
+    state, dumped = game.get_state(), game.get_state_json()
+    assert game.get_state() is state
+    assert game.get_state_json() is dumped
+
+    game.set_stone(8, 8)
+    assert game.get_state() is not state
+    assert len(game.get_state().stones) == 2
+    assert state.turn == "WHITE" and len(state.stones) == 1
+
+
+def test_history_is_replayed_lazily_and_extended():
+    game = Gomoku.from_moves(MOVES[:3])
+    history = game.get_history()
+    assert [len(s.stones) for s in history] == [0, 1, 2, 3]
+
+    first = history[1]
+    game.set_stone(*MOVES[3])
+    history = game.get_history()
+    assert [len(s.stones) for s in history] == [0, 1, 2, 3, 4]
+    assert history[1] is first
+    assert history[-1] == game.get_state()
+
+    game.restart()
+    assert len(game.get_history()) == 1
+
+
+def test_history_continues_from_last_snapshot(monkeypatch):
+    game = Gomoku(rule="freestyle", opening="swap2")
+    for move in MOVES[:3]:
+        game.set_stone(*move)
+    game.choose("place2")
+    game.get_history()
+
+    played = []
+    original = Gomoku._play
+    monkeypatch.setattr(
+        Gomoku,
+        "_play",
+        lambda self, *args: played.append(args) or original(self, *args),
+    )
+    game._play(*MOVES[3])
+    game._play(*MOVES[4])
+    game.choose("black")
+    played.clear()
+
+    history = game.get_history()
+    assert played == [MOVES[3], MOVES[4]]
+    assert len(history) == 6
+    assert history[-1].stones == game.get_state().stones
+    assert game._replay.get_state().swap_choices == ["place2"]
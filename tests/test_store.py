@@ -0,0 +1,51 @@
+import pytest
+
+from game.gomoku import Gomoku
+from mcp_server.store import MemoryGameStore, SQLiteGameStore, create_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryGameStore()
+    return SQLiteGameStore(str(tmp_path / "games.sqlite3"))
+
+
+def test_update_persists_moves(store):
+    store.update("g1", lambda game: game.set_stone(7, 7))
+    store.update("g1", lambda game: game.set_stone(8, 8))
+
+    state = store.load("g1").get_state()
+    assert state.board[7][7] == "BLACK"
+    assert state.board[8][8] == "WHITE"
+    assert state.turn == "BLACK"
+    assert store.load("g2").get_state().stones == []
+    assert "g1" in store.list_games()
+
+
+def test_invalid_move_leaves_store_unchanged(store):
+    store.update("g1", lambda game: game.set_stone(7, 7))
+    with pytest.raises(ValueError):
+        store.update("g1", lambda game: game.set_stone(7, 7))
+    assert store.load("g1").get_moves() == [(7, 7)]
+
+
+def test_sqlite_store_shared_between_instances(tmp_path):
+    path = str(tmp_path / "games.sqlite3")
+    SQLiteGameStore(path).update("g1", lambda game: game.set_stone(3, 4))
+    assert SQLiteGameStore(path).load("g1").get_moves() == [(3, 4)]
+
+
+def test_from_moves_replays_game():
+    game = Gomoku()
+    for x, y in [(7, 7), (8, 8), (7, 8)]:
+        game.set_stone(x, y)
+    restored = Gomoku.from_moves(game.get_moves())
+    assert restored.get_state() == game.get_state()
+    assert len(restored.get_history()) == len(game.get_history())
+
+
+def test_create_store_rejects_unknown_url():
+    assert isinstance(create_store(None), MemoryGameStore)
+    with pytest.raises(ValueError):
+        create_store("ftp://nowhere")
@@ -0,0 +1,106 @@
+import os
+import json
+import asyncio
+
+from fastmcp import Client
+
+from game.gomoku import Gomoku
+from manager import GameManager
+from mcp_server.server import create_mcp_server
+import utils
+from utils import ToolSchemas, load_tool_schemas, to_openrouter_schema
+
+
+class CountingClient:
+    def __init__(self, client):
+        self.client = client
+        self.list_calls = 0
+        self.enter_calls = 0
+
+    async def __aenter__(self):
+        self.enter_calls += 1
+        await self.client.__aenter__()
+        return self
+
+    async def list_tools(self):
+        self.list_calls += 1
+        return await self.client.list_tools()
+
+
+def test_tool_schemas_are_cached_on_disk(tmp_path):
+    path = str(tmp_path / "tool_schemas.json")
+
+    async def run():
+        client = CountingClient(Client(create_mcp_server(Gomoku())))
+        async with client.client:
+            first = await load_tool_schemas(client, path)
+            second = await load_tool_schemas(client, path)
+        return client, first, second
+
+    client, first, second = asyncio.run(run())
+    assert client.list_calls == 1
+    assert first is second
+    assert "set_stone" in first.names
+
+    # 다른 프로세스가 디스크 캐시만으로 같은 스키마를 복원
+    restored = ToolSchemas(json.loads(open(path).read())["tools"])
+    assert restored.version == first.version
+
+
+def test_select_subsets_and_hides_game_id():
+    async def run():
+        async with Client(create_mcp_server(Gomoku())) as client:
+            return ToolSchemas(
+                [to_openrouter_schema(t) for t in await client.list_tools()]
+            )
+
+    schemas = asyncio.run(run())
+    move_tools = schemas.select(("visualize", "set_stone"), compact=True)
+
+    assert [tool["function"]["name"] for tool in move_tools] == [
+        "visualize",
+        "set_stone",
+    ]
+    assert schemas.select(("visualize", "set_stone"), compact=True) is move_tools
+    for tool in schemas.select():
+        parameters = tool["function"]["parameters"]
+        assert "game_id" not in parameters["properties"]
+        assert "game_id" not in parameters["required"]
+    # 기본값이 있는 인자는 필수가 아님
+    required = {
+        tool["function"]["name"]: tool["function"]["parameters"]["required"]
+        for tool in schemas.select()
+    }
+    assert required["restart"] == [] and required["visualize"] == []
+    assert required["find_forced_win"] == []
+    assert set(required["set_stone"]) == {"x", "y", "turn"}
+    assert (
+        len(schemas.json(("visualize", "set_stone"), compact=True))
+        < len(schemas.json()) / 2
+    )
+
+
+def test_initialize_mcp_runs_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "manager.load_tool_schemas",
+        lambda client: load_tool_schemas(client, str(tmp_path / "tools.json")),
+    )
+
+    async def run():
+        client = CountingClient(Client(create_mcp_server(Gomoku())))
+        manager = GameManager(mcp_client=client, openrouter_client=None)
+        await asyncio.gather(manager.initialize_mcp(), manager.initialize_mcp())
+        await manager.initialize_mcp()
+        await client.client.__aexit__(None, None, None)
+        return client, manager
+
+    client, manager = asyncio.run(run())
+    assert client.enter_calls == 1
+    assert len(manager.tool_schemas) == 10
+
+
+def test_cache_path_is_absolute_and_covers_tool_sources():
+    assert os.path.isabs(utils.TOOL_SCHEMA_CACHE)
+    names = {os.path.relpath(path, utils._SRC_DIR) for path in utils._TOOL_SOURCES}
+    assert {"schema.py", os.path.join("game", "rules.py")} <= names
+    assert all(os.path.exists(path) for path in utils._TOOL_SOURCES)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+import tournament
+from game.heuristic import best_move
+from manager import GameManager
+from tournament import GameResult, Tournament, compute_elo, format_ratings
+
+
+def result(black, white, winner):
+    return GameResult(black=black, white=white, winner=winner, reason="five")
+
+
+def test_elo_updates_in_game_order():
+    ratings = compute_elo([result("a", "b", "BLACK")])
+    assert ratings == {"a": 1516.0, "b": 1484.0}
+
+    # 무승부는 낮은 쪽이 오름, 합은 그대로
+    ratings = compute_elo([result("a", "b", "BLACK"), result("b", "a", None)])
+    assert ratings["b"] > 1484.0 and sum(ratings.values()) == pytest.approx(3000.0)
+
+    # 이긴 쪽의 기대 승률이 높을수록 덜 오름
+    ratings = compute_elo(
+        [result("a", "b", "BLACK"), result("a", "b", "BLACK")], k=16, initial=1000
+    )
+    assert ratings["a"] == pytest.approx(1015.63, abs=0.01)
+
+    table = format_ratings(
+        [result("a", "b", "WHITE"), result("a", "b", None)],
+        compute_elo([result("a", "b", "WHITE"), result("a", "b", None)]),
+    ).splitlines()
+    assert table[1].split() == ["1", "b", "1514.5", "1", "0", "1"]
+    assert table[2].split() == ["2", "a", "1485.5", "0", "1", "1"]
+
+
+def test_pairings_swap_colours():
+    games = Tournament(None, models=["a", "b", "c"], games_per_pair=2).pairings()
+    assert len(games) == 12
+    assert games.count(("a", "b")) == games.count(("b", "a")) == 2
+
+
+class HeuristicManager(GameManager):
+    """LLM 대신 best_move 를 두는 GameManager ("idle" 모델은 두지 못함)"""
+
+    async def process_ai_turn(self) -> dict:
+        if self.current_model == "idle":
+            return {"error": "no move"}
+        await self.set_stone(*best_move(self.current_state))
+        return {"response": "ok"}
+
+
+def test_play_game_with_stub_managers(monkeypatch):
+    async def no_schemas(client):
+        return None
+
+    monkeypatch.setattr(tournament, "GameManager", HeuristicManager)
+    monkeypatch.setattr(tournament, "load_tool_schemas", no_schemas)
+
+    async def run():
+        games = Tournament(None, models=["a", "idle"], board_size=9, base_delay=0)
+        games.max_retries = 2
+        forfeits = await games.run()
+        played = await Tournament(None, board_size=9).play_game("a", "b")
+        return forfeits, played
+
+    forfeits, played = asyncio.run(run())
+    assert [(game.winner, game.reason) for game in forfeits] == [
+        ("BLACK", "forfeit"),
+        ("WHITE", "forfeit"),
+    ]
+    assert forfeits[0].moves == [(4, 4)] and forfeits[1].moves == []
+    assert played.reason in {"five", "draw"} and len(played.moves) >= 9
+    assert played.record["moves"] == played.moves